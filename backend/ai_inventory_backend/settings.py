@@ -73,6 +73,10 @@ CSRF_COOKIE_AGE = 31449600  # 1 year in seconds
 SESSION_COOKIE_SECURE = False  # Set to True in production
 SESSION_COOKIE_SAMESITE = 'Lax'
 
+# How long deletes stay in the change feed (see compact_change_log); clients
+# whose cursor is older must reload the lists
+CHANGE_LOG_TOMBSTONE_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_TOMBSTONE_RETENTION_DAYS", "30"))
+
 # Security settings for development
 SECURE_PROXY_SSL_HEADER = None
 SESSION_COOKIE_SECURE = False
@@ -99,6 +103,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_extensions',
+    'django_filters',
     'inventory',
     'authentication',
 ]
@@ -113,6 +118,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventory.middleware.StockAlertBatchMiddleware',
 ]
 
 # Root URL configuration
@@ -143,6 +149,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / os.getenv("DB_NAME", "db.sqlite3"),
+        'OPTIONS': {
+            # Transactions take the write lock when they begin. A deferred one
+            # that reads before it writes (versioned updates read the ids
+            # they change) cannot upgrade its lock under contention and fails
+            # with "database is locked" instead of waiting out the timeout.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -174,6 +188,10 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_CLASSES': [],
     'DEFAULT_THROTTLE_RATES': {},
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
+    # List endpoints return one keyset page when asked with ?page_size= or ?cursor=;
+    # next/prev URLs are in the Link header
+    'DEFAULT_PAGINATION_CLASS': 'inventory.pagination.LinkHeaderCursorPagination',
+    'PAGE_SIZE': 100,
 }
 
 # JWT Authentication settings
@@ -210,12 +228,34 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
     'cache-control',
     'pragma',
+    'idempotency-key',
+    'if-none-match',
 ]
 CORS_EXPOSE_HEADERS = [
     'content-type',
     'x-csrftoken',
+    'idempotent-replayed',
+    'link',
+    'etag',
+    'content-disposition',
 ]
 
+# How long stored Idempotency-Key responses are kept (see purge_idempotency_keys)
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# How long a pending order holds its stock before the sweeper releases it
+STOCK_RESERVATION_TTL_MINUTES = int(os.getenv("STOCK_RESERVATION_TTL_MINUTES", "30"))
+
+# Opt-in write-behind for /api/inventory/events/: events are batched and
+# committed every INTERVAL_MS or MAX_EVENTS, whichever comes first
+INVENTORY_GROUP_COMMIT = os.getenv("INVENTORY_GROUP_COMMIT", "False").lower() == "true"
+INVENTORY_GROUP_COMMIT_INTERVAL_MS = int(os.getenv("INVENTORY_GROUP_COMMIT_INTERVAL_MS", "50"))
+INVENTORY_GROUP_COMMIT_MAX_EVENTS = int(os.getenv("INVENTORY_GROUP_COMMIT_MAX_EVENTS", "500"))
+
+# Opt-in values()-based serialization for the product, inventory and stock
+# alert lists; responses are byte-identical to the regular serializers
+FAST_LIST_SERIALIZERS = os.getenv("FAST_LIST_SERIALIZERS", "False").lower() == "true"
+
 # Security settings
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = False  # Set to True in production
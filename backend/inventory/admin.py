@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, InventoryTransaction, Order, OrderItem, StockAlert
+from .models import Product, InventoryTransaction, Order, OrderItem, StockAlert, StockMovement, StockCheckpoint, StockReservation, StockStripe
 
 # Register your models here.
 admin.site.register(Product)
@@ -7,3 +7,7 @@ admin.site.register(InventoryTransaction)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(StockAlert)
+admin.site.register(StockMovement)
+admin.site.register(StockCheckpoint)
+admin.site.register(StockReservation)
+admin.site.register(StockStripe)
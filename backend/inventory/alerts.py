@@ -0,0 +1,93 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Subquery
+
+from .changes import record_changes
+from .models import Product, StockAlert
+from .stripes import live_stock
+
+# Keeps each IN (...) list under SQLite's host parameter limit
+RECONCILE_CHUNK_SIZE = 900
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, 'dirty'):
+        _state.dirty = set()
+        _state.depth = 0
+    return _state
+
+
+def newly_low_products(product_ids):
+    """Products among ``product_ids`` below their threshold with no open alert, annotated with live ``stock``."""
+    return Product.objects.filter(pk__in=product_ids).annotate(stock=live_stock()).filter(
+        stock__lt=F('threshold_level')
+    ).filter(~Exists(StockAlert.objects.filter(product=OuterRef('pk'), resolved=False)))
+
+
+def reconcile_stock_alerts(product_ids):
+    """
+    Brings StockAlert rows in line with current stock for the given products.
+
+    Products below their threshold end up with exactly one unresolved alert
+    carrying the current stock level; products at or above it have their open
+    alerts resolved. Levels of striped hot products are summed from their
+    stripes. Each chunk of ids costs a fixed number of statements: one UPDATE
+    to resolve, one UPDATE to refresh levels, one SELECT and, when products
+    became low, one INSERT and one SELECT of the new ids. The INSERT skips
+    products a concurrent reconciliation opened an alert for in the
+    meantime; the unique constraint on open alerts keeps it to one each.
+    """
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), RECONCILE_CHUNK_SIZE):
+        chunk = product_ids[start:start + RECONCILE_CHUNK_SIZE]
+        open_alerts = StockAlert.objects.filter(product_id__in=chunk, resolved=False)
+        products = Product.objects.filter(pk__in=chunk).annotate(stock=live_stock())
+        low = products.filter(stock__lt=F('threshold_level'))
+
+        open_alerts.exclude(product__in=low.values('pk')).update(resolved=True)
+        open_alerts.filter(product__in=low.values('pk')).update(
+            stock_level=Subquery(products.filter(pk=OuterRef('product_id')).values('stock')[:1])
+        )
+
+        newly_low = newly_low_products(chunk).values_list('pk', 'stock')
+        alerts = [StockAlert(product_id=pk, stock_level=quantity) for pk, quantity in newly_low]
+        if alerts:
+            StockAlert.objects.bulk_create(alerts, ignore_conflicts=True)
+            # Inserts that ignore conflicts return no ids, so read them back for the change feed
+            record_changes('stockalert', open_alerts.filter(
+                product_id__in=[alert.product_id for alert in alerts]
+            ).values_list('pk', flat=True))
+
+
+def mark_dirty(product_ids):
+    """
+    Records that stock or thresholds changed for these products.
+
+    Inside a ``deferred_alerts()`` block the ids are collected and reconciled
+    once when the block exits; otherwise they are reconciled straight away.
+    """
+    state = _pending()
+    if state.depth:
+        state.dirty.update(product_ids)
+    else:
+        reconcile_stock_alerts(product_ids)
+
+
+@contextmanager
+def deferred_alerts():
+    """Defers stock alert reconciliation for every write in the block to its end."""
+    state = _pending()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if not state.depth and state.dirty:
+            dirty, state.dirty = state.dirty, set()
+            # Writes in a transaction that is being rolled back need no alerts
+            if not connection.needs_rollback:
+                reconcile_stock_alerts(dirty)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from .rollups import connect_rollup_signals
+        from .versions import connect_version_signals
+        connect_version_signals()
+        connect_rollup_signals()
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+# Models that appear in the change feed, the feed name their writes are
+# reported under and the field holding that object's id. Order items and
+# stock stripes are part of their order's and product's representation.
+CHANGE_FEED = {
+    'Product': ('product', 'pk'),
+    'StockStripe': ('product', 'product_id'),
+    'InventoryTransaction': ('inventorytransaction', 'pk'),
+    'Order': ('order', 'pk'),
+    'OrderItem': ('order', 'order_id'),
+    'StockAlert': ('stockalert', 'pk'),
+}
+HORIZON = 'changelog-horizon'
+
+
+def record_changes(name, object_ids, action='upsert'):
+    """Appends one change per object in the current transaction."""
+    from .models import ChangeLog
+    object_ids = {pk for pk in object_ids if pk is not None}
+    if object_ids:
+        ChangeLog.objects.bulk_create([
+            ChangeLog(model=name, object_id=pk, action=action) for pk in sorted(object_ids)
+        ])
+
+
+def horizon():
+    """Highest change id whose tombstone may have been purged; older cursors cannot be served."""
+    from .versions import get_versions
+    return get_versions([HORIZON])[0]
+
+
+def latest_cursor():
+    """Cursor to start syncing from after loading the lists; never below the horizon."""
+    from .models import ChangeLog
+    return max(ChangeLog.objects.aggregate(latest=Max('id'))['latest'] or 0, horizon())
+
+
+def changes_since(cursor, limit):
+    """
+    Returns ``(changes, next_cursor, more)``: at most ``limit`` log entries
+    after ``cursor`` compacted to the last write per object, in log order.
+    """
+    from .models import ChangeLog
+    entries = list(
+        ChangeLog.objects.filter(id__gt=cursor).order_by('id').values_list('id', 'model', 'object_id', 'action')[:limit + 1]
+    )
+    more = len(entries) > limit
+    entries = entries[:limit]
+    last = {}
+    for entry_id, model, object_id, action in entries:
+        last.pop((model, object_id), None)
+        last[(model, object_id)] = (entry_id, action)
+    changes = [(model, object_id, action) for (model, object_id), (_, action) in last.items()]
+    return changes, (entries[-1][0] if entries else cursor), more
+
+
+def compact_change_log(retention_days):
+    """
+    Deletes entries superseded by a later entry for the same object, then
+    tombstones older than ``retention_days``. Cursors below the newest purged
+    tombstone can no longer be served; that id is stored as the horizon.
+    Returns ``(superseded, purged)``.
+    """
+    from .models import ChangeLog, DataVersion
+    latest = ChangeLog.objects.values('model', 'object_id').annotate(last=Max('id')).values('last')
+    superseded, _ = ChangeLog.objects.exclude(id__in=latest).delete()
+
+    expired = ChangeLog.objects.filter(
+        action='delete', changed_at__lt=timezone.now() - timedelta(days=retention_days)
+    )
+    newest = expired.aggregate(newest=Max('id'))['newest']
+    purged = 0
+    if newest is not None:
+        purged, _ = expired.delete()
+        DataVersion.objects.update_or_create(name=HORIZON, shard=0, defaults={'version': max(newest, horizon())})
+    return superseded, purged
@@ -3,7 +3,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Sum, F, FloatField, Count, Avg
-from .models import Product, Order, OrderItem, InventoryTransaction, ChatSession
+from .models import Product, Order, OrderItem, InventoryTransaction, ChatSession, DailySales
+from .kpis import cached_dashboard_kpis
+from .rollups import sales_day
+from .search import question_product_ids
+from .stripes import live_stock
 from .utils import generate_text, clean_ai_response
 import logging
 import json
@@ -31,43 +35,15 @@ class ChatbotAPIView(APIView):
             return None
 
     def get_inventory_stats(self):
-        """Get real-time inventory statistics."""
+        """Get real-time inventory statistics from the cached dashboard KPIs."""
         try:
-            # Get base statistics
-            total_products = Product.objects.count()
-            low_stock = Product.objects.filter(quantity_in_stock__lte=F('threshold_level')).count()
-            out_of_stock = Product.objects.filter(quantity_in_stock=0).count()
-            categories = Product.objects.values('category').distinct().count()
-            
-            # Get aggregated values with proper null handling
-            value_agg = Product.objects.aggregate(
-                total=Sum(F('price') * F('quantity_in_stock'), output_field=FloatField()),
-                avg=Avg('price', output_field=FloatField())
-            )
-            
-            stats = {
-                'total_products': total_products,
-                'low_stock': low_stock,
-                'out_of_stock': out_of_stock,
-                'categories': categories,
-                'total_value': value_agg['total'] if value_agg['total'] is not None else 0,
-                'avg_price': value_agg['avg'] if value_agg['avg'] is not None else 0
+            kpis = cached_dashboard_kpis()
+            return {
+                key: kpis[key] for key in (
+                    'total_products', 'low_stock', 'out_of_stock', 'categories', 'total_value', 'avg_price',
+                    'top_categories',
+                )
             }
-
-            # Get category statistics with proper null handling
-            category_stats = Product.objects.values('category').annotate(
-                value=Coalesce(Sum(F('price') * F('quantity_in_stock'), output_field=FloatField()), 0.0)
-            ).order_by('-value')[:3]
-
-            stats['top_categories'] = [
-                {
-                    'category': cat['category'],
-                    'value': cat['value']
-                }
-                for cat in category_stats[:3]
-            ]
-
-            return stats
         except Exception as e:
             logger.error(f"Error getting inventory stats: {e}")
             return {}
@@ -75,19 +51,21 @@ class ChatbotAPIView(APIView):
     def get_product_insights(self):
         """Get detailed product insights."""
         try:
+            # Live stock counts striped products without folding (a write) on every question
+            products = Product.objects.annotate(stock=live_stock())
             insights = {
-                'critical_stock': list(Product.objects.filter(
-                    quantity_in_stock__lte=F('threshold_level')
-                ).values('name', 'quantity_in_stock', 'threshold_level', 'category')),
+                'critical_stock': list(products.filter(
+                    stock__lte=F('threshold_level')
+                ).values('name', 'stock', 'threshold_level', 'category')),
 
-                'top_value': list(Product.objects.annotate(
-                    total_value=F('price') * F('quantity_in_stock')
+                'top_value': list(products.annotate(
+                    total_value=F('price') * F('stock')
                 ).order_by('-total_value')[:5].values(
-                    'name', 'total_value', 'price', 'quantity_in_stock'
+                    'name', 'total_value', 'price', 'stock'
                 )),
 
-                'zero_stock': list(Product.objects.filter(
-                    quantity_in_stock=0
+                'zero_stock': list(products.filter(
+                    stock=0
                 ).values('name', 'category', 'threshold_level'))
             }
 
@@ -96,15 +74,29 @@ class ChatbotAPIView(APIView):
             logger.error(f"Error getting product insights: {e}")
             return {}
 
+    def get_matching_products(self, query, limit=5):
+        """Products the question most likely refers to, from the product search index."""
+        try:
+            ids = question_product_ids(query, limit=limit)
+            products = Product.objects.filter(pk__in=ids).annotate(stock=live_stock()).in_bulk()
+            return [
+                {'name': products[pk].name, 'category': products[pk].category,
+                 'stock': products[pk].stock, 'price': products[pk].price}
+                for pk in ids if pk in products
+            ]
+        except Exception as e:
+            logger.error(f"Error searching products: {e}")
+            return []
+
     def get_recent_activity(self):
         """Get recent inventory activity."""
         try:
             end_date = now()
             start_date = end_date - timedelta(days=30)
 
-            recent_orders = Order.objects.filter(
-                order_date__range=(start_date, end_date)
-            ).count()
+            recent_orders = DailySales.objects.filter(
+                product__isnull=True, day__gte=sales_day(start_date)
+            ).aggregate(total=Sum('orders'))['total'] or 0
 
             new_products = Product.objects.filter(
                 date_added__range=(start_date, end_date)
@@ -217,6 +209,15 @@ class ChatbotAPIView(APIView):
                 f"- Out of Stock Items: {stats.get('out_of_stock_count', 0)}"
             ]
 
+            matching = [] if excel_data else self.get_matching_products(query)
+            if matching:
+                context.append("\n## Products Matching the Question")
+                for product in matching:
+                    context.append(
+                        f"- {product['name']} ({product['category'] or 'Uncategorized'}): "
+                        f"{product['stock']} in stock at ${product['price']:,.2f}"
+                    )
+
             # Add category breakdown if available
             if stats.get('categories_breakdown'):
                 context.extend([
@@ -0,0 +1,139 @@
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+import zlib
+
+import orjson
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+# Rows fetched per round trip; also the number of rows written per yielded chunk
+EXPORT_CHUNK_SIZE = 2000
+# zlib's default level: about as small as 9 on this data at twice the speed
+GZIP_LEVEL = 6
+
+
+def _timestamp(value):
+    """ISO 8601 with a 'Z' suffix, as the JSON API writes datetimes; the database returns them in UTC."""
+    return value.isoformat().replace('+00:00', 'Z')
+
+
+# Exportable datasets: the model, the date field the range filter applies
+# to, an ordering an index serves without sorting the table, and the
+# (header, lookup) of every column. Order items carry their order's date
+# and status and follow order ids, which grow with the order date.
+EXPORTS = {
+    'orders': (
+        'Order', 'order_date', ('order_date', 'id'),
+        [('id', 'id'), ('order_date', 'order_date'), ('status', 'status'),
+         ('customer_name', 'customer_name'),
+         # Stored as E.164 text; reading it raw skips parsing every number
+         ('telephone_number', Cast('telephone_number', output_field=CharField())),
+         ('total_amount', 'total_amount')],
+    ),
+    'order-items': (
+        'OrderItem', 'order__order_date', ('order_id', 'id'),
+        [('id', 'id'), ('order_id', 'order_id'), ('order_date', 'order__order_date'),
+         ('order_status', 'order__status'), ('product_id', 'product_id'), ('product_name', 'product__name'),
+         ('quantity', 'quantity'), ('price', 'price')],
+    ),
+    'inventory': (
+        'InventoryTransaction', 'transaction_date', ('transaction_date', 'id'),
+        [('id', 'id'), ('transaction_date', 'transaction_date'), ('transaction_type', 'transaction_type'),
+         ('product_id', 'product_id'), ('product_name', 'product__name'), ('quantity', 'quantity'),
+         ('extra_charge_percent', 'extra_charge_percent'), ('transaction_cost', 'transaction_cost')],
+    ),
+}
+
+
+def export_rows(dataset, date_after=None, date_before=None):
+    """
+    Returns ``(header, rows)`` for an export; ``rows`` is a lazy iterator of
+    tuples read ``EXPORT_CHUNK_SIZE`` at a time, so memory does not grow
+    with the export. The date range is inclusive and in whole days (UTC).
+    """
+    from . import models
+    model_name, date_field, ordering, columns = EXPORTS[dataset]
+    queryset = getattr(models, model_name).objects.order_by(*ordering)
+    if date_after:
+        queryset = queryset.filter(**{f'{date_field}__gte': timezone.make_aware(datetime.combine(date_after, time.min))})
+    if date_before:
+        end = datetime.combine(date_before + timedelta(days=1), time.min)
+        queryset = queryset.filter(**{f'{date_field}__lt': timezone.make_aware(end)})
+
+    header = [name for name, _ in columns]
+    timestamps = [i for i, (_, lookup) in enumerate(columns) if isinstance(lookup, str) and lookup.endswith('_date')]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def formatted():
+        for row in rows:
+            row = list(row)
+            for i in timestamps:
+                row[i] = _timestamp(row[i])
+            yield row
+    return header, formatted()
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def csv_stream(header, rows):
+    """Encodes rows as CSV, yielding one bytes chunk per EXPORT_CHUNK_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for chunk in _chunks(rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _default(value):
+    # Decimals stay strings, as in the JSON API; phone numbers become E.164
+    return str(value)
+
+
+def ndjson_stream(header, rows):
+    """Encodes rows as one JSON object per line, yielding one bytes chunk per EXPORT_CHUNK_SIZE rows."""
+    for chunk in _chunks(rows):
+        yield b''.join(
+            orjson.dumps(dict(zip(header, row)), default=_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in chunk
+        )
+
+
+def gzip_stream(chunks):
+    """Compresses a stream of bytes chunks into one gzip file, chunk by chunk."""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson'),
+}
+
+
+def export_stream(dataset, data_format, date_after=None, date_before=None, gzip=False):
+    """The encoded export as an iterator of bytes chunks, gzipped when ``gzip`` is set."""
+    header, rows = export_rows(dataset, date_after, date_before)
+    encode, _ = EXPORT_FORMATS[data_format]
+    chunks = encode(header, rows)
+    return gzip_stream(chunks) if gzip else chunks
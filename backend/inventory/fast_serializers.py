@@ -0,0 +1,166 @@
+from decimal import Decimal
+from operator import itemgetter
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import InventorySerializer, ProductSerializer, StockAlertSerializer
+
+# Field types whose to_representation() is a no-op for values read from the database
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.IntegerField, serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def _default(value):
+    # Same fallback as DRF's JSONEncoder for Decimals left uncoerced
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def _skip_none(convert):
+    return lambda value: None if value is None else convert(value)
+
+
+def _converter(field):
+    """Returns the function that turns a database value into what ``field`` would output, or None."""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DecimalField):
+        quantize = field.quantize
+        coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if coerce and not field.localize and not field.normalize_output:
+            return _skip_none(lambda value: format(quantize(value), 'f'))
+        return _skip_none(field.to_representation)
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            # orjson writes the datetime itself; OPT_UTC_Z matches DRF's trailing 'Z'
+            return _skip_none(field.enforce_timezone)
+    return _skip_none(field.to_representation)
+
+
+class FastSerializer:
+    """
+    Read-only twin of a ModelSerializer for large list pages. The serializer's
+    fields are compiled once into ``(name, lookups, read)`` accessors that
+    work on ``.values()`` rows, so no model instances or serializer fields
+    are created per row. Fields the compiler cannot map from columns, such as
+    SerializerMethodFields, are given explicitly in ``overrides`` as
+    ``name -> (lookups, read)``. The rendered bytes are the same as the
+    serializer's output through DRF's JSONRenderer.
+    """
+
+    def __init__(self, serializer_class, overrides=None):
+        self.serializer_class = serializer_class
+        self.overrides = overrides or {}
+        self._accessors = None
+
+    @property
+    def accessors(self):
+        if self._accessors is None:
+            self._accessors = self.compile(self.serializer_class(), '')
+        return self._accessors
+
+    def compile(self, serializer, prefix):
+        accessors = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if not prefix and name in self.overrides:
+                lookups, read = self.overrides[name]
+                accessors.append((name, tuple(lookups), read))
+                continue
+            if field.source == '*' or isinstance(field, (serializers.ListSerializer, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{name} needs an override to use the fast path.'
+                )
+            lookup = prefix + '__'.join(field.source_attrs)
+            if isinstance(field, serializers.BaseSerializer):
+                accessors.append(self.nested(field, lookup))
+                continue
+            get, convert = itemgetter(lookup), _converter(field)
+            read = get if convert is None else (lambda row, get=get, convert=convert: convert(get(row)))
+            accessors.append((name, (lookup,), read))
+        return accessors
+
+    def nested(self, serializer, lookup):
+        children = self.compile(serializer, lookup + '__')
+        get_pk = itemgetter(lookup)
+
+        def read(row):
+            if get_pk(row) is None:
+                return None
+            return {name: child(row) for name, _, child in children}
+        return serializer.field_name, (lookup,) + tuple(l for _, lookups, _ in children for l in lookups), read
+
+    def select(self, request):
+        """Applies ``?fields=`` the same way SparseFieldsMixin does."""
+        accessors = self.accessors
+        fields = request.query_params.get('fields')
+        if fields:
+            wanted = {name.strip() for name in fields.split(',')}
+            if wanted & {name for name, _, _ in accessors}:
+                accessors = [accessor for accessor in accessors if accessor[0] in wanted]
+        return accessors
+
+    @staticmethod
+    def lookups(accessors, *extra):
+        return list(dict.fromkeys(extra + tuple(l for _, lookups, _ in accessors for l in lookups)))
+
+    @staticmethod
+    def render(rows, accessors):
+        data = [{name: read(row) for name, _, read in accessors} for row in rows]
+        content = orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z)
+        # DRF's JSONRenderer escapes these two so the output is also valid JavaScript
+        if b'\xe2\x80' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+product_fast_serializer = FastSerializer(ProductSerializer, overrides={
+    # Striped products read their stock from the live_stock annotation
+    'quantity_in_stock': (('live_stock',), itemgetter('live_stock')),
+})
+inventory_fast_serializer = FastSerializer(InventorySerializer, overrides={
+    'transaction_month': (('transaction_date',), lambda row: row['transaction_date'].strftime('%Y-%m')),
+})
+stock_alert_fast_serializer = FastSerializer(StockAlertSerializer)
+
+
+class FastListMixin:
+    """
+    Serves GET list requests through ``fast_serializer`` when
+    FAST_LIST_SERIALIZERS is on and the client asked for JSON. Filtering and
+    pagination run exactly as for the regular path.
+    """
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZERS or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        accessors = self.fast_serializer.select(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its position from the ordering columns of each row
+        get_ordering = getattr(self.paginator, 'get_ordering', None)
+        ordering = get_ordering(request, queryset, self) if get_ordering else ()
+        columns = self.fast_serializer.lookups(accessors, *(column.lstrip('-') for column in ordering))
+        rows = queryset.values(*columns)
+
+        page = self.paginate_queryset(rows)
+        response = HttpResponse(
+            FastSerializer.render(rows if page is None else page, accessors),
+            content_type='application/json',
+        )
+        if page is not None:
+            link = self.paginator.get_link_header()
+            if link:
+                response['Link'] = link
+        return response
@@ -0,0 +1,101 @@
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+
+from .models import Product, Order, InventoryTransaction
+from .stripes import live_stock
+
+
+def prefix_filter(queryset, field, value):
+    """
+    Case-insensitive prefix match written as a range on ``Lower(field)``, so
+    it can seek on the matching expression index; ``LIKE 'x%'`` cannot.
+    """
+    value = value.strip().lower()
+    if not value:
+        return queryset
+    alias = f'{field}_lower'
+    bounds = {f'{alias}__gte': value}
+    if ord(value[-1]) < 0x10FFFF:
+        bounds[f'{alias}__lt'] = value[:-1] + chr(ord(value[-1]) + 1)
+    return queryset.alias(**{alias: Lower(field)}).filter(**bounds)
+
+
+def stock_matches(lookup, value):
+    """
+    Products whose live stock matches ``lookup`` against ``value``, as two
+    ``pk IN (...)`` subqueries SQLite runs as an index OR: unstriped rows test
+    the stock column through its indexes, striped rows (product_striped_idx)
+    sum their stripes. Nothing is folded, so a GET never writes.
+    """
+    column = Product.objects.filter(stock_stripes=0, **{f'quantity_in_stock__{lookup}': value})
+    striped = Product.objects.filter(stock_stripes__gt=0).annotate(stock=live_stock()).filter(
+        **{f'stock__{lookup}': value}
+    )
+    return Q(pk__in=column.values('pk')) | Q(pk__in=striped.values('pk'))
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+def ids_filter(queryset, name, value):
+    """``?ids=1,2,3``: fetches those rows with one ``IN`` query, at most one page's worth."""
+    from .pagination import LinkHeaderCursorPagination
+    if len(value) > LinkHeaderCursorPagination.max_page_size:
+        raise ValidationError(
+            {'error': f'Request at most {LinkHeaderCursorPagination.max_page_size} ids at a time.'}
+        )
+    return queryset.filter(pk__in=value)
+
+
+# ✅ Product Filters
+class ProductFilter(filters.FilterSet):
+    category = filters.CharFilter(field_name='category')
+    price = filters.RangeFilter(field_name='price')  # ?price_min=&price_max=
+    low_stock = filters.BooleanFilter(method='filter_low_stock')
+    out_of_stock = filters.BooleanFilter(method='filter_out_of_stock')
+    name = filters.CharFilter(method='filter_name')
+    ids = NumberInFilter(method=ids_filter)
+
+    class Meta:
+        model = Product
+        fields = ['category', 'price', 'low_stock', 'out_of_stock', 'name', 'ids']
+
+    def filter_low_stock(self, queryset, name, value):
+        low = stock_matches('lt', F('threshold_level'))
+        return queryset.filter(low) if value else queryset.exclude(low)
+
+    def filter_out_of_stock(self, queryset, name, value):
+        out = stock_matches('exact', 0)
+        return queryset.filter(out) if value else queryset.exclude(out)
+
+    def filter_name(self, queryset, name, value):
+        return prefix_filter(queryset, 'name', value)
+
+
+# ✅ Order Filters
+class OrderFilter(filters.FilterSet):
+    status = filters.ChoiceFilter(choices=Order.ORDER_STATUSES)
+    date = filters.DateFromToRangeFilter(field_name='order_date')  # ?date_after=&date_before=
+    customer = filters.CharFilter(method='filter_customer')
+    ids = NumberInFilter(method=ids_filter)
+
+    class Meta:
+        model = Order
+        fields = ['status', 'date', 'customer', 'ids']
+
+    def filter_customer(self, queryset, name, value):
+        return prefix_filter(queryset, 'customer_name', value)
+
+
+# ✅ Inventory Transaction Filters
+class InventoryFilter(filters.FilterSet):
+    type = filters.ChoiceFilter(field_name='transaction_type', choices=InventoryTransaction.TRANSACTION_TYPES)
+    product = filters.NumberFilter(field_name='product_id')
+    date = filters.DateFromToRangeFilter(field_name='transaction_date')
+
+    class Meta:
+        model = InventoryTransaction
+        fields = ['type', 'product', 'date']
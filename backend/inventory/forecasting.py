@@ -0,0 +1,223 @@
+from datetime import timedelta
+from operator import itemgetter
+from statistics import NormalDist
+
+import numpy as np
+from django.db import connections
+from django.utils import timezone
+
+# Weekly seasonality for Holt-Winters; it needs three full seasons of history
+SEASON_LENGTH = 7
+# Days of one-step errors skipped while the states settle; every method is scored on the same days
+BURN_IN = 2 * SEASON_LENGTH
+# Smoothing parameters tried for every SKU; each SKU keeps the one with the
+# lowest one-step squared error. Holt-Winters takes (level, trend, season).
+SES_ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+HOLT_WINTERS_PARAMS = tuple(
+    (alpha, beta, gamma) for alpha in (0.1, 0.3) for beta in (0.001, 0.01) for gamma in (0.05, 0.2)
+)
+CROSTON_ALPHAS = (0.05, 0.1, 0.2, 0.3)
+# Average days between sales above which demand is intermittent and goes to Croston (Syntetos & Boylan)
+INTERMITTENT_INTERVAL = 1.32
+
+METHODS = ('ses', 'holt_winters', 'croston')
+
+
+def demand_matrix(start, end):
+    """
+    Units sold per day and product between ``start`` and ``end`` (inclusive
+    dates) as ``(product_ids, matrix)``: one daily sales rollup query, with
+    days as rows and products that sold in the window as columns.
+    """
+    from .models import DailySales
+    days = (end - start).days + 1
+    sales = DailySales.objects.filter(product__isnull=False, day__range=(start, end), units__gt=0).values_list(
+        'product_id', 'day', 'units'
+    )
+    # Raw rows skip the per-row field converters. Days come back as dates or
+    # ISO strings depending on the backend; both map to their row.
+    sql, params = sales.query.sql_with_params()
+    with connections[sales.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    offset_of = {}
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        offset_of[day] = offset_of[day.isoformat()] = offset
+    products = np.fromiter(map(itemgetter(0), rows), np.int64, len(rows))
+    offsets = np.fromiter(map(offset_of.__getitem__, map(itemgetter(1), rows)), np.int64, len(rows))
+    product_ids, columns = np.unique(products, return_inverse=True)
+    matrix = np.zeros((days, len(product_ids)), dtype=np.float32)
+    # The rollup holds one row per product and day
+    matrix[offsets, columns] = np.fromiter(map(itemgetter(2), rows), np.float32, len(rows))
+    return product_ids, matrix
+
+
+def _ses(history, alphas):
+    """Simple exponential smoothing for every alpha (rows) and SKU (columns) at once."""
+    alpha = np.asarray(alphas, dtype=history.dtype)[:, None]
+    level = np.repeat(history[:1], len(alphas), axis=0)
+    sse, error = np.zeros_like(level), np.empty_like(level)
+    # In-place updates: the loop runs once per day over every SKU and parameter
+    for t in range(1, len(history)):
+        np.subtract(history[t], level, out=error)
+        if t >= BURN_IN:
+            sse += error ** 2
+        error *= alpha
+        level += error
+    return sse, level
+
+
+def _holt_winters(history, params, m=SEASON_LENGTH):
+    """
+    Additive Holt-Winters (level, trend, weekly season) in error-correction
+    form, vectorized like _ses. ``season`` is indexed by day of the cycle first.
+    """
+    alpha, beta, gamma = (np.asarray(values, dtype=history.dtype)[:, None] for values in zip(*params))
+    first, second = history[:m].mean(axis=0), history[m:2 * m].mean(axis=0)
+    level = np.repeat(first[None, :], len(params), axis=0)
+    trend = np.repeat(((second - first) / m)[None, :], len(params), axis=0)
+    season = np.repeat((history[:m] - first)[:, None, :], len(params), axis=1)
+    sse, error, step = np.zeros_like(level), np.empty_like(level), np.empty_like(level)
+    for t in range(len(history)):
+        current = season[t % m]
+        level += trend
+        np.add(level, current, out=error)
+        np.subtract(history[t], error, out=error)
+        if t >= BURN_IN:
+            sse += error ** 2
+        level += np.multiply(alpha, error, out=step)
+        trend += np.multiply(beta, error, out=step)
+        current += np.multiply(gamma, error, out=step)
+    return sse, level, trend, season
+
+
+def _croston(history, alphas):
+    """
+    Croston's method with the Syntetos-Boylan bias correction: demand size
+    and the interval between sales are smoothed separately, on sale days only.
+    """
+    alpha = np.asarray(alphas, dtype=history.dtype)[:, None]
+    bias = 1 - alpha / 2
+    days, skus = len(history), np.arange(history.shape[1])
+    sold = history > 0
+    first_sale = sold.argmax(axis=0)
+    last_sale = days - 1 - sold[::-1].argmax(axis=0)
+    # Seed the interval with the mean gap between the observed sales, not the wait for the first one
+    gaps = (last_sale - first_sale) / np.maximum(np.count_nonzero(sold, axis=0) - 1, 1)
+    size = np.repeat(history[first_sale, skus][None, :], len(alphas), axis=0)
+    interval = np.repeat(np.maximum(gaps, 1)[None, :].astype(history.dtype), len(alphas), axis=0)
+    since = np.zeros(history.shape[1], dtype=history.dtype)
+    sse, error, step = np.zeros_like(size), np.empty_like(size), np.empty_like(size)
+    scored = np.zeros(history.shape[1], dtype=history.dtype)
+    for t in range(len(history)):
+        y = history[t]
+        started = t > first_sale
+        if t >= BURN_IN:
+            np.divide(size, interval, out=error)
+            error *= bias
+            np.subtract(y, error, out=error)
+            error **= 2
+            error *= started
+            sse += error
+            scored += started
+        since += 1
+        # Smooth only on sale days after the first: the masks zero the other steps
+        update = alpha * ((y > 0) & started)
+        size += np.multiply(update, np.subtract(y, size, out=step), out=step)
+        interval += np.multiply(update, np.subtract(since, interval, out=step), out=step)
+        since *= y == 0
+    return sse, size, interval, np.maximum(scored, 1)
+
+
+def _horizon_spread(weights, horizon):
+    """
+    sqrt(sum over j of C(H - j)^2) for a linear innovations model, where
+    C(k) = 1 + c(1) + ... + c(k) and ``weights(i)`` gives c(i) per SKU:
+    the horizon total's standard deviation in units of one-step errors.
+    """
+    impulses = np.vstack([np.ones_like(weights(1))] + [weights(i) for i in range(1, horizon)])
+    return np.sqrt((np.cumsum(impulses, axis=0) ** 2).sum(axis=0))
+
+
+def fit_forecasts(matrix, horizon=30, level=0.8):
+    """
+    Forecasts ``horizon`` days of demand for every column of a days x SKUs
+    matrix. Intermittent SKUs use Croston; the others use simple exponential
+    smoothing or Holt-Winters, whichever fits their history better. Returns
+    a dict of per-SKU arrays: ``method``, ``total`` (units over the
+    horizon), ``daily`` (its mean per day) and the ``lower``/``upper``
+    bounds of the ``level`` prediction interval for the total, from the
+    in-sample one-step errors.
+    """
+    # float32 halves the memory traffic of the per-day loops; rounding stays far below demand noise
+    history = np.asarray(matrix, dtype=np.float32)
+    days, skus = history.shape
+    scored_days = max(days - BURN_IN, 1)
+    steps = np.arange(1, horizon + 1)
+    method = np.zeros(skus, dtype=np.int64)
+    total, mse, spread = np.zeros(skus), np.zeros(skus), np.zeros(skus)
+
+    # Average days between sales, counted from each SKU's first sale so new products are not intermittent
+    sold = history > 0
+    selling_days = days - sold.argmax(axis=0)
+    intermittent = selling_days / np.maximum(np.count_nonzero(sold, axis=0), 1) > INTERMITTENT_INTERVAL
+    smooth = ~intermittent
+
+    if smooth.any():
+        series = history[:, smooth]
+        picked = np.arange(series.shape[1])
+        sse, ses_level = _ses(series, SES_ALPHAS)
+        best = sse.argmin(axis=0)
+        ses_alpha = np.asarray(SES_ALPHAS)[best]
+        fit_mse = sse[best, picked] / scored_days
+        fit_total = np.maximum(ses_level[best, picked], 0) * horizon
+        fit_spread = _horizon_spread(lambda i: ses_alpha, horizon)
+        fit_method = np.zeros(len(picked), dtype=np.int64)
+
+        if days >= 3 * SEASON_LENGTH:
+            sse, hw_level, hw_trend, hw_season = _holt_winters(series, HOLT_WINTERS_PARAMS)
+            best = sse.argmin(axis=0)
+            alpha, beta, gamma = (np.asarray(values)[best] for values in zip(*HOLT_WINTERS_PARAMS))
+            seasons = hw_season[(days + steps - 1) % SEASON_LENGTH][:, best, picked]
+            path = hw_level[best, picked] + steps[:, None] * hw_trend[best, picked] + seasons
+            hw_mse = sse[best, picked] / scored_days
+            hw_spread = _horizon_spread(lambda i: alpha + i * beta + gamma * (i % SEASON_LENGTH == 0), horizon)
+            better = hw_mse < fit_mse
+            fit_method[better] = 1
+            fit_mse = np.where(better, hw_mse, fit_mse)
+            fit_total = np.where(better, np.maximum(path, 0).sum(axis=0), fit_total)
+            fit_spread = np.where(better, hw_spread, fit_spread)
+
+        method[smooth], mse[smooth], total[smooth], spread[smooth] = fit_method, fit_mse, fit_total, fit_spread
+
+    if intermittent.any():
+        sse, size, interval, scored = _croston(history[:, intermittent], CROSTON_ALPHAS)
+        best = sse.argmin(axis=0)
+        picked = np.arange(sse.shape[1])
+        croston_alpha = np.asarray(CROSTON_ALPHAS)[best]
+        rate = (1 - croston_alpha / 2) * size[best, picked] / interval[best, picked]
+        method[intermittent] = 2
+        mse[intermittent] = sse[best, picked] / scored
+        total[intermittent] = rate * horizon
+        spread[intermittent] = _horizon_spread(lambda i: croston_alpha, horizon)
+
+    half_width = NormalDist().inv_cdf((1 + level) / 2) * np.sqrt(mse) * spread
+    return {
+        'method': np.asarray(METHODS)[method],
+        'total': total,
+        'daily': total / horizon,
+        'lower': np.maximum(total - half_width, 0),
+        'upper': total + half_width,
+    }
+
+
+def forecast_demand(horizon=30, history_days=365, level=0.8):
+    """
+    Fits every product that sold in the last ``history_days`` whole days
+    (today is still open and left out) and forecasts the next ``horizon``
+    days. Returns ``(product_ids, forecasts)`` as from fit_forecasts.
+    """
+    end = timezone.localdate() - timedelta(days=1)
+    product_ids, matrix = demand_matrix(end - timedelta(days=history_days - 1), end)
+    return product_ids, fit_forecasts(matrix, horizon, level)
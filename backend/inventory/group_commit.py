@@ -0,0 +1,150 @@
+import atexit
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .alerts import deferred_alerts
+from .ingest import MAX_REPORTED_ERRORS, ImportReport, _import_chunk, _parse_line
+from .models import InventoryEventReceipt
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Write-behind queue for inventory events.
+
+    Requests validate an event, append it to an in-process queue and get a
+    sequence number back straight away. A background thread drains the
+    queue every ``interval_ms`` or as soon as ``max_events`` are waiting,
+    and applies the whole batch in one transaction: one product read, one
+    stock UPDATE, one INSERT of transactions and one INSERT of receipts,
+    instead of a committed transaction per event.
+
+    Events are only durable once their receipt exists. Anything still queued
+    when the process dies is lost, which is why this mode is opt-in.
+    """
+
+    def __init__(self, interval_ms=None, max_events=None):
+        self.writer_id = uuid.uuid4().hex
+        self.interval = (interval_ms or settings.INVENTORY_GROUP_COMMIT_INTERVAL_MS) / 1000
+        # Every event in a batch needs its own line in the ImportReport
+        self.max_events = min(max_events or settings.INVENTORY_GROUP_COMMIT_MAX_EVENTS, MAX_REPORTED_ERRORS)
+        self.last_issued = 0
+        self.flushed_through = 0
+        self._queue = queue.Queue()
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._thread = None
+
+    def submit(self, records):
+        """
+        Validates and queues inventory event records, returning their sequence
+        numbers. Raises ValueError for an invalid record; nothing is queued then.
+        """
+        for record in records:
+            _parse_line(record)
+        with self._lock:
+            sequences = [next(self._sequence) for _ in records]
+            for sequence, record in zip(sequences, records):
+                self._queue.put((sequence, record))
+            if sequences:
+                self.last_issued = sequences[-1]
+            self._ensure_started()
+        return sequences
+
+    def wait(self, sequence, timeout=None):
+        """Blocks until ``sequence`` has been flushed; returns False on timeout."""
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self.flushed_through >= sequence, timeout)
+
+    def stop(self):
+        """Flushes everything queued and stops the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='inventory-group-commit', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+                batch = [first]
+                deadline = time.monotonic() + self.interval
+                stopping = False
+                while len(batch) < self.max_events:
+                    try:
+                        item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._flush(batch)
+                if stopping:
+                    return
+        finally:
+            connection.close()
+
+    def _flush(self, batch):
+        """Applies one batch of ``(sequence, record)`` events in a single transaction."""
+        report = ImportReport()
+        try:
+            with deferred_alerts(), transaction.atomic():
+                applied = _import_chunk(batch, report)
+                InventoryEventReceipt.objects.bulk_create(
+                    [
+                        InventoryEventReceipt(writer=self.writer_id, sequence=sequence,
+                                              status='applied', transaction=row)
+                        for sequence, row in applied
+                    ] + [
+                        InventoryEventReceipt(writer=self.writer_id, sequence=error['line'],
+                                              status='failed', error=error['error'][:255])
+                        for error in report.errors
+                    ]
+                )
+        except Exception as e:
+            logger.exception("Group commit of %d inventory events failed", len(batch))
+            try:
+                InventoryEventReceipt.objects.bulk_create([
+                    InventoryEventReceipt(writer=self.writer_id, sequence=sequence,
+                                          status='failed', error=str(e)[:255])
+                    for sequence, _ in batch
+                ], ignore_conflicts=True)
+            except Exception:
+                logger.exception("Could not record failed inventory events")
+        with self._flushed:
+            self.flushed_through = batch[-1][0]
+            self._flushed.notify_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Returns this process's group-commit writer, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter()
+            atexit.register(_writer.stop)
+        return _writer
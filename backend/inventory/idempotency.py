@@ -0,0 +1,77 @@
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotentPostMixin:
+    """
+    Makes POST safe to retry. When the client sends an Idempotency-Key header,
+    the first response is stored as rendered and later requests with the same
+    key get the same bytes back instead of being executed again. The lookup is one read on
+    the (key, scope) unique index.
+    """
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().post(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': f'{IDEMPOTENCY_HEADER} must be at most 255 characters.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.pk if request.user and request.user.is_authenticated else 'anon'
+        scope = f"{user_id}:{request.path}"
+        fingerprint = hashlib.sha256(request.body).hexdigest()
+
+        record = IdempotencyKey.objects.filter(key=key, scope=scope).first()
+        if record is None:
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(key=key, scope=scope, fingerprint=fingerprint)
+            except IntegrityError:
+                # A concurrent retry claimed the key first
+                record = IdempotencyKey.objects.get(key=key, scope=scope)
+            else:
+                return self._execute_and_store(record, request, *args, **kwargs)
+        return self._replay(record, fingerprint)
+
+    def _execute_and_store(self, record, request, *args, **kwargs):
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            # Server errors are not final; let the client retry for real
+            record.delete()
+            return response
+        # Render now so the stored bytes are exactly what this client receives
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if isinstance(response, Response):
+            response.render()
+        record.status_code = response.status_code
+        record.response_content = response.content
+        record.content_type = response['Content-Type']
+        record.save(update_fields=['status_code', 'response_content', 'content_type'])
+        return response
+
+    def _replay(self, record, fingerprint):
+        if record.fingerprint != fingerprint:
+            return Response({'error': f'{IDEMPOTENCY_HEADER} was already used with a different request body.'},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if record.status_code is None:
+            return Response({'error': 'A request with this Idempotency-Key is still being processed.'},
+                            status=status.HTTP_409_CONFLICT)
+        response = HttpResponse(
+            bytes(record.response_content), status=record.status_code, content_type=record.content_type
+        )
+        response[REPLAYED_HEADER] = 'true'
+        return response
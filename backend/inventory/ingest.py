@@ -0,0 +1,256 @@
+import codecs
+import csv
+import json
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Product, Order, OrderItem, InventoryTransaction, StockReservation
+from .rollups import record_new_orders
+from .stock import InsufficientStock, apply_reservation_deltas, apply_stock_deltas
+from .stripes import live_stock
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# transaction_cost is DecimalField(max_digits=12, decimal_places=2)
+MAX_TRANSACTION_COST_CENTS = 10 ** 12
+
+
+def create_orders(orders_data):
+    """
+    Creates a batch of validated orders with a fixed number of queries.
+
+    Stock for every line is checked with one product query, deducted (or
+    reserved, for pending orders) with one UPDATE each, and orders, items and
+    reservations are written with ``bulk_create``. Totals and the daily
+    sales rollup deltas are computed in memory. The batch is all-or-nothing.
+    """
+    requested, sold, held = defaultdict(int), defaultdict(int), defaultdict(int)
+    for order_data in orders_data:
+        pending = order_data.get('status', 'pending') == 'pending'
+        for item in order_data['items']:
+            requested[item['product']] += item['quantity']
+            (held if pending else sold)[item['product']] += item['quantity']
+
+    products = Product.objects.in_bulk(list(requested))
+    missing = sorted(pk for pk in requested if pk not in products)
+    if missing:
+        raise serializers.ValidationError({"error": f"Unknown product ids: {missing}"})
+
+    short = [
+        f"{products[pk].name} (requested {quantity}, available {products[pk].available_quantity})"
+        for pk, quantity in requested.items()
+        if products[pk].available_quantity < quantity
+    ]
+    if short:
+        raise serializers.ValidationError({"error": "Not enough stock for: " + ", ".join(short)})
+
+    orders, order_items = [], []
+    for order_data in orders_data:
+        fields = {k: v for k, v in order_data.items() if k != 'items'}
+        items = [
+            OrderItem(
+                product_id=item['product'],
+                quantity=item['quantity'],
+                price=products[item['product']].price * Decimal(item['quantity'])
+            )
+            for item in order_data['items']
+        ]
+        orders.append(Order(total_amount=sum(item.price for item in items), **fields))
+        order_items.append(items)
+
+    expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_TTL_MINUTES)
+    with transaction.atomic():
+        apply_stock_deltas({pk: -quantity for pk, quantity in sold.items()}, keep_reserved=True)
+        apply_reservation_deltas(held)
+        Order.objects.bulk_create(orders)
+        for order, items in zip(orders, order_items):
+            for item in items:
+                item.order = order
+        OrderItem.objects.bulk_create([item for items in order_items for item in items])
+        record_new_orders(orders, [item for items in order_items for item in items])
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                product_id=item.product_id, order=order, order_item=item,
+                quantity=item.quantity, expires_at=expires_at,
+            )
+            for order, items in zip(orders, order_items) if order.status == 'pending'
+            for item in items
+        ])
+
+    return orders
+
+
+def iter_ndjson(lines):
+    """Yields ``(line_number, record)`` from NDJSON lines, or ``(line_number, error)`` strings."""
+    for number, line in enumerate(codecs.iterdecode(lines, 'utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        yield number, record if isinstance(record, dict) else "Each line must be a JSON object"
+
+
+def iter_csv(lines):
+    """Yields ``(line_number, record)`` from CSV lines with a header row."""
+    reader = csv.DictReader(codecs.iterdecode(lines, 'utf-8-sig'))
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _parse_line(record):
+    """Validates one import record into ``(product_id, quantity, type, extra_percent or None)``."""
+    if isinstance(record, str):
+        raise ValueError(record)
+    try:
+        product_id = int(record.get('product_id') or record.get('product'))
+    except (TypeError, ValueError):
+        raise ValueError("product_id must be an integer")
+    try:
+        quantity = int(record.get('quantity'))
+    except (TypeError, ValueError):
+        raise ValueError("quantity must be an integer")
+    if quantity <= 0:
+        raise ValueError("Quantity must be greater than zero.")
+    transaction_type = (record.get('transaction_type') or '').strip().lower()
+    if transaction_type not in ('restock', 'sale'):
+        raise ValueError("transaction_type must be 'restock' or 'sale'")
+    extra = record.get('extra_charge_percent')
+    if extra in (None, ''):
+        extra = None
+    else:
+        try:
+            extra = Decimal(str(extra)).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise ValueError("extra_charge_percent must be a number")
+        if not 0 <= extra < 1000:
+            raise ValueError("extra_charge_percent must be between 0 and 999.99")
+    return product_id, quantity, transaction_type, extra
+
+
+def _transaction_costs(price_cents, extra_basis_points, quantities):
+    """
+    Vectorized ``(price + price * extra / 100) * quantity`` rounded half-even to cents,
+    matching what InventoryTransaction.save stores, in exact integer arithmetic.
+    """
+    micro = price_cents * (10000 + extra_basis_points) * quantities
+    whole, rest = np.divmod(micro, 10000)
+    return whole + (rest > 5000) + ((rest == 5000) & (whole % 2 == 1))
+
+
+def _import_chunk(lines, report):
+    """
+    Validates, costs and writes one chunk of parsed import lines and returns
+    the ``(line_number, InventoryTransaction)`` pairs that were written.
+    """
+    parsed = []
+    for number, record in lines:
+        try:
+            parsed.append((number,) + _parse_line(record))
+        except ValueError as e:
+            report.error(number, str(e))
+    if not parsed:
+        return []
+
+    for attempt in range(3):
+        products = Product.objects.only(
+            'id', 'price', 'extra_charge_percent', 'reserved_quantity'
+        ).annotate(stock=live_stock()).in_bulk({line[1] for line in parsed})
+
+        rejected = [(line[0], f"Product {line[1]} does not exist") for line in parsed if line[1] not in products]
+        known = [line for line in parsed if line[1] in products]
+        extras = [line[4] if line[4] is not None else products[line[1]].extra_charge_percent for line in known]
+        costs = _transaction_costs(
+            np.array([int(products[line[1]].price * 100) for line in known], dtype=np.int64),
+            np.array([int(extra * 100) for extra in extras], dtype=np.int64),
+            np.array([line[2] for line in known], dtype=np.int64),
+        ).tolist()
+
+        # Replay the chunk in file order so a sale after a restock sees the restock.
+        # Sales may not take stock held by reservations.
+        balance = {pk: product.stock - product.reserved_quantity for pk, product in products.items()}
+        deltas = defaultdict(int)
+        numbers, rows = [], []
+        for (number, product_id, quantity, transaction_type, _), extra, cost in zip(known, extras, costs):
+            delta = quantity if transaction_type == 'restock' else -quantity
+            if cost >= MAX_TRANSACTION_COST_CENTS:
+                rejected.append((number, "Transaction cost is too large"))
+            elif delta < 0 and balance[product_id] + delta < 0:
+                rejected.append((number, f"Not enough stock for product {product_id}"))
+            else:
+                balance[product_id] += delta
+                deltas[product_id] += delta
+                numbers.append(number)
+                rows.append(InventoryTransaction(
+                    product_id=product_id, quantity=quantity, transaction_type=transaction_type,
+                    extra_charge_percent=extra, transaction_cost=Decimal(cost) / 100,
+                ))
+
+        try:
+            with transaction.atomic():
+                apply_stock_deltas(deltas, reason='import', keep_reserved=True)
+                InventoryTransaction.objects.bulk_create(rows)
+        except InsufficientStock:
+            # Another writer moved stock since the chunk was read; replay it
+            continue
+        report.created += len(rows)
+        for number, message in rejected:
+            report.error(number, message)
+        return list(zip(numbers, rows))
+
+    for line in parsed:
+        report.error(line[0], "Stock changed concurrently; line not imported")
+    return []
+
+
+class ImportReport:
+    """Per-line outcome of an import; keeps at most MAX_REPORTED_ERRORS messages."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_transactions(records, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams ``(line_number, record)`` pairs into InventoryTransaction rows.
+
+    Lines are handled in fixed-size chunks: each chunk loads its products in
+    one query, computes transaction costs vectorized, applies one net stock
+    delta per product and bulk-inserts its transactions, so memory stays
+    bounded by the chunk size regardless of input size. Invalid lines are
+    reported and skipped; valid lines in the same chunk are still imported.
+    """
+    report = ImportReport()
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, report)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, report)
+    return report
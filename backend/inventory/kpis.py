@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, FloatField, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .versions import cached_versions
+
+# Versions bumped by every write that can move a KPI. Stock writes on
+# striped products bump 'product' through their stripes, and order item
+# writes keep the daily sales rollup in step.
+KPI_VERSION_NAMES = ('product', 'order', 'orderitem', 'stockalert')
+KPI_CACHE_KEY = 'inventory:dashboard-kpis:{}'
+# Versioned keys never go stale; the timeout only clears out superseded ones
+KPI_CACHE_SECONDS = 60 * 60
+
+
+def dashboard_kpis():
+    """
+    Every dashboard KPI from one conditional-aggregation pass per table,
+    plus the top categories by stock value. Stock is read live, so striped
+    products count without folding their stripes first.
+    """
+    from .models import DailySales, Order, Product, StockAlert
+    from .stripes import live_stock
+    products = Product.objects.annotate(stock=live_stock()).aggregate(
+        total_products=Count('id'),
+        total_stock=Coalesce(Sum('stock'), 0),
+        # At or below the threshold, the rule the chatbot's critical stock list uses too
+        low_stock=Count('id', filter=Q(stock__lte=F('threshold_level'))),
+        out_of_stock=Count('id', filter=Q(stock=0)),
+        categories=Count('category', distinct=True),
+        total_value=Coalesce(Sum(F('price') * F('stock'), output_field=FloatField()), 0.0),
+        avg_price=Coalesce(Avg('price', output_field=FloatField()), 0.0),
+    )
+    orders = Order.objects.aggregate(
+        total_orders=Count('id'),
+        completed_orders=Count('id', filter=Q(status='completed')),
+        pending_orders=Count('id', filter=Q(status='pending')),
+        total_revenue=Coalesce(Sum('total_amount', filter=Q(status='completed'), output_field=FloatField()), 0.0),
+    )
+    # Units sold across all orders, from the rollup's day totals
+    sales = DailySales.objects.filter(product__isnull=True).aggregate(total_sales=Coalesce(Sum('units'), 0))
+    alerts = StockAlert.objects.aggregate(open_alerts=Count('id', filter=Q(resolved=False)))
+    top_categories = (
+        Product.objects.annotate(stock=live_stock()).values('category')
+        .annotate(value=Coalesce(Sum(F('price') * F('stock'), output_field=FloatField()), 0.0))
+        .order_by('-value')[:3]
+    )
+    completed = orders['completed_orders']
+    return {
+        **sales,
+        'total_revenue': round(orders['total_revenue'], 2),
+        'avg_order_value': round(orders['total_revenue'] / completed, 2) if completed else 0.0,
+        'total_orders': orders['total_orders'],
+        'completed_orders': completed,
+        'pending_orders': orders['pending_orders'],
+        **products,
+        'total_value': round(products['total_value'], 2),
+        'avg_price': round(products['avg_price'], 2),
+        **alerts,
+        'top_categories': [
+            {'category': row['category'], 'value': round(row['value'], 2)} for row in top_categories
+        ],
+        'computed_at': timezone.now().isoformat(),
+    }
+
+
+def cached_dashboard_kpis():
+    """
+    dashboard_kpis() cached under the database epoch and the current data
+    versions: a hit costs one read of the version counters, and any write
+    that moves a KPI moves the key. The versions are read before the KPIs, so a concurrent write can
+    only leave an older key holding newer numbers, never the reverse.
+    """
+    key = KPI_CACHE_KEY.format('.'.join(str(version) for version in cached_versions(KPI_VERSION_NAMES)))
+    kpis = cache.get(key)
+    if kpis is None:
+        kpis = dashboard_kpis()
+        cache.set(key, kpis, KPI_CACHE_SECONDS)
+    return kpis
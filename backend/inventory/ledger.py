@@ -0,0 +1,70 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import DateTimeField, Exists, F, IntegerField, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Product, StockMovement, StockCheckpoint
+
+LEDGER_START = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def stock_as_of(when, products=None):
+    """
+    Annotates products with ``stock_as_of``, their stock level at ``when``.
+
+    Each product starts from its latest checkpoint at or before ``when`` and
+    adds only the ledger movements recorded after that checkpoint, so the scan
+    is bounded by the checkpoint interval rather than the product's history.
+    Everything is answered in a single query.
+    """
+    if products is None:
+        products = Product.objects.all()
+
+    checkpoints = StockCheckpoint.objects.filter(
+        product=OuterRef('pk'), as_of__lte=when
+    ).order_by('-as_of')
+    movements_since = StockMovement.objects.filter(
+        product=OuterRef('pk'),
+        created_at__gt=OuterRef('checkpoint_at'),
+        created_at__lte=when,
+    ).values('product').annotate(total=Sum('delta')).values('total')
+
+    return products.annotate(
+        checkpoint_at=Coalesce(
+            Subquery(checkpoints.values('as_of')[:1]), Value(LEDGER_START), output_field=DateTimeField()
+        ),
+        checkpoint_quantity=Coalesce(
+            Subquery(checkpoints.values('quantity')[:1]), Value(0), output_field=IntegerField()
+        ),
+    ).annotate(
+        stock_as_of=F('checkpoint_quantity') + Coalesce(
+            Subquery(movements_since), Value(0), output_field=IntegerField()
+        )
+    )
+
+
+def ledger_start():
+    """
+    When the stock ledger begins: its earliest movement, or None while it is
+    empty. Products that existed before then got an opening balance stamped
+    at that moment, so their earlier stock is unknown.
+    """
+    return StockMovement.objects.aggregate(start=Min('created_at'))['start']
+
+
+def create_checkpoints(when):
+    """
+    Stores a checkpoint at ``when`` for every product with ledger activity
+    since its previous checkpoint. Returns the number of checkpoints written.
+    """
+    active = stock_as_of(when).filter(
+        Exists(StockMovement.objects.filter(
+            product=OuterRef('pk'), created_at__gt=OuterRef('checkpoint_at'), created_at__lte=when
+        ))
+    )
+    checkpoints = [
+        StockCheckpoint(product_id=pk, as_of=when, quantity=quantity)
+        for pk, quantity in active.values_list('pk', 'stock_as_of')
+    ]
+    StockCheckpoint.objects.bulk_create(checkpoints, batch_size=500)
+    return len(checkpoints)
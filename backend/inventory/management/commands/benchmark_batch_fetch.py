@@ -0,0 +1,74 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from inventory.models import Product, Order, OrderItem
+
+BENCH_PREFIX = '__benchmark_batch_fetch__'
+
+
+class Command(BaseCommand):
+    help = 'Compares hydrating an order screen with per-product GETs against ?ids= and ?expand=items.product'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=20, help='Order lines, each a different product')
+        parser.add_argument('--repeat', type=int, default=50, help='Runs per strategy; the median is reported')
+
+    def handle(self, *args, **options):
+        self.cleanup()
+        products = [
+            Product.objects.create(name=f'{BENCH_PREFIX}{i}', quantity_in_stock=1000,
+                                   price=Decimal('5.00'), threshold_level=0)
+            for i in range(options['lines'])
+        ]
+        order = Order.objects.create(customer_name=BENCH_PREFIX, telephone_number='+12025550109')
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, quantity=1)
+
+        client = APIClient()
+        order_url = reverse('single-order', args=[order.pk])
+
+        def per_product():
+            items = self.get(client, order_url)['items']
+            return [self.get(client, reverse('single-product', args=[item['product']])) for item in items]
+
+        def batch_ids():
+            items = self.get(client, order_url)['items']
+            ids = ','.join(str(item['product']) for item in items)
+            return self.get(client, f"{reverse('product-list')}?ids={ids}")
+
+        def expanded():
+            return self.get(client, f'{order_url}?expand=items.product')
+
+        try:
+            for name, strategy in (('per-product GETs', per_product), ('?ids= batch', batch_ids),
+                                   ('?expand=items.product', expanded)):
+                timings = []
+                for _ in range(options['repeat']):
+                    self.requests = 0
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        strategy()
+                        timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f'{name:22} requests={self.requests:3} queries={len(queries):3} '
+                    f'median={timings[len(timings) // 2]:.1f}ms'
+                )
+        finally:
+            self.cleanup()
+
+    def get(self, client, url):
+        self.requests += 1
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}')
+        return response.json()
+
+    def cleanup(self):
+        Order.objects.filter(customer_name=BENCH_PREFIX).delete()
+        Product.objects.filter(name__startswith=BENCH_PREFIX).delete()
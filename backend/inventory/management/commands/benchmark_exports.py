@@ -0,0 +1,111 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from inventory.models import Product, InventoryTransaction, Order, OrderItem
+from inventory.versions import bump_versions
+
+BENCH_PREFIX = '__benchmark_exports__'
+INSERT_BATCH = 50000
+
+
+def _insert(model, columns, rows):
+    """Inserts raw rows in batches; the benchmark data skips signals, versions and the change log."""
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        model._meta.db_table, ', '.join(columns), ', '.join(['%s'] * len(columns))
+    )
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == INSERT_BATCH:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def _stream(client, url):
+    """Reads a streaming export to the end; returns (bytes, seconds)."""
+    started = time.perf_counter()
+    response = client.get(url)
+    if response.status_code != 200:
+        raise CommandError(f'GET {url} returned {response.status_code}')
+    size = sum(len(chunk) for chunk in response.streaming_content)
+    response.close()
+    return size, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Measures streaming export throughput and peak memory on generated orders and transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000,
+                            help='Orders, order items and inventory transactions generated, each')
+        parser.add_argument('--no-memory', action='store_true', help='Skip the traced pass that reports peak memory')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.cleanup()
+        started = time.perf_counter()
+        self.generate(rows)
+        self.stdout.write(f'generated {rows} orders, items and transactions in {time.perf_counter() - started:.1f}s')
+
+        client = APIClient()
+        try:
+            for dataset, data_format in (('orders', 'csv'), ('order-items', 'csv'), ('inventory', 'ndjson')):
+                for gzip in (False, True):
+                    url = reverse('export', args=[dataset, data_format]) + ('?gzip=true' if gzip else '')
+                    size, elapsed = _stream(client, url)
+                    line = (f'{dataset}.{data_format}{".gz" if gzip else ""}: {rows / elapsed:,.0f} rows/s '
+                            f'{size / elapsed / 2 ** 20:.1f} MiB/s size={size / 2 ** 20:.1f} MiB')
+                    if not options['no_memory']:
+                        tracemalloc.start()
+                        _stream(client, url)
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        line += f' peak={peak / 2 ** 20:.1f} MiB'
+                    self.stdout.write(line)
+        finally:
+            self.cleanup()
+
+    def generate(self, rows):
+        ops = connection.ops
+        start = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        with transaction.atomic():
+            product = Product.objects.create(name=BENCH_PREFIX, price='2.50', quantity_in_stock=0, threshold_level=0)
+            first = (Order.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+            _insert(Order, ['id', 'customer_name', 'telephone_number', 'order_date', 'status', 'total_amount'], (
+                (first + i, f'{BENCH_PREFIX}{i}', '+12025550109',
+                 ops.adapt_datetimefield_value(start + timedelta(seconds=30 * i)), 'completed', '5.00')
+                for i in range(rows)
+            ))
+            _insert(OrderItem, ['order_id', 'product_id', 'quantity', 'price'], (
+                (first + i, product.pk, 2, '5.00') for i in range(rows)
+            ))
+            _insert(InventoryTransaction, [
+                'product_id', 'quantity', 'transaction_type', 'transaction_date',
+                'extra_charge_percent', 'transaction_cost',
+            ], (
+                (product.pk, 2, 'sale', ops.adapt_datetimefield_value(start + timedelta(seconds=30 * i)),
+                 '5.00', '5.25')
+                for i in range(rows)
+            ))
+
+    def cleanup(self):
+        # Plain DELETEs: per-row delete signals would dominate the run
+        product = Product.objects.filter(name=BENCH_PREFIX).values_list('pk', flat=True).first()
+        with connection.cursor() as cursor:
+            if product:
+                for model in (OrderItem, InventoryTransaction):
+                    cursor.execute(f'DELETE FROM {model._meta.db_table} WHERE product_id = %s', [product])
+            cursor.execute(
+                f'DELETE FROM {Order._meta.db_table} WHERE customer_name LIKE %s', [BENCH_PREFIX + '%']
+            )
+        if product:
+            Product.objects.filter(pk=product).delete()
+            bump_versions('order', 'orderitem', 'inventorytransaction')
@@ -0,0 +1,77 @@
+import json
+import re
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from inventory.models import Product, InventoryTransaction, StockAlert
+
+BENCH_PREFIX = '__benchmark_fast_serializers__'
+
+
+def _walk(client, url):
+    """Follows the Link header from ``url``; returns the response bodies and the elapsed time."""
+    bodies = []
+    started = time.perf_counter()
+    while url:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}')
+        bodies.append(response.content)
+        match = re.search(r'<([^>]+)>; rel="next"', response.get('Link', ''))
+        url = match.group(1) if match else None
+    return bodies, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Compares list rows/sec through the DRF serializers and the values()-based fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows created per list')
+        parser.add_argument('--page-size', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per mode; the best is reported')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.cleanup()
+        products = Product.objects.bulk_create([
+            Product(name=f'{BENCH_PREFIX}{i}', category='Benchmark', description='Benchmark product',
+                    quantity_in_stock=100, price=Decimal('9.99'), threshold_level=0)
+            for i in range(rows)
+        ])
+        InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(product=product, quantity=2, transaction_type='restock',
+                                 transaction_cost=Decimal('20.98'))
+            for product in products
+        ])
+        StockAlert.objects.bulk_create([StockAlert(product=product, stock_level=1) for product in products])
+
+        client = APIClient()
+        query = f"?page_size={options['page_size']}"
+        try:
+            for name in ('product-list', 'inventory-list', 'stock-alert-list'):
+                url = reverse(name) + query
+                results = {}
+                for fast in (False, True):
+                    with override_settings(FAST_LIST_SERIALIZERS=fast):
+                        runs = [_walk(client, url) for _ in range(options['repeat'])]
+                    results[fast] = (runs[0][0], min(elapsed for _, elapsed in runs))
+
+                if results[True][0] != results[False][0]:
+                    raise CommandError(f'{name}: fast path output differs from the serializer')
+                total = sum(len(json.loads(body)) for body in results[False][0])
+                slow_rate, fast_rate = (total / results[mode][1] for mode in (False, True))
+                self.stdout.write(
+                    f'{name}: rows={total} serializer={slow_rate:.0f} rows/s '
+                    f'fast={fast_rate:.0f} rows/s speedup={fast_rate / slow_rate:.1f}x'
+                )
+        finally:
+            self.cleanup()
+        self.stdout.write(self.style.SUCCESS('Fast path output is byte-identical on every page'))
+
+    def cleanup(self):
+        # Transactions and alerts cascade with their products
+        Product.objects.filter(name__startswith=BENCH_PREFIX).delete()
@@ -0,0 +1,30 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from inventory.forecasting import fit_forecasts
+
+
+class Command(BaseCommand):
+    help = 'Times fit_forecasts on a generated SKU x day demand matrix (no database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skus', type=int, default=50000)
+        parser.add_argument('--days', type=int, default=730, help='Days of history per SKU')
+        parser.add_argument('--horizon', type=int, default=30)
+
+    def handle(self, *args, **options):
+        skus, days = options['skus'], options['days']
+        rng = np.random.default_rng(0)
+        # Poisson demand around a per-SKU rate, with a share of SKUs selling on only some days
+        rates = rng.gamma(1, 3, skus)
+        weekly = 1 + 0.5 * (np.arange(days) % 7 >= 5)[:, None] * (rng.random(skus) < 0.3)
+        matrix = rng.poisson(rates * weekly).astype(np.float32)
+        matrix *= rng.random((days, skus)) < rng.uniform(0.05, 1, skus)
+
+        started = time.perf_counter()
+        forecasts = fit_forecasts(matrix, options['horizon'])
+        elapsed = time.perf_counter() - started
+        methods, counts = np.unique(forecasts['method'], return_counts=True)
+        mix = ' '.join(f'{method}={count}' for method, count in zip(methods.tolist(), counts.tolist()))
+        self.stdout.write(f'{skus} SKUs x {days} days: {elapsed:.2f}s ({skus / elapsed:,.0f} SKUs/s) {mix}')
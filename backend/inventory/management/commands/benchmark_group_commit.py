@@ -0,0 +1,82 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from inventory.group_commit import GroupCommitWriter
+from inventory.models import Product, InventoryTransaction, InventoryEventReceipt
+
+BENCH_PRODUCT_NAME = '__benchmark_group_commit__'
+
+
+def _run_threads(threads, target):
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Compares inventory events/sec when each event commits on its own versus in group commits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent request threads')
+        parser.add_argument('--events', type=int, default=500, help='Events sent per thread')
+        parser.add_argument('--interval-ms', type=int, default=20, help='Group-commit flush interval')
+        parser.add_argument('--max-events', type=int, default=500, help='Group-commit batch size')
+
+    def handle(self, *args, **options):
+        threads, events = options['threads'], options['events']
+        Product.objects.filter(name=BENCH_PRODUCT_NAME).delete()
+        product = Product.objects.create(
+            name=BENCH_PRODUCT_NAME, price=Decimal('1.00'), quantity_in_stock=0, threshold_level=0
+        )
+        record = {'product_id': product.pk, 'quantity': 1, 'transaction_type': 'restock'}
+        errors = []
+
+        def sync_worker():
+            failed = 0
+            for _ in range(events):
+                try:
+                    InventoryTransaction.objects.create(product=product, quantity=1, transaction_type='restock')
+                except OperationalError:
+                    failed += 1
+            errors.append(failed)
+            connections.close_all()
+
+        writer = GroupCommitWriter(interval_ms=options['interval_ms'], max_events=options['max_events'])
+
+        def group_worker():
+            for _ in range(events):
+                writer.submit([record])
+
+        try:
+            sync_elapsed = _run_threads(threads, sync_worker)
+            sync_done = threads * events - sum(errors)
+
+            group_started = time.perf_counter()
+            _run_threads(threads, group_worker)
+            writer.wait(writer.last_issued)
+            group_elapsed = time.perf_counter() - group_started
+            writer.stop()
+            group_done = InventoryEventReceipt.objects.filter(writer=writer.writer_id, status='applied').count()
+
+            product.refresh_from_db()
+            expected_stock = sync_done + group_done
+        finally:
+            InventoryEventReceipt.objects.filter(writer=writer.writer_id).delete()
+            Product.objects.filter(name=BENCH_PRODUCT_NAME).delete()
+
+        self.stdout.write(f'threads={threads} events_per_mode={threads * events}')
+        self.stdout.write(f'sync:         applied={sync_done} db_errors={sum(errors)} '
+                          f'elapsed={sync_elapsed:.2f}s rate={sync_done / sync_elapsed:.1f} events/s')
+        self.stdout.write(f'group-commit: applied={group_done} '
+                          f'elapsed={group_elapsed:.2f}s rate={group_done / group_elapsed:.1f} events/s')
+
+        if product.quantity_in_stock != expected_stock:
+            raise CommandError(f'Stock is {product.quantity_in_stock}, expected {expected_stock}')
+        self.stdout.write(self.style.SUCCESS('Stock matches every applied event'))
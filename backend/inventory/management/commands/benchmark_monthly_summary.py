@@ -0,0 +1,119 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.urls import reverse
+from rest_framework.test import APIClient
+from inventory.models import Product, InventoryTransaction
+from inventory.serializers import MonthlySalesStockSummarySerializer
+from inventory.stripes import live_stock
+from inventory.versions import bump_versions
+
+BENCH_PREFIX = '__benchmark_monthly_summary__'
+
+
+def legacy_summary(products):
+    """The replaced implementation: two grouped queries per product and a linear scan per month."""
+    rows = []
+    for product in products:
+        sales = InventoryTransaction.objects.filter(product=product, transaction_type='sale').values(
+            'transaction_date__year', 'transaction_date__month').annotate(total_sales=Sum('quantity'))
+        restocks = InventoryTransaction.objects.filter(product=product, transaction_type='restock').values(
+            'transaction_date__year', 'transaction_date__month').annotate(total_restocks=Sum('quantity'))
+        for sale in sales:
+            restock = next((item['total_restocks'] for item in restocks
+                            if item['transaction_date__year'] == sale['transaction_date__year']
+                            and item['transaction_date__month'] == sale['transaction_date__month']), 0)
+            rows.append((product.pk, sale['total_sales'], restock))
+    return rows
+
+
+class QueryCounter:
+    """Counts queries without Django's debug query log, which keeps only the last 9000."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Times the monthly sales/restock/stock summary against the per-product loop it replaced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--months', type=int, default=24)
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the single-query summary')
+
+    def handle(self, *args, **options):
+        self.cleanup()
+        started = time.perf_counter()
+        self.generate(options['products'], options['months'])
+        self.stdout.write(f"generated {options['products']} products x {options['months']} months "
+                          f'in {time.perf_counter() - started:.1f}s')
+        products = Product.objects.filter(name__startswith=BENCH_PREFIX).order_by('id')
+        try:
+            with connection.execute_wrapper(queries := QueryCounter()):
+                started = time.perf_counter()
+                rows = MonthlySalesStockSummarySerializer.get_monthly_sales_and_stock(
+                    products.annotate(live_stock=live_stock())
+                )
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f'single query: {len(rows)} rows in {elapsed:.2f}s, {queries.count} queries')
+
+            client, pages = APIClient(), 0
+            url = f"{reverse('monthly-stock-summary')}?name={BENCH_PREFIX}&page_size=1000"
+            with connection.execute_wrapper(queries := QueryCounter()):
+                started = time.perf_counter()
+                while url:
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise CommandError(f'GET {url} returned {response.status_code}')
+                    pages += 1
+                    links = [link.strip() for link in response.get('Link', '').split(',')]
+                    url = next((link[1:link.index('>')] for link in links if link.endswith('rel="next"')), None)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f'endpoint: {pages} pages of 1000 products in {elapsed:.2f}s, {queries.count} queries')
+
+            if not options['skip_legacy']:
+                with connection.execute_wrapper(queries := QueryCounter()):
+                    started = time.perf_counter()
+                    rows = legacy_summary(products)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(f'per-product loop: {len(rows)} rows in {elapsed:.2f}s, {queries.count} queries')
+        finally:
+            self.cleanup()
+
+    def generate(self, product_count, months):
+        start = datetime(2023, 1, 1, tzinfo=dt_timezone.utc)
+        Product.objects.bulk_create([
+            Product(name=f'{BENCH_PREFIX}{i:06d}', price='4.00', quantity_in_stock=1000, threshold_level=0)
+            for i in range(product_count)
+        ], batch_size=1000)
+        ids = list(Product.objects.filter(name__startswith=BENCH_PREFIX).values_list('id', flat=True))
+        ops = connection.ops
+        # Two sales and a restock per product and month; raw rows skip stock updates and signals
+        rows = [
+            (pk, quantity, kind, ops.adapt_datetimefield_value(start + timedelta(days=30 * month + day)), '5.00', '0')
+            for pk in ids for month in range(months)
+            for kind, quantity, day in (('sale', 3, 3), ('sale', 2, 17), ('restock', 10, 9))
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {InventoryTransaction._meta.db_table} (product_id, quantity, transaction_type, '
+                'transaction_date, extra_charge_percent, transaction_cost) VALUES (%s, %s, %s, %s, %s, %s)', rows
+            )
+
+    def cleanup(self):
+        if Product.objects.filter(name__startswith=BENCH_PREFIX).exists():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {InventoryTransaction._meta.db_table} WHERE product_id IN '
+                    f'(SELECT id FROM {Product._meta.db_table} WHERE name LIKE %s)', [BENCH_PREFIX + '%']
+                )
+            Product.objects.filter(name__startswith=BENCH_PREFIX).delete()
+            bump_versions('inventorytransaction')
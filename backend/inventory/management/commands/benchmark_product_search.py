@@ -0,0 +1,95 @@
+import random
+import statistics
+import string
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from inventory.models import Product
+from inventory.search import fts_available, search_product_ids
+from inventory.versions import bump_versions
+
+BENCH_CATEGORY = '__benchmark_product_search__'
+ADJECTIVES = ['Blue', 'Heavy', 'Compact', 'Wireless', 'Steel', 'Organic', 'Premium', 'Mini', 'Smart', 'Classic']
+NOUNS = ['Widget', 'Sprocket', 'Lamp', 'Kettle', 'Charger', 'Bracket', 'Valve', 'Blender', 'Router', 'Drill']
+DESCRIPTIONS = ['for everyday use', 'built to last', 'with a two year warranty', 'in assorted colours']
+
+
+def _sku():
+    return ''.join(random.choices(string.ascii_uppercase, k=2)) + '-' + ''.join(random.choices(string.digits, k=6))
+
+
+def _typo(word):
+    i = random.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    return f'p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms'
+
+
+class Command(BaseCommand):
+    help = 'Measures /api/product/search/ latency percentiles on a generated catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500000, help='Catalog size to generate')
+        parser.add_argument('--queries', type=int, default=200, help='Searches per query kind')
+        parser.add_argument('--page-size', type=int, default=20, help='Results per page')
+
+    def handle(self, *args, **options):
+        count = options['products']
+        self.stdout.write(f'FTS5 index: {"yes" if fts_available() else "no (fallback)"}')
+        self.cleanup()
+        started = time.perf_counter()
+        skus = []
+        for start in range(0, count, 10000):
+            batch = []
+            for _ in range(start, min(start + 10000, count)):
+                skus.append(_sku())
+                batch.append(Product(
+                    name=f'{random.choice(ADJECTIVES)} {random.choice(NOUNS)} {skus[-1]}',
+                    category=BENCH_CATEGORY,
+                    description=f'{random.choice(ADJECTIVES)} {random.choice(NOUNS).lower()} {random.choice(DESCRIPTIONS)}',
+                    quantity_in_stock=10, price=Decimal('9.99'), threshold_level=0,
+                ))
+            Product.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f'generated {count} products in {time.perf_counter() - started:.1f}s')
+
+        client = APIClient()
+        url = reverse('product-search')
+        kinds = {
+            'sku': lambda: random.choice(skus),
+            'phrase': lambda: f'{random.choice(ADJECTIVES)} {random.choice(NOUNS)}',
+            'word': lambda: random.choice(NOUNS + DESCRIPTIONS),
+            'typo': lambda: f'{random.choice(ADJECTIVES)} {_typo(random.choice(NOUNS))}',
+            'prefix': lambda: random.choice(NOUNS)[:2],
+        }
+        try:
+            for kind, make_query in kinds.items():
+                index, endpoint = [], []
+                for _ in range(options['queries']):
+                    query = make_query()
+                    began = time.perf_counter()
+                    search_product_ids(query, limit=options['page_size'] + 1)
+                    index.append((time.perf_counter() - began) * 1000)
+                    began = time.perf_counter()
+                    response = client.get(url, {'q': query, 'page_size': options['page_size']})
+                    endpoint.append((time.perf_counter() - began) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f'GET {url}?q={query} returned {response.status_code}')
+                self.stdout.write(f'{kind:7} search: {_percentiles(index)}  endpoint: {_percentiles(endpoint)}')
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        # A plain DELETE: the generated products have no related rows, and
+        # per-row delete signals would dominate the run
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM inventory_product WHERE category = %s', [BENCH_CATEGORY])
+            if cursor.rowcount:
+                bump_versions('product')
@@ -0,0 +1,77 @@
+import multiprocessing
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from inventory.models import Product, InventoryTransaction
+from inventory.stock import InsufficientStock
+
+BENCH_PRODUCT_NAME = '__benchmark_hot_product__'
+
+
+def _sell(args):
+    """Worker body: records single-unit sales until the attempt budget is spent."""
+    product_id, attempts = args
+    connections.close_all()  # never share the parent's connection across a fork
+    product = Product.objects.get(pk=product_id)
+    sold = rejected = errors = 0
+    for _ in range(attempts):
+        try:
+            InventoryTransaction.objects.create(product=product, quantity=1, transaction_type='sale')
+            sold += 1
+        except InsufficientStock:
+            rejected += 1
+        except OperationalError:
+            errors += 1
+    connections.close_all()
+    return sold, rejected, errors
+
+
+class Command(BaseCommand):
+    help = 'Hammers one product with concurrent sales from several processes and checks for lost updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=3, help='Number of worker processes')
+        parser.add_argument('--sales', type=int, default=500, help='Sale attempts per worker')
+        parser.add_argument('--stock', type=int, default=None,
+                            help='Starting stock (defaults to 90%% of all attempts so some sales must be refused)')
+
+    def handle(self, *args, **options):
+        workers, sales = options['workers'], options['sales']
+        attempts = workers * sales
+        initial_stock = options['stock'] if options['stock'] is not None else int(attempts * 0.9)
+
+        Product.objects.filter(name=BENCH_PRODUCT_NAME).delete()
+        product = Product.objects.create(
+            name=BENCH_PRODUCT_NAME, price=Decimal('1.00'),
+            quantity_in_stock=initial_stock, threshold_level=0
+        )
+        connections.close_all()
+
+        try:
+            started = time.perf_counter()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.map(_sell, [(product.pk, sales)] * workers)
+            elapsed = time.perf_counter() - started
+
+            sold = sum(r[0] for r in results)
+            rejected = sum(r[1] for r in results)
+            errors = sum(r[2] for r in results)
+            product.refresh_from_db()
+            recorded = InventoryTransaction.objects.filter(product=product, transaction_type='sale').count()
+            lost_updates = (initial_stock - sold) - product.quantity_in_stock
+        finally:
+            Product.objects.filter(name=BENCH_PRODUCT_NAME).delete()
+
+        self.stdout.write(f'workers={workers} attempts={attempts} initial_stock={initial_stock}')
+        self.stdout.write(f'sold={sold} rejected={rejected} db_errors={errors} recorded_sales={recorded}')
+        self.stdout.write(f'failure_rate={errors / attempts:.1%}')
+        self.stdout.write(f'final_stock={product.quantity_in_stock} lost_updates={lost_updates}')
+        self.stdout.write(f'elapsed={elapsed:.2f}s sustained={sold / elapsed:.1f} sales/s')
+
+        if errors:
+            raise CommandError(f'{errors} of {attempts} sales failed with database errors ({errors / attempts:.1%})')
+        if lost_updates or recorded != sold or product.quantity_in_stock < 0:
+            raise CommandError('Stock does not match the recorded sales')
+        self.stdout.write(self.style.SUCCESS('No lost updates, no oversells and no failed writes'))
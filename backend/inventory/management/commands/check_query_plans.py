@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'Prints the query plans of the registered hot queries and fails if any reads a whole table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Only check these queries')
+
+    def handle(self, *args, **options):
+        try:
+            results = check_query_plans(options['names'])
+        except KeyError as e:
+            raise CommandError(f'Unknown query {e}')
+        failed = []
+        for name, (plan, problems) in results.items():
+            self.stdout.write(f'{name}: {"; ".join(problems) or "ok"}')
+            for step in plan:
+                self.stdout.write(f'    {step}')
+            if problems:
+                failed.append(name)
+        if failed:
+            raise CommandError(f'Query plans regressed: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} query plans use their indexes'))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from inventory.ledger import create_checkpoints
+
+
+class Command(BaseCommand):
+    help = 'Writes per-product stock checkpoints so point-in-time stock queries only scan recent ledger rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='ISO datetime to checkpoint at (defaults to now minus --settle-seconds)')
+        parser.add_argument('--settle-seconds', type=int, default=60,
+                            help='Stay this far behind now so in-flight transactions are not missed')
+
+    def handle(self, *args, **options):
+        if options['as_of']:
+            as_of = parse_datetime(options['as_of'])
+            if as_of is None:
+                raise CommandError('--as-of must be an ISO datetime')
+            if timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of)
+        else:
+            as_of = timezone.now() - timedelta(seconds=options['settle_seconds'])
+
+        written = create_checkpoints(as_of)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} stock checkpoints as of {as_of.isoformat()}'))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from inventory.changes import compact_change_log
+
+
+class Command(BaseCommand):
+    help = 'Drops superseded change log entries and tombstones older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_LOG_TOMBSTONE_RETENTION_DAYS,
+                            help='Keep tombstones newer than this many days')
+
+    def handle(self, *args, **options):
+        superseded, purged = compact_change_log(options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {superseded} superseded changes and {purged} tombstones older than {options["days"]}d'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from inventory.stripes import fold_stock_stripes
+
+
+class Command(BaseCommand):
+    help = 'Writes the stripe totals of striped hot products back into quantity_in_stock'
+
+    def handle(self, *args, **options):
+        folded = fold_stock_stripes()
+        self.stdout.write(self.style.SUCCESS(f'Folded stock for {folded} striped products'))
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from inventory.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Deletes stored Idempotency-Key responses older than the TTL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.IDEMPOTENCY_KEY_TTL_HOURS,
+                            help='Keep keys newer than this many hours')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} idempotency keys older than {options["hours"]}h'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from inventory.rollups import rebuild_daily_sales
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily sales rollup from orders, for every day or from --since on'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD); default is every day')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('--since must be a date (YYYY-MM-DD)')
+        written = rebuild_daily_sales(since)
+        scope = f'from {since}' if since else 'for every day'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the daily sales rollup {scope}: {written} rows'))
@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from inventory.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Verifies stored order totals against their line prices and repairs any that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report drifted orders without repairing them')
+
+    def handle(self, *args, **options):
+        line_total = Coalesce(
+            Subquery(
+                OrderItem.objects.filter(order=OuterRef('pk'))
+                .values('order').annotate(total=Sum('price')).values('total')
+            ),
+            Value(Decimal(0)),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+
+        with transaction.atomic():
+            # Rounded on both sides so backends without a native decimal type compare cents
+            drifted = Order.objects.annotate(expected=Round(line_total, 2)).exclude(
+                expected=Round(F('total_amount'), 2)
+            )
+            count = drifted.count()
+            if count and not options['dry_run']:
+                Order.objects.filter(pk__in=drifted.values('pk')).update(total_amount=line_total)
+
+        if options['dry_run']:
+            self.stdout.write(f'{count} orders have a drifted total')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {count} order totals'))
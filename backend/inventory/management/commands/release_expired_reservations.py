@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from inventory.stock import recount_reservations, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Releases stock held by expired reservations of pending orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Reservations released per transaction')
+        parser.add_argument('--recount', action='store_true',
+                            help='Also rebuild every product reservation counter from the reservation table')
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservations'))
+        if options['recount']:
+            repaired = recount_reservations()
+            self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} reservation counters'))
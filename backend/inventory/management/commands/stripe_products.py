@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import Product
+from inventory.stripes import stripe_product
+
+
+class Command(BaseCommand):
+    help = 'Flags hot products for striped stock counters, or unstripes them with --stripes 0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='+', type=int, help='Products to (un)stripe')
+        parser.add_argument('--stripes', type=int, default=8,
+                            help='Number of stripe rows per product (0 folds them back)')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['stripes'] <= 64:
+            raise CommandError('--stripes must be between 0 and 64')
+        products = Product.objects.in_bulk(options['product_ids'])
+        missing = sorted(set(options['product_ids']) - set(products))
+        if missing:
+            raise CommandError(f'Unknown product ids: {missing}')
+        for product in products.values():
+            stripe_product(product, options['stripes'])
+            self.stdout.write(f'{product.name}: {options["stripes"]} stripes, stock {product.quantity_in_stock}')
+        self.stdout.write(self.style.SUCCESS(f'Updated {len(products)} products'))
@@ -0,0 +1,12 @@
+from .alerts import deferred_alerts
+
+
+class StockAlertBatchMiddleware:
+    """Reconciles stock alerts once per request instead of once per stock write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with deferred_alerts():
+            return self.get_response(request)
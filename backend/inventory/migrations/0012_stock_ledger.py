@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    # Existing stock becomes the opening balance of each product's ledger
+    Product = apps.get_model('inventory', 'Product')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=pk, delta=quantity, reason='opening')
+        for pk, quantity in Product.objects.filter(quantity_in_stock__gt=0).values_list('pk', 'quantity_in_stock')
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_alter_order_order_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField()),
+                ('quantity', models.IntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_checkpoints', to='inventory.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'as_of'), name='unique_stock_checkpoint')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening Balance'), ('restock', 'Restock'), ('sale', 'Sale'), ('order', 'Order'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='inventory_s_product_5919a9_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
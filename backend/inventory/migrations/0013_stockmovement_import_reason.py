@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockmovement',
+            name='reason',
+            field=models.CharField(choices=[('opening', 'Opening Balance'), ('restock', 'Restock'), ('sale', 'Sale'), ('order', 'Order'), ('adjustment', 'Adjustment'), ('import', 'Import')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryEventReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('writer', models.CharField(max_length=32)),
+                ('sequence', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('failed', 'Failed')], max_length=10)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='receipts', to='inventory.inventorytransaction')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('writer', 'sequence'), name='unique_inventory_event_receipt')],
+            },
+        ),
+    ]
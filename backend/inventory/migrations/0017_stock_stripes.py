@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_inventory_event_receipts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_stripes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='StockStripe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stripes', to='inventory.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'index'), name='unique_stock_stripe')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_stock_stripes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorytransaction',
+            name='transaction_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+def create_counters(apps, schema_editor):
+    # Start every counter at 1 so the first ETags differ from a missing row
+    DataVersion = apps.get_model('inventory', 'DataVersion')
+    DataVersion.objects.bulk_create([
+        DataVersion(name=name, version=1)
+        for name in ('product', 'inventorytransaction', 'order', 'orderitem', 'stockalert')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_list_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counters, migrations.RunPython.noop),
+    ]
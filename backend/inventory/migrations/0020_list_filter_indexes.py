@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:43
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_data_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['transaction_type', 'transaction_date'], name='inventory_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['product', 'transaction_date'], name='inventory_product_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'order_date'], name='order_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(django.db.models.functions.text.Lower('customer_name'), name='order_customer_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category'], name='product_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['quantity_in_stock'], name='product_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity_in_stock__lt', models.F('threshold_level'))), fields=['id'], name='product_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='product_name_lower_idx'),
+        ),
+    ]
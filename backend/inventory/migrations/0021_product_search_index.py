@@ -0,0 +1,77 @@
+from django.db import OperationalError, migrations
+
+# The DDL is frozen here rather than imported from inventory.search, so later
+# changes to the app cannot change what this migration did. search.py keeps
+# its own copy for reinstalling the index after table rebuilds.
+SEARCH_TABLE = 'inventory_product_search'
+
+CREATE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, category, description,
+        content='inventory_product', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF name, category, description
+    ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Only SQLite with the trigram tokenizer (3.34+) can host the index; search falls back otherwise
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.inventory_fts_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.inventory_fts_probe")
+        except OperationalError:
+            return
+        for statement in CREATE_SEARCH_INDEX:
+            cursor.execute(statement)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP_SEARCH_INDEX:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0020_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
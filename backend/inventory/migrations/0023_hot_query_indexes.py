@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0022_change_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['product', 'transaction_type', 'transaction_date'], name='inventory_prod_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_date', 'total_amount'], name='order_date_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['product'], name='stockalert_open_product_idx'),
+        ),
+    ]
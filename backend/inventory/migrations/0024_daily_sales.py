@@ -0,0 +1,66 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:46
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    # A frozen copy of rollups.rebuild_daily_sales as of this migration, so
+    # later changes to the app cannot change what it writes
+    DailySales = apps.get_model('inventory', 'DailySales')
+    Order = apps.get_model('inventory', 'Order')
+    OrderItem = apps.get_model('inventory', 'OrderItem')
+
+    items = OrderItem.objects.annotate(day=TruncDate('order__order_date'))
+    totals = defaultdict(lambda: {'units': 0, 'revenue': Decimal(0), 'orders': 0})
+    for row in Order.objects.annotate(day=TruncDate('order_date')).values('day').annotate(count=Count('id')):
+        totals[row['day']]['orders'] = row['count']
+    for row in items.values('day').annotate(units=Sum('quantity'), revenue=Sum('price')):
+        totals[row['day']].update(units=row['units'], revenue=row['revenue'])
+    DailySales.objects.bulk_create(
+        [DailySales(product_id=None, day=day, **values) for day, values in totals.items()], batch_size=BATCH_SIZE
+    )
+
+    per_product = items.values('product_id', 'day').annotate(
+        units=Sum('quantity'), revenue=Sum('price'), orders=Count('id')
+    )
+    batch = []
+    for row in per_product.iterator(chunk_size=BATCH_SIZE):
+        batch.append(DailySales(**row))
+        if len(batch) == BATCH_SIZE:
+            DailySales.objects.bulk_create(batch)
+            batch = []
+    DailySales.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0023_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, db_index=False, related_name='daily_sales', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'product'], name='daily_sales_day_product_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='unique_daily_product_sales'), models.UniqueConstraint(condition=models.Q(('product__isnull', True)), fields=('day',), name='unique_daily_total_sales')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:33
+
+from django.db import migrations, models
+
+
+def create_shards(apps, schema_editor):
+    # Existing counters become shard 0; add the rest so bumps never have to create them.
+    # Matches versions.VERSION_SHARDS at the time of writing.
+    DataVersion = apps.get_model('inventory', 'DataVersion')
+    names = DataVersion.objects.exclude(name='changelog-horizon').values_list('name', flat=True)
+    DataVersion.objects.bulk_create(
+        [DataVersion(name=name, shard=shard) for name in list(names) for shard in range(1, 16)],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0024_daily_sales'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='dataversion',
+            name='name',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='dataversion',
+            constraint=models.UniqueConstraint(fields=('name', 'shard'), name='unique_data_version_shard'),
+        ),
+        migrations.RunPython(create_shards, migrations.RunPython.noop),
+    ]
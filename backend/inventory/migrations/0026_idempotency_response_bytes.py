@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-17 10:05
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+def render_stored_bodies(apps, schema_editor):
+    # Keys stored before this migration replay their JSON body as DRF would render it
+    IdempotencyKey = apps.get_model('inventory', 'IdempotencyKey')
+    for record in IdempotencyKey.objects.exclude(status_code=None).iterator():
+        record.response_content = json.dumps(
+            record.response_body, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+        record.content_type = 'application/json'
+        record.save(update_fields=['response_content', 'content_type'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0025_shard_data_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='response_content',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(render_stored_bodies, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='idempotencykey',
+            name='response_body',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0026_idempotency_response_bytes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_date_amount_idx',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:52
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def resolve_duplicate_alerts(apps, schema_editor):
+    # Keep the newest open alert per product so the unique constraint can be added
+    StockAlert = apps.get_model('inventory', 'StockAlert')
+    newest = StockAlert.objects.filter(resolved=False).values('product').annotate(last=Max('id')).values('last')
+    StockAlert.objects.filter(resolved=False).exclude(id__in=newest).update(resolved=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0027_drop_order_date_amount_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_alerts, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='stockalert',
+            name='stockalert_open_product_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='stockalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolved', False)), fields=('product',), name='stockalert_open_product_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-17 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0028_unique_open_stock_alert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('stock_stripes__gt', 0)), fields=['id'], name='product_striped_idx'),
+        ),
+    ]
@@ -1,10 +1,14 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 from decimal import Decimal
-from django.db.models import Sum, F, ExpressionWrapper, fields
+from django.db.models import Sum, F, Q, ExpressionWrapper, fields
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
 from django.utils.timezone import now
+from .versions import VersionedQuerySet
 
 # Product Model
 class Product(models.Model):
@@ -16,26 +20,101 @@ class Product(models.Model):
     threshold_level = models.PositiveIntegerField(default=5)
     extra_charge_percent = models.DecimalField(max_digits=5, decimal_places=2, default=5.00)
     date_added = models.DateTimeField(auto_now_add=True)
+    # Units held by active reservations of pending orders, maintained by stock.py
+    reserved_quantity = models.PositiveIntegerField(default=0, editable=False)
+    # Hot products keep their live stock in this many StockStripe rows (0 = not striped)
+    stock_stripes = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        # Back the ProductFilter lookups (see filters.py)
+        indexes = [
+            models.Index(fields=['category'], name='product_category_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+            models.Index(fields=['quantity_in_stock'], name='product_stock_idx'),
+            models.Index(
+                fields=['id'], condition=Q(quantity_in_stock__lt=F('threshold_level')),
+                name='product_low_stock_idx'
+            ),
+            models.Index(Lower('name'), name='product_name_lower_idx'),
+            # Striped products, the live-stock half of the stock filters (see filters.stock_matches)
+            models.Index(fields=['id'], condition=Q(stock_stripes__gt=0), name='product_striped_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.check_stock_alert()
+        """
+        Saves the product and records any direct stock edit in the stock ledger.
+        """
+        from .alerts import mark_dirty
+        from .stripes import spread_stock, stripe_total
+
+        update_fields = kwargs.get('update_fields')
+        tracks_stock = update_fields is None or 'quantity_in_stock' in update_fields
+        if update_fields is None and not self._state.adding:
+            # Never write back a stale reservation counter over concurrent reservations
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'reserved_quantity'
+            ]
+        with transaction.atomic():
+            previous = None
+            if tracks_stock and not self._state.adding:
+                previous = Product.objects.filter(pk=self.pk).values_list('quantity_in_stock', flat=True).first()
+                if self.stock_stripes:
+                    if self.quantity_in_stock == previous:
+                        # The folded column lags the stripes: an unchanged value is no stock edit,
+                        # and writing it back could overwrite a concurrent fold
+                        tracks_stock = False
+                        if update_fields is None:
+                            kwargs['update_fields'].remove('quantity_in_stock')
+                    else:
+                        previous = stripe_total(self.pk)
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if tracks_stock:
+                delta = self.quantity_in_stock - (previous or 0)
+                if delta and self.stock_stripes:
+                    # A direct edit sets the total; the stripes share it out again
+                    spread_stock(self.pk, self.stock_stripes, self.quantity_in_stock)
+                    self.live_stock = self.quantity_in_stock
+                if delta:
+                    StockMovement.objects.create(
+                        product=self, delta=delta,
+                        reason='opening' if adding else 'adjustment'
+                    )
+        mark_dirty([self.pk])
 
     def __str__(self):
         return f"{self.name} | {self.price} | Stock: {self.quantity_in_stock}"
 
+    def current_stock(self):
+        """
+        Returns the live stock level. For striped products this sums the
+        stripes, unless the queryset already annotated it as ``live_stock``.
+        """
+        if not self.stock_stripes:
+            return self.quantity_in_stock
+        if hasattr(self, 'live_stock'):
+            return self.live_stock
+        from .stripes import stripe_total
+
+        return stripe_total(self.pk)
+
+    @property
+    def available_quantity(self):
+        """
+        Stock that can still be promised to new orders.
+        """
+        return self.current_stock() - self.reserved_quantity
+
     def check_stock_alert(self):
         """
         Checks if stock is below the threshold and creates/updates stock alerts accordingly.
         """
-        if self.quantity_in_stock < self.threshold_level:
-            StockAlert.objects.update_or_create(
-                product=self,
-                resolved=False,
-                defaults={'stock_level': self.quantity_in_stock}
-            )
-        else:
-            StockAlert.objects.filter(product=self, resolved=False).update(resolved=True)
+        from .alerts import reconcile_stock_alerts
+
+        reconcile_stock_alerts([self.pk])
 
     def total_sales(self):
         """
@@ -52,6 +131,27 @@ class Product(models.Model):
         )['revenue'] or Decimal(0)
 
 
+# Stock Stripe Model
+class StockStripe(models.Model):
+    """
+    One slice of a hot product's stock. Sales decrement a random stripe so
+    they do not all queue on the product row; the stripes sum to the stock.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stripes')
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'index'], name='unique_stock_stripe')
+        ]
+
+    def __str__(self):
+        return f"Stripe {self.index} | {self.product_id} | {self.quantity}"
+
+
 # Inventory Transaction Model
 class InventoryTransaction(models.Model):
     TRANSACTION_TYPES = [
@@ -62,33 +162,95 @@ class InventoryTransaction(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
-    transaction_date = models.DateTimeField(auto_now_add=True)
+    transaction_date = models.DateTimeField(auto_now_add=True, db_index=True)
     extra_charge_percent = models.DecimalField(max_digits=5, decimal_places=2, default=5.00)
     transaction_cost = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
 
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['transaction_type', 'transaction_date'], name='inventory_type_date_idx'),
+            models.Index(fields=['product', 'transaction_date'], name='inventory_product_date_idx'),
+            # Per-product monthly sales and restocks (movements.monthly_movements)
+            models.Index(
+                fields=['product', 'transaction_type', 'transaction_date'], name='inventory_prod_type_date_idx'
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Automatically calculates transaction cost and updates product stock accordingly.
         Raises a ValidationError if there's insufficient stock for a sale.
         """
+        from .stock import add_stock, remove_stock
+
         base_price = Decimal(str(self.product.price))
         extra_charge_percent = Decimal(str(self.extra_charge_percent))
         extra_charge = (base_price * extra_charge_percent) / Decimal('100')
         self.transaction_cost = (base_price + extra_charge) * Decimal(str(self.quantity))
 
-        if self.transaction_type == 'sale':
-            if self.product.quantity_in_stock < self.quantity:
-                raise ValidationError({"error": "Not enough stock available for sale."})
-            self.product.quantity_in_stock -= self.quantity
-        elif self.transaction_type == 'restock':
-            self.product.quantity_in_stock += self.quantity
+        with transaction.atomic():
+            # Stock only moves when the transaction is first recorded
+            if self._state.adding:
+                if self.transaction_type == 'sale':
+                    remove_stock(self.product, self.quantity, keep_reserved=True)
+                elif self.transaction_type == 'restock':
+                    add_stock(self.product, self.quantity)
+            super().save(*args, **kwargs)
 
-        self.product.save()
-        self.product.check_stock_alert()
+    def __str__(self):
+        return f"{self.transaction_type.capitalize()} | {self.product.name} | Cost: {self.transaction_cost}"
+
+
+# Stock Ledger Models
+class StockMovement(models.Model):
+    """
+    Append-only record of every change to a product's stock.
+    Product.quantity_in_stock is the running total of these deltas.
+    """
+    REASONS = [
+        ('opening', 'Opening Balance'),
+        ('restock', 'Restock'),
+        ('sale', 'Sale'),
+        ('order', 'Order'),
+        ('adjustment', 'Adjustment'),
+        ('import', 'Import'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASONS)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['product', 'created_at'])]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError({"error": "Stock movements are append-only."})
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.transaction_type.capitalize()} | {self.product.name} | Cost: {self.transaction_cost}"
+        return f"{self.reason.capitalize()} | {self.product_id} | {self.delta:+d}"
+
+
+class StockCheckpoint(models.Model):
+    """
+    Stock level of a product at a point in time, so historical stock can be
+    answered from the nearest checkpoint instead of replaying the full ledger.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_checkpoints')
+    as_of = models.DateTimeField()
+    quantity = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'as_of'], name='unique_stock_checkpoint')
+        ]
+
+    def __str__(self):
+        return f"Checkpoint | {self.product_id} | {self.as_of:%Y-%m-%d %H:%M} | {self.quantity}"
 
 
 # Order Model
@@ -100,19 +262,71 @@ class Order(models.Model):
 
     customer_name = models.CharField(max_length=255)
     telephone_number = PhoneNumberField()
-    order_date = models.DateTimeField(default=timezone.now)
+    order_date = models.DateTimeField(default=timezone.now, db_index=True)
     status = models.CharField(max_length=20, choices=ORDER_STATUSES, default='pending')
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
 
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'order_date'], name='order_status_date_idx'),
+            models.Index(Lower('customer_name'), name='order_customer_lower_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the order and turns its stock reservations into sales when it
+        moves from pending to completed.
+        """
+        from .rollups import record_order_sales
+        from .stock import commit_reservations
+
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = None
+            if not adding and (update_fields is None or {'status', 'order_date'} & set(update_fields)):
+                previous = Order.objects.filter(pk=self.pk).values('status', 'order_date').first()
+            super().save(*args, **kwargs)
+            if previous and previous['status'] == 'pending' and self.status == 'completed':
+                commit_reservations(self)
+            if adding:
+                record_order_sales(self)
+            elif previous:
+                record_order_sales(self, previous['order_date'])
+
+    def delete(self, *args, **kwargs):
+        """
+        Deletes the order and releases any stock it still holds in reserve.
+        """
+        from .stock import release_reservations
+
+        with transaction.atomic():
+            release_reservations(self.reservations.all())
+            return super().delete(*args, **kwargs)
+
     def update_total_amount(self):
         """
-        Updates the total amount of the order based on all associated order items.
+        Recomputes the total amount from all associated order items.
+
+        Item writes keep the total current through apply_total_delta, so this
+        is only needed to repair a drifted total. OrderItem.price already holds
+        the line total (unit price * quantity).
         """
-        self.total_amount = self.items.aggregate(
-            total=Sum(ExpressionWrapper(F('price') * F('quantity'), output_field=fields.DecimalField()))
-        )['total'] or Decimal(0)
+        self.total_amount = self.items.aggregate(total=Sum('price'))['total'] or Decimal(0)
         self.save(update_fields=['total_amount'])
 
+    def apply_total_delta(self, delta):
+        """
+        Adds ``delta`` to the stored total with a single atomic UPDATE, so the
+        cost of an item write does not depend on how many lines the order has.
+        """
+        if not delta:
+            return
+        Order.objects.filter(pk=self.pk).update(total_amount=F('total_amount') + delta)
+        self.total_amount = Decimal(str(self.total_amount)) + delta
+
     def __str__(self):
         return f"Order: {self.customer_name} | {self.total_amount}"
 
@@ -124,26 +338,119 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
 
+    objects = VersionedQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """
-        Sets the price for the order item and updates the product stock accordingly.
+        Sets the price for the order item, updates the product stock and moves
+        the order total and the daily sales rollup by the change in this line.
+        """
+        from .rollups import record_item_sales
+        from .stock import remove_stock, reserve_stock
+
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = None
+            if not adding:
+                previous = OrderItem.objects.filter(pk=self.pk).values(
+                    'order_id', 'price', 'product_id', 'quantity', 'order__order_date', 'order__status'
+                ).first()
+            # A new line, or a line whose product or quantity changed, is priced again
+            if not self.price or previous and (previous['product_id'], previous['quantity']) != (
+                self.product_id, self.quantity
+            ):
+                self.price = Decimal(str(self.product.price)) * Decimal(str(self.quantity))
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'price'}
+            update_fields = kwargs.get('update_fields')
+            tracks_total = update_fields is None or {'price', 'order'} & set(update_fields)
+            if adding and self.order.status != 'pending':
+                remove_stock(self.product, self.quantity, reason='order', keep_reserved=True)
+            super().save(*args, **kwargs)
+            if adding and self.order.status == 'pending':
+                # Pending orders hold stock until they complete or the hold expires
+                reserve_stock(self)
+            elif previous is not None:
+                self._move_stock(previous)
+            record_item_sales(self, previous)
+
+            if not tracks_total:
+                return
+            if previous is None:
+                self.order.apply_total_delta(self.price)
+            elif previous['order_id'] != self.order_id:
+                Order(pk=previous['order_id']).apply_total_delta(-previous['price'])
+                self.order.apply_total_delta(self.price)
+            else:
+                self.order.apply_total_delta(self.price - previous['price'])
+
+    def _move_stock(self, previous):
         """
-        if not self.price:
-            self.price = Decimal(str(self.product.price)) * Decimal(str(self.quantity))
-        
-        if self.product.quantity_in_stock < self.quantity:
-            raise ValidationError({"error": f"Not enough stock for {self.product.name}."})
+        Moves what a saved line holds, stock sold for a completed order or a
+        reservation for a pending one, from its ``previous`` product, quantity
+        and order to the current ones. Unchanged lines cost no queries.
+        """
+        from .stock import apply_stock_deltas, release_reservations, reserve_stock
+
+        if (previous['product_id'], previous['quantity'], previous['order_id']) == (
+            self.product_id, self.quantity, self.order_id
+        ):
+            return
+        deltas = defaultdict(int)
+        if previous['order__status'] == 'pending':
+            release_reservations(self.reservations.all())
+            self.reservations.all().delete()
+        else:
+            deltas[previous['product_id']] += previous['quantity']
+        if self.order.status == 'pending':
+            reserve_stock(self)
+        else:
+            deltas[self.product_id] -= self.quantity
+        apply_stock_deltas(deltas, reason='order', keep_reserved=True)
 
-        self.product.quantity_in_stock -= self.quantity
-        self.product.save()
-        self.product.check_stock_alert()
-        super().save(*args, **kwargs)
-        self.order.update_total_amount()
+    def delete(self, *args, **kwargs):
+        """
+        Deletes the order item, returns its stock (or releases its
+        reservation) and takes its price off the order total.
+        """
+        from .stock import add_stock, release_reservations
+
+        with transaction.atomic():
+            release_reservations(self.reservations.all())
+            if self.order.status != 'pending':
+                add_stock(self.product, self.quantity, reason='order')
+            result = super().delete(*args, **kwargs)
+            self.order.apply_total_delta(-self.price)
+        return result
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name} | {self.order.customer_name}"
 
 
+# Stock Reservation Model
+class StockReservation(models.Model):
+    """
+    Stock held for an item of a pending order until ``expires_at``.
+
+    Product.reserved_quantity is the sum of the active (unreleased)
+    reservations, so availability never has to aggregate this table.
+    Released reservations are kept until the order completes, which then
+    takes their quantity from stock again if it is still available.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    order_item = models.ForeignKey(OrderItem, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    released = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['released', 'expires_at'])]
+
+    def __str__(self):
+        return f"Reservation | {self.product_id} x {self.quantity} | Order {self.order_id}"
+
+
 # Stock Alert Model
 class StockAlert(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -151,6 +458,15 @@ class StockAlert(models.Model):
     alert_date = models.DateTimeField(auto_now_add=True)
     resolved = models.BooleanField(default=False)
 
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        # At most one open alert per product; also serves the open-alert
+        # lookups of every stock reconciliation
+        constraints = [
+            models.UniqueConstraint(fields=['product'], condition=Q(resolved=False), name='stockalert_open_product_idx'),
+        ]
+
     def __str__(self):
         return f" Stock Alert: {self.product.name} at {self.stock_level}"
 
@@ -189,6 +505,138 @@ def inventory_health():
     }
 
 
+# Daily Sales Model
+class DailySales(models.Model):
+    """
+    Sales rollup per product and day (see rollups.py), kept current by
+    order and order item writes so analytics never scan order history.
+    Rows with no product hold the day's totals: their ``orders`` counts the
+    orders placed, while a product row counts the order lines for it.
+    """
+    # unique_daily_product_sales leads with product and serves per-product lookups
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_sales', db_index=False
+    )
+    day = models.DateField()
+    units = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='unique_daily_product_sales'),
+            models.UniqueConstraint(
+                fields=['day'], condition=Q(product__isnull=True), name='unique_daily_total_sales'
+            ),
+        ]
+        indexes = [models.Index(fields=['day', 'product'], name='daily_sales_day_product_idx')]
+
+    def __str__(self):
+        return f"{self.day} | {self.product_id or 'all'} | {self.units} units"
+
+
+# Idempotency Key Model
+class IdempotencyKey(models.Model):
+    """
+    First response to a POST sent with an Idempotency-Key header, stored as
+    the rendered bytes and replayed verbatim when the client retries the
+    same request. A row with no status_code is a request that is still
+    being processed.
+    """
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_content = models.BinaryField(null=True, blank=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'scope'], name='unique_idempotency_key')
+        ]
+
+    def __str__(self):
+        return f"{self.scope} | {self.key} | {self.status_code or 'pending'}"
+
+
+# Inventory Event Receipt Model
+class InventoryEventReceipt(models.Model):
+    """
+    Outcome of an inventory event accepted in group-commit mode, written in
+    the same transaction as the batch that applied it. Clients poll it by
+    the writer id and sequence number they were acknowledged with.
+    """
+    STATUSES = [
+        ('applied', 'Applied'),
+        ('failed', 'Failed'),
+    ]
+
+    writer = models.CharField(max_length=32)
+    sequence = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUSES)
+    transaction = models.ForeignKey(
+        InventoryTransaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='receipts'
+    )
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['writer', 'sequence'], name='unique_inventory_event_receipt')
+        ]
+
+    def __str__(self):
+        return f"{self.writer}:{self.sequence} | {self.status}"
+
+
+# Data Version Model
+class DataVersion(models.Model):
+    """
+    Counter bumped on every write to one versioned model (see versions.py).
+    Each counter is split over up to VERSION_SHARDS rows so concurrent
+    writers rarely update the same row; its version is the sum of its shards.
+    List and detail GETs turn the counters they depend on into an ETag.
+    The 'changelog-horizon' row holds the change log's purge horizon instead,
+    and the 'database-epoch' row a random token cache keys are scoped to.
+    """
+    name = models.CharField(max_length=64)
+    shard = models.PositiveSmallIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'shard'], name='unique_data_version_shard')
+        ]
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}] | v{self.version}"
+
+
+# Change Log Model
+class ChangeLog(models.Model):
+    """
+    One create, update or delete of an object in the change feed (see
+    changes.py). The id is the cursor clients sync from; compact_change_log
+    drops superseded entries and expired tombstones.
+    """
+    ACTIONS = [
+        ('upsert', 'Upsert'),
+        ('delete', 'Delete'),
+    ]
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'object_id'])]
+
+    def __str__(self):
+        return f"#{self.id} | {self.model}:{self.object_id} | {self.action}"
+
+
 # Chat Session Model
 class ChatSession(models.Model):
     title = models.CharField(max_length=255, blank=True)
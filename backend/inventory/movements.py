@@ -0,0 +1,86 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+from django.db.models import Case, IntegerField, Max, Min, Q, Sum, Value, When
+from django.utils import timezone
+
+MOVEMENT_COLUMNS = ['product_id', 'month', 'sales_units', 'restock_units']
+
+
+def month_starts(first_day, last_day):
+    """Aware starts of the months from the one holding ``first_day`` to the one after ``last_day``."""
+    starts = []
+    year, month = first_day.year, first_day.month
+    while not starts or starts[-1].date() <= last_day:
+        starts.append(timezone.make_aware(datetime(year, month, 1)))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return starts
+
+
+def monthly_movements(product_ids=None, date_after=None, date_before=None):
+    """
+    Units sold and restocked per product and month as a DataFrame with
+    MOVEMENT_COLUMNS, from one conditional-aggregation query over inventory
+    transactions. Months follow the current time zone; the date range is
+    inclusive and in whole days, and an open end is taken from the data.
+    """
+    from .models import InventoryTransaction
+    transactions = InventoryTransaction.objects.filter(transaction_type__in=('sale', 'restock'))
+    if product_ids is not None:
+        transactions = transactions.filter(product_id__in=product_ids)
+    if date_after is None or date_before is None:
+        bounds = transactions.aggregate(first=Min('transaction_date'), last=Max('transaction_date'))
+        if bounds['first'] is None:
+            return pd.DataFrame(columns=MOVEMENT_COLUMNS)
+        date_after = date_after or timezone.localdate(bounds['first'])
+        date_before = date_before or timezone.localdate(bounds['last'])
+    if date_after > date_before:
+        return pd.DataFrame(columns=MOVEMENT_COLUMNS)
+    starts = month_starts(date_after, date_before)
+    transactions = transactions.filter(
+        transaction_date__gte=timezone.make_aware(datetime.combine(date_after, time.min)),
+        transaction_date__lt=timezone.make_aware(datetime.combine(date_before + timedelta(days=1), time.min)),
+    )
+    # Months are numbered against their boundaries in SQL rather than with a
+    # truncation function, which SQLite runs as Python once per row
+    month = Case(
+        *[When(transaction_date__lt=start, then=Value(index)) for index, start in enumerate(starts[1:-1])],
+        default=Value(len(starts) - 2), output_field=IntegerField(),
+    )
+    rows = (
+        transactions.annotate(month=month).values('product_id', 'month')
+        .annotate(
+            sales_units=Sum('quantity', filter=Q(transaction_type='sale'), default=0),
+            restock_units=Sum('quantity', filter=Q(transaction_type='restock'), default=0),
+        )
+        .order_by().values_list(*MOVEMENT_COLUMNS)
+    )
+    movements = pd.DataFrame.from_records(list(rows), columns=MOVEMENT_COLUMNS)
+    labels = np.array([start.strftime('%Y-%m') for start in starts[:-1]])
+    movements['month'] = labels[movements['month'].to_numpy(dtype=np.int64)]
+    return movements
+
+
+def monthly_sales_and_stock(products, date_after=None, date_before=None):
+    """
+    One row per product and month with sales or restocks: units, their value
+    at the product's current price and the product's current stock level.
+    ``products`` are Product objects annotated with ``live_stock``; rows
+    follow their order, then the month.
+    """
+    products = list(products)
+    if not products:
+        return []
+    catalog = pd.DataFrame({
+        'product_id': [product.pk for product in products],
+        'product_name': [product.name for product in products],
+        'price': np.array([product.price for product in products], dtype=float),
+        'stock_level': [product.live_stock for product in products],
+        'position': np.arange(len(products)),
+    })
+    movements = monthly_movements(catalog['product_id'].tolist(), date_after, date_before)
+    summary = movements.merge(catalog, on='product_id').sort_values(['position', 'month'])
+    summary['sales'] = (summary['sales_units'] * summary['price']).round(2)
+    summary['restocks'] = (summary['restock_units'] * summary['price']).round(2)
+    return summary.drop(columns=['price', 'position']).to_dict('records')
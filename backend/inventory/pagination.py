@@ -0,0 +1,60 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class LinkHeaderCursorPagination(CursorPagination):
+    """
+    Keyset pagination that keeps list responses a plain JSON array.
+
+    Each page is fetched with ``WHERE <ordering column> > <cursor> LIMIT n``
+    on an indexed column, so a deep page costs the same as the first one.
+    The next and previous page URLs are sent in an RFC 8288 ``Link`` header
+    instead of wrapping the results, which keeps existing clients working.
+    Views choose the column with an ``ordering`` attribute; views with an
+    OrderingFilter also accept ``?ordering=`` over their ``ordering_fields``.
+
+    Paging is opt-in: only requests with ``page_size`` or ``cursor`` get a
+    page, so clients that never follow the Link header still receive the
+    whole list. Views that cannot return everything at once set
+    ``always_paginate = True``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        requested = self.page_size_query_param in params or self.cursor_query_param in params
+        if not (requested or getattr(view, 'always_paginate', False)):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        if any(hasattr(backend, 'get_ordering') for backend in getattr(view, 'filter_backends', [])):
+            return super().get_ordering(request, queryset, view)
+        ordering = getattr(view, 'ordering', None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        ids = request.query_params.get('ids')
+        if ids and self.page_size_query_param not in request.query_params:
+            # A batch fetch by ids comes back in one page
+            return min(max(page_size, len(ids.split(','))), self.max_page_size)
+        return page_size
+
+    def get_link_header(self):
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for url, rel in ((self.get_next_link(), 'next'), (self.get_previous_link(), 'prev'))
+            if url
+        ]
+        return ', '.join(links)
+
+    def get_paginated_response(self, data):
+        link = self.get_link_header()
+        return Response(data, headers={'Link': link} if link else None)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
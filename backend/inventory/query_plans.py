@@ -0,0 +1,144 @@
+import re
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, ExtractMonth, TruncMonth, TruncWeek
+from django.utils import timezone
+
+# A step that reads every row of a table, with or without an index:
+# "SCAN inventory_order", "SCAN inventory_product USING COVERING INDEX ...".
+# Index seeks show up as SEARCH; subquery results and constants are skipped.
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW|\()(\S+)')
+# Hot queries that must read every row, so a scan is their expected plan
+FULL_SCAN_ALLOWED = frozenset({
+    # The chatbot's stock value per category covers the whole catalog;
+    # walking product_category_idx only saves the sort
+    'category_values',
+})
+
+
+def _recent():
+    return timezone.now() - timedelta(days=30)
+
+
+def hot_queries():
+    """
+    ``{name: (queryset, index)}`` for the queries run on every analytics
+    page, stock write and list request. ``index`` is the index the plan must
+    use; no query outside FULL_SCAN_ALLOWED may read a whole table.
+    Aggregates are registered as the queryset they aggregate over, which has
+    the same access path.
+    """
+    from .alerts import newly_low_products
+    from .models import ChangeLog, DailySales, InventoryTransaction, Order, OrderItem, Product, StockAlert
+    recent, product_ids = _recent(), [1, 2, 3]
+    return {
+        # views.get_sales_data, ai_analytics, forecast_sales and the chatbot, from the daily rollup.
+        # Day totals are found through unique_daily_product_sales (product_id IS NULL, then day).
+        'sales_by_month': (
+            DailySales.objects.filter(product__isnull=True, day__gte=recent.date())
+            .annotate(month=ExtractMonth('day')).values('month').annotate(total_sales=Sum('revenue')),
+            None,
+        ),
+        'recent_product_sales': (
+            DailySales.objects.filter(product__isnull=False, day__gte=recent.date())
+            .values('product__name', 'product_id').annotate(units=Sum('units')).order_by(),
+            'daily_sales_day_product_idx',
+        ),
+        'recent_category_sales': (
+            DailySales.objects.filter(product__isnull=False, day__gte=recent.date())
+            .values(category=F('product__category')).annotate(total_sold=Sum('units')),
+            'daily_sales_day_product_idx',
+        ),
+        # forecasting.demand_matrix
+        'demand_matrix': (
+            DailySales.objects.filter(product__isnull=False, day__range=(recent.date(), timezone.localdate()),
+                                      units__gt=0).values_list('product_id', 'day', 'units'),
+            'daily_sales_day_product_idx',
+        ),
+        # /api/analytics/series/ filtered by product or category
+        'product_series': (
+            DailySales.objects.filter(product_id=1, day__range=(recent.date(), recent.date() + timedelta(days=90)))
+            .annotate(period=TruncWeek('day')).values('period').annotate(value=Sum('units')),
+            None,
+        ),
+        'category_series': (
+            DailySales.objects.filter(product__category='Tools', day__gte=recent.date())
+            .annotate(period=TruncMonth('day')).values('period').annotate(value=Sum('revenue')),
+            'product_category_idx',
+        ),
+        'orders_by_status': (
+            Order.objects.filter(status='completed', order_date__gte=recent), 'order_status_date_idx'
+        ),
+        # /api/analytics/monthly-stock/, once per page of products
+        'monthly_product_movements': (
+            InventoryTransaction.objects.filter(product_id__in=product_ids, transaction_type__in=('sale', 'restock'))
+            .filter(transaction_date__gte=recent)
+            .annotate(month=Case(When(transaction_date__lt=timezone.now(), then=Value(0)), default=Value(1)))
+            .values('product_id', 'month').annotate(total=Sum('quantity', filter=Q(transaction_type='sale'))),
+            'inventory_prod_type_date_idx',
+        ),
+        'product_history': (
+            InventoryTransaction.objects.filter(product_id=1).order_by('-transaction_date'),
+            'inventory_product_date_idx',
+        ),
+        # alerts.reconcile_stock_alerts, on every stock write
+        'open_alerts_for_products': (
+            StockAlert.objects.filter(product_id__in=product_ids, resolved=False), 'stockalert_open_product_idx'
+        ),
+        'newly_low_products': (newly_low_products(product_ids), 'stockalert_open_product_idx'),
+        # chatbot inventory stats
+        'category_values': (
+            Product.objects.values('category').annotate(
+                value=Coalesce(Sum(F('price') * F('quantity_in_stock'), output_field=FloatField()), 0.0)
+            ),
+            'product_category_idx',
+        ),
+        'products_in_category': (Product.objects.filter(category='Tools'), 'product_category_idx'),
+        # /api/export/, for a date window
+        'export_orders': (
+            Order.objects.filter(order_date__gte=recent).order_by('order_date', 'id'), None
+        ),
+        'export_inventory': (
+            InventoryTransaction.objects.filter(transaction_date__gte=recent)
+            .order_by('transaction_date', 'id').values_list('id', 'product__name'),
+            None,
+        ),
+        # /api/changes/ and compact_change_log
+        'changes_since': (ChangeLog.objects.filter(id__gt=0).order_by('id'), None),
+        'expired_tombstones': (
+            ChangeLog.objects.filter(action='delete', changed_at__lt=recent), None
+        ),
+    }
+
+
+def query_plan(queryset):
+    """The EXPLAIN QUERY PLAN steps of ``queryset`` on SQLite, one string each."""
+    connection = connections[queryset.db]
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(plan, index=None, full_scan=False):
+    """
+    What is wrong with a plan: full table scans (unless ``full_scan`` allows
+    them), or the expected index not being used.
+    """
+    problems = [] if full_scan else [f'full table scan: {step}' for step in plan if FULL_SCAN.match(step)]
+    if index and not any(re.search(rf'\bINDEX {re.escape(index)}\b', step) for step in plan):
+        problems.append(f'does not use {index}')
+    return problems
+
+
+def check_query_plans(names=None):
+    """``{name: (plan, problems)}`` for the registered hot queries, or those in ``names``."""
+    queries = hot_queries()
+    results = {}
+    for name in names or queries:
+        queryset, index = queries[name]
+        plan = query_plan(queryset)
+        results[name] = (plan, plan_problems(plan, index, full_scan=name in FULL_SCAN_ALLOWED))
+    return results
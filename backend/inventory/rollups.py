@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def sales_day(order_date):
+    """The rollup day of an order: its date in the current time zone, as TruncDate computes it."""
+    return timezone.localdate(order_date)
+
+
+def _line(product_id, order_date, units, revenue, lines):
+    """Deltas for one order line: its product's row and the day's totals."""
+    day = sales_day(order_date)
+    return [(product_id, day, units, revenue, lines), (None, day, units, revenue, 0)]
+
+
+def apply_sales(changes):
+    """
+    Adds ``(product_id, day, units, revenue, orders)`` deltas to the daily
+    sales rollup; a product_id of None targets the day's totals. Deltas for
+    the same row are merged first and each changed row costs one UPDATE.
+    Rows are only created for increases, so taking away the sales of a
+    product that is being deleted (with its rows) is a no-op. Rows taken
+    down to zero stay until the next rebuild.
+    """
+    from .models import DailySales
+    merged = defaultdict(lambda: [0, Decimal(0), 0])
+    for product_id, day, units, revenue, orders in changes:
+        row = merged[(product_id, day)]
+        row[0] += units
+        row[1] += Decimal(revenue)
+        row[2] += orders
+
+    for (product_id, day), (units, revenue, orders) in merged.items():
+        if not (units or revenue or orders):
+            continue
+        rows = DailySales.objects.filter(product_id=product_id, day=day)
+        increments = {'units': F('units') + units, 'revenue': F('revenue') + revenue, 'orders': F('orders') + orders}
+        if rows.update(**increments) or min(units, revenue, orders) < 0:
+            continue
+        try:
+            with transaction.atomic():
+                DailySales.objects.create(product_id=product_id, day=day, units=units, revenue=revenue, orders=orders)
+        except IntegrityError:
+            # Created concurrently
+            rows.update(**increments)
+
+
+def record_item_sales(item, previous=None):
+    """
+    Moves the rollup by an order item write. ``previous`` holds the saved
+    ``product_id``, ``quantity``, ``price`` and ``order__order_date`` of an
+    updated item; unchanged items cost no queries.
+    """
+    changes = _line(item.product_id, item.order.order_date, item.quantity, item.price, 1)
+    if previous is not None:
+        changes += _line(
+            previous['product_id'], previous['order__order_date'], -previous['quantity'], -previous['price'], -1
+        )
+    apply_sales(changes)
+
+
+def record_order_sales(order, previous_date=None):
+    """Counts a new order on its day, or moves an order and its lines when its date changed."""
+    if previous_date is None:
+        apply_sales([(None, sales_day(order.order_date), 0, 0, 1)])
+        return
+    if sales_day(previous_date) == sales_day(order.order_date):
+        return
+    changes = [(None, sales_day(previous_date), 0, 0, -1), (None, sales_day(order.order_date), 0, 0, 1)]
+    lines = order.items.values('product_id').annotate(units=Sum('quantity'), revenue=Sum('price'), lines=Count('id'))
+    for line in lines:
+        changes += _line(line['product_id'], previous_date, -line['units'], -line['revenue'], -line['lines'])
+        changes += _line(line['product_id'], order.order_date, line['units'], line['revenue'], line['lines'])
+    apply_sales(changes)
+
+
+def record_new_orders(orders, items):
+    """Adds a batch of just-created orders and their items (see ingest.create_orders) in one pass."""
+    dates = {order.pk: order.order_date for order in orders}
+    changes = [(None, sales_day(order.order_date), 0, 0, 1) for order in orders]
+    for item in items:
+        changes += _line(item.product_id, dates[item.order_id], item.quantity, item.price, 1)
+    apply_sales(changes)
+
+
+def _remove_item_sales(sender, instance, **kwargs):
+    # Also runs for items deleted with their order, before the order row goes
+    apply_sales(_line(instance.product_id, instance.order.order_date, -instance.quantity, -instance.price, -1))
+
+
+def _remove_order(sender, instance, **kwargs):
+    apply_sales([(None, sales_day(instance.order_date), 0, 0, -1)])
+
+
+def connect_rollup_signals():
+    """Takes deleted orders and items, including cascades, off the rollup."""
+    from .models import Order, OrderItem
+    post_delete.connect(_remove_item_sales, sender=OrderItem, dispatch_uid='rollup-delete-OrderItem')
+    post_delete.connect(_remove_order, sender=Order, dispatch_uid='rollup-delete-Order')
+
+
+def rebuild_daily_sales(since=None):
+    """
+    Recomputes the rollup from orders and their items, for every day or for
+    days from ``since`` on. Returns the number of rows written.
+    """
+    from .models import DailySales, Order, OrderItem
+
+    stale, orders, items = DailySales.objects.all(), Order.objects.all(), OrderItem.objects.all()
+    if since is not None:
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        stale = stale.filter(day__gte=since)
+        orders = orders.filter(order_date__gte=start)
+        items = items.filter(order__order_date__gte=start)
+    items = items.annotate(day=TruncDate('order__order_date'))
+
+    per_day = orders.annotate(day=TruncDate('order_date')).values('day').annotate(count=Count('id'))
+    per_day_items = items.values('day').annotate(units=Sum('quantity'), revenue=Sum('price'))
+    per_product = items.values('product_id', 'day').annotate(
+        units=Sum('quantity'), revenue=Sum('price'), orders=Count('id')
+    )
+    with transaction.atomic():
+        stale.delete()
+        totals = defaultdict(lambda: {'units': 0, 'revenue': Decimal(0), 'orders': 0})
+        for row in per_day:
+            totals[row['day']]['orders'] = row['count']
+        for row in per_day_items:
+            totals[row['day']].update(units=row['units'], revenue=row['revenue'])
+        DailySales.objects.bulk_create(
+            [DailySales(product_id=None, day=day, **values) for day, values in totals.items()],
+            batch_size=ROLLUP_BATCH_SIZE,
+        )
+        written, batch = len(totals), []
+        for row in per_product.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+            batch.append(DailySales(**row))
+            if len(batch) == ROLLUP_BATCH_SIZE:
+                DailySales.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        DailySales.objects.bulk_create(batch)
+    return written + len(batch)
@@ -0,0 +1,237 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+SEARCH_TABLE = 'inventory_product_search'
+# Matches are ranked within the first RANK_WINDOW hits in id order; later
+# pages continue in id order. FTS5's bm25() needs statistics over every
+# match of the query, which costs 10-100 ms on large catalogs for common
+# terms, while fetching a window of ids stops early.
+RANK_WINDOW = 100
+
+# Words of a chat question that say what is asked rather than which product
+# it is about; question_product_ids() searches only the remaining terms
+STOP_WORDS = frozenset("""
+    a about all an and any are at available be by can could do does for from get give have how i in is it
+    item items left level levels list low many me much my need of on or our out price prices product products
+    running show sell selling sold stock stocks tell than that the there these this those to units us was we
+    what when where which who why will with would you
+""".split())
+MAX_QUESTION_TERMS = 5
+
+# External-content FTS5 index over the searchable product columns. The
+# trigram tokenizer matches any substring of three or more characters.
+# Triggers keep it in sync; the UPDATE trigger only fires for the indexed
+# columns, so stock writes never touch it.
+CREATE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, category, description,
+        content='inventory_product', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF name, category, description
+    ON inventory_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+_available = {}
+
+
+def install_search_index(conn=connection):
+    """
+    Creates the FTS5 index and its triggers and rebuilds it from the product
+    table. Safe to run again, e.g. after a migration rebuilt
+    inventory_product and dropped its triggers. Returns False when the
+    database cannot host the index (not SQLite, or SQLite < 3.34 without the
+    trigram tokenizer); search then uses the fallback.
+    """
+    _available.pop(conn.alias, None)
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.inventory_fts_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.inventory_fts_probe")
+        except OperationalError:
+            return False
+        for statement in CREATE_SEARCH_INDEX:
+            cursor.execute(statement)
+    return True
+
+
+def drop_search_index(conn=connection):
+    _available.pop(conn.alias, None)
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for suffix in ('insert', 'delete', 'update'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def fts_available():
+    if connection.alias not in _available:
+        _available[connection.alias] = (
+            connection.vendor == 'sqlite' and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _available[connection.alias]
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _fts_ids(match, limit, offset=0):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _match_rank(query):
+    """Sort key for a product row: name prefix, then name, category and description matches."""
+    query = query.lower()
+
+    def rank(row):
+        pk, name, category, description = row
+        name = name.lower()
+        if name.startswith(query):
+            return (0, pk)
+        if query in name:
+            return (1, pk)
+        return (2 if category and query in category.lower() else 3, pk)
+    return rank
+
+
+def _similarity_rank(query):
+    """Sort key for fuzzy matches: most trigrams shared with the product name first."""
+    wanted = _trigrams(query.lower())
+    return lambda row: (-len(wanted & _trigrams(row[1].lower())), row[0])
+
+
+def _ranked_ids(match, rank, limit, offset):
+    from .models import Product
+    if offset >= RANK_WINDOW:
+        return _fts_ids(match, limit, offset)
+    window = _fts_ids(match, RANK_WINDOW)
+    rows = Product.objects.filter(pk__in=window).values_list('pk', 'name', 'category', 'description')
+    ids = [row[0] for row in sorted(rows, key=rank)][offset:offset + limit]
+    if len(window) == RANK_WINDOW and offset + limit > RANK_WINDOW:
+        ids += _fts_ids(match, offset + limit - RANK_WINDOW, RANK_WINDOW)
+    return ids
+
+
+def _fuzzy_match(query):
+    """
+    FTS5 query tolerating one typo per word: each word may also match by its
+    first or second half, and every word must match somehow.
+    """
+    groups = []
+    for word in query.lower().split():
+        alternatives = [word]
+        if len(word) >= 6:
+            alternatives += [word[:len(word) // 2], word[len(word) // 2:]]
+        elif len(word) >= 4:
+            alternatives += [word[:3], word[-3:]]
+        groups.append('(' + ' OR '.join(_phrase(alternative) for alternative in alternatives) + ')')
+    return ' AND '.join(groups)
+
+
+def search_product_ids(query, limit=20, offset=0):
+    """
+    Product ids matching ``query`` in name, category or description. Name
+    prefix matches come first, then name, category and description matches.
+    When nothing contains the query, products matching most of it despite a
+    typo are returned instead, closest name first.
+    """
+    query = ' '.join(query.split())
+    if len(query) < 3:
+        # Too short for trigrams: fall back to a name prefix on its index
+        from .filters import prefix_filter
+        from .models import Product
+        products = prefix_filter(Product.objects.all(), 'name', query).order_by('name_lower', 'pk')
+        return list(products.values_list('pk', flat=True)[offset:offset + limit])
+    if not fts_available():
+        return _fallback_ids(query, limit, offset)
+
+    phrase = _phrase(query)
+    ids = _ranked_ids(phrase, _match_rank(query), limit, offset)
+    if ids or (offset and _fts_ids(phrase, 1)):
+        return ids
+    return _ranked_ids(_fuzzy_match(query), _similarity_rank(query), limit, offset)
+
+
+def question_terms(question):
+    """The words of ``question`` that can name a product, plurals reduced to their singular."""
+    terms = []
+    for word in re.findall(r'\w+', question.lower()):
+        if len(word) < 3 or word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        if word not in terms:
+            terms.append(word)
+    return terms[:MAX_QUESTION_TERMS]
+
+
+def question_product_ids(question, limit=5):
+    """
+    Products a free-text question most likely refers to. Each of its
+    question_terms() is searched on its own, and products matching more of
+    them come first, then the order of the first term they matched.
+    """
+    matched = {}
+    for position, term in enumerate(question_terms(question)):
+        for rank, pk in enumerate(search_product_ids(term, limit=limit)):
+            hits, first = matched.get(pk, (0, (position, rank)))
+            matched[pk] = (hits + 1, first)
+    return sorted(matched, key=lambda pk: (-matched[pk][0], matched[pk][1]))[:limit]
+
+
+def _fallback_ids(query, limit, offset):
+    """Same contract as the FTS5 path for databases without it; scans the product table."""
+    from .models import Product
+    matches = Product.objects.filter(
+        Q(name__icontains=query) | Q(category__icontains=query) | Q(description__icontains=query)
+    ).annotate(score=Case(
+        When(name__istartswith=query, then=Value(0)),
+        When(name__icontains=query, then=Value(1)),
+        When(category__icontains=query, then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )).order_by('score', 'pk')
+    ids = list(matches.values_list('pk', flat=True)[offset:offset + limit])
+    if ids or (offset and matches.exists()):
+        return ids
+
+    rows = list(Product.objects.values_list('pk', 'name', 'category', 'description'))
+    wanted = _trigrams(query.lower())
+    close = [row for row in rows if wanted & _trigrams(row[1].lower())]
+    return [row[0] for row in sorted(close, key=_similarity_rank(query))][offset:offset + limit]
@@ -1,15 +1,39 @@
 from rest_framework import serializers
 from decimal import Decimal
 from datetime import datetime
-from django.db.models import Sum
+from django.db import transaction
 from .models import Product, InventoryTransaction, Order, OrderItem, StockAlert
+from .movements import monthly_sales_and_stock
+from .stock import InsufficientStock
+from .stripes import live_stock
+
+# ✅ Sparse Fieldsets (?fields=id,name keeps only those fields on GET)
+class SparseFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET' or not request.query_params.get('fields'):
+            return
+        wanted = {name.strip() for name in request.query_params['fields'].split(',')}
+        # Unknown names are ignored; a list of only unknown names keeps every field
+        if wanted & set(self.fields):
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
 
 # ✅ Product Serializer
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.stock_stripes:
+            # Striped hot products hold their live stock in stripes
+            data['quantity_in_stock'] = instance.current_stock()
+        return data
+
 
 # ✅ Single Product Serializer (For Nested Use)
 class SingleProductSerializer(serializers.ModelSerializer):
@@ -20,7 +44,7 @@ class SingleProductSerializer(serializers.ModelSerializer):
 
 
 # ✅ Inventory Serializer (For Graphs and Detailed Data)
-class InventorySerializer(serializers.ModelSerializer):
+class InventorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = SingleProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), write_only=True, source='product'
@@ -55,24 +79,21 @@ class InventorySerializer(serializers.ModelSerializer):
             transaction_cost = (product.price + extra_charge) * quantity
             validated_data['transaction_cost'] = transaction_cost
 
-            # Validate stock for sales
-            if transaction_type == "sale" and product.quantity_in_stock < quantity:
+            # Validate stock for sales against live, unreserved stock (striped products included)
+            if transaction_type == "sale" and product.available_quantity < quantity:
                 raise serializers.ValidationError({"error": f"Not enough stock for {product.name}."})
-
-            # Generate stock alerts if threshold is crossed
-            if product.quantity_in_stock < product.threshold_level:
-                StockAlert.objects.get_or_create(
-                    product=product, resolved=False,
-                    defaults={'stock_level': product.quantity_in_stock}
-                )
         except Exception as e:
             raise serializers.ValidationError({"error": str(e)})
 
-        return super().create(validated_data)
+        # Stock and stock alerts are updated atomically by InventoryTransaction.save
+        try:
+            return super().create(validated_data)
+        except InsufficientStock as e:
+            raise serializers.ValidationError({"error": e.detail})
 
 
 # ✅ Order Item Serializer
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
     price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     order = serializers.PrimaryKeyRelatedField(queryset=Order.objects.all(), required=False)
@@ -93,46 +114,46 @@ class OrderItemSerializer(serializers.ModelSerializer):
             product = validated_data['product']
             quantity = validated_data['quantity']
 
-            if product.quantity_in_stock < quantity:
+            if product.available_quantity < quantity:
                 raise serializers.ValidationError({"error": f"Insufficient stock for {product.name}."})
 
-            # Deduct stock and save product
-            product.quantity_in_stock -= quantity
-            product.save()
-
-            order_item = OrderItem.objects.create(
-                product=product,
-                quantity=quantity,
+            # OrderItem.save deducts or reserves stock atomically and refreshes stock alerts
+            return OrderItem.objects.create(
                 price=product.price * Decimal(quantity),
                 **validated_data
             )
-
-            # Generate stock alert if necessary
-            if product.quantity_in_stock < product.threshold_level:
-                StockAlert.objects.get_or_create(
-                    product=product, resolved=False,
-                    defaults={'stock_level': product.quantity_in_stock}
-                )
-
-            return order_item
+        except InsufficientStock as e:
+            raise serializers.ValidationError({"error": e.detail})
         except Exception as e:
             raise serializers.ValidationError({"error": str(e)})
 
+    def update(self, instance, validated_data):
+        # OrderItem.save moves stock or the reservation by the change in the line
+        try:
+            return super().update(instance, validated_data)
+        except InsufficientStock as e:
+            raise serializers.ValidationError({"error": e.detail})
+
 
 # ✅ Order Serializer
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
-    total_amount = serializers.SerializerMethodField()
+    # Maintained by OrderItem writes; reading the column avoids touching every line
+    total_amount = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
 
     class Meta:
         model = Order
         fields = ['id', 'customer_name', 'telephone_number', 'order_date', 'status', 'total_amount', 'items']
 
-    def get_total_amount(self, order):
-        try:
-            return sum(item.quantity * item.product.price for item in order.items.all())
-        except Exception:
-            return 0
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ?expand=items.product nests each line's full product on GET (see OrderExpandMixin)
+        request = self.context.get('request')
+        if (request is not None and request.method == 'GET' and 'items' in self.fields
+                and 'items.product' in self.context.get('expand', ())):
+            self.fields['items'].child.fields['product'] = ProductSerializer(read_only=True)
 
     def validate(self, data):
         # Skip validation if only updating status
@@ -147,24 +168,26 @@ class OrderSerializer(serializers.ModelSerializer):
         for item_data in items_data:
             product = item_data['product']
             quantity = item_data['quantity']
-            if product.quantity_in_stock < quantity:
+            if product.available_quantity < quantity:
                 raise serializers.ValidationError(
-                    {"error": f"Not enough stock for {product.name}. Available: {product.quantity_in_stock}"}
+                    {"error": f"Not enough stock for {product.name}. Available: {product.available_quantity}"}
                 )
         return data
 
     def create(self, validated_data):
         try:
             items_data = validated_data.pop('items')
-            order = Order.objects.create(**validated_data)
-            
-            # Create all items after validating the entire order
-            for item_data in items_data:
-                OrderItem.objects.create(order=order, **item_data)
-            
-            # Update order total
-            order.update_total_amount()
+            # A line that runs out of stock mid-order rolls back the whole order
+            with transaction.atomic():
+                order = Order.objects.create(**validated_data)
+
+                # Create all items after validating the entire order
+                # Each item adds its line price to the order total as it is saved
+                for item_data in items_data:
+                    OrderItem.objects.create(order=order, **item_data)
             return order
+        except InsufficientStock as e:
+            raise serializers.ValidationError({"error": e.detail})
         except Exception as e:
             raise serializers.ValidationError({"error": str(e)})
             
@@ -175,17 +198,34 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         try:
-            # Only allow updating status
+            # Only allow updating status; completing an order commits its reservations
             if 'status' in validated_data:
                 instance.status = validated_data['status']
                 instance.save()
             return instance
+        except InsufficientStock as e:
+            raise serializers.ValidationError({"error": e.detail})
         except Exception as e:
             raise serializers.ValidationError({"error": str(e)})
 
 
+# ✅ Bulk Order Serializers (For POS Batch Replays)
+class BulkOrderItemSerializer(serializers.Serializer):
+    # Plain ids: products are resolved for the whole batch in one query
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class BulkOrderSerializer(serializers.ModelSerializer):
+    items = BulkOrderItemSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Order
+        fields = ['customer_name', 'telephone_number', 'order_date', 'status', 'items']
+
+
 # ✅ Stock Alert Serializer
-class StockAlertSerializer(serializers.ModelSerializer):
+class StockAlertSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), write_only=True
     )
@@ -199,59 +239,25 @@ class StockAlertSerializer(serializers.ModelSerializer):
 
 # ✅ Monthly Sales and Stock Summary Serializer (For Graphing and Reporting)
 class MonthlySalesStockSummarySerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    product_name = serializers.CharField()
     month = serializers.CharField()  # 'YYYY-MM' format
+    sales_units = serializers.IntegerField()
     sales = serializers.DecimalField(max_digits=12, decimal_places=2)
+    restock_units = serializers.IntegerField()
     restocks = serializers.DecimalField(max_digits=12, decimal_places=2)
     stock_level = serializers.DecimalField(max_digits=12, decimal_places=2)
 
     @staticmethod
-    def get_monthly_sales_and_stock():
+    def get_monthly_sales_and_stock(products=None, date_after=None, date_before=None):
         """
-        Fetches monthly data for sales, restocks, and stock levels.
+        Fetches monthly data for sales, restocks, and stock levels of
+        ``products`` (Product objects annotated with ``live_stock``; every
+        product by default) with one grouped query.
         """
-        try:
-            months_data = []
-            all_products = Product.objects.all()
-
-            for product in all_products:
-                # Get total sales and restocks per product grouped by month
-                sales = InventoryTransaction.objects.filter(
-                    product=product,
-                    transaction_type="sale"
-                ).values('transaction_date__year', 'transaction_date__month').annotate(
-                    total_sales=Sum('quantity')
-                )
-
-                restocks = InventoryTransaction.objects.filter(
-                    product=product,
-                    transaction_type="restock"
-                ).values('transaction_date__year', 'transaction_date__month').annotate(
-                    total_restocks=Sum('quantity')
-                )
-
-                # Merge sales and restocks data for each month
-                for sale in sales:
-                    month_str = f"{sale['transaction_date__year']}-{str(sale['transaction_date__month']).zfill(2)}"
-                    sales_amount = sale.get('total_sales', 0)
-
-                    # Find corresponding restock data for the same month
-                    restock_amount = next(
-                        (item['total_restocks'] for item in restocks
-                         if item['transaction_date__year'] == sale['transaction_date__year'] and
-                            item['transaction_date__month'] == sale['transaction_date__month']),
-                        0
-                    )
-
-                    months_data.append({
-                        'month': month_str,
-                        'sales': Decimal(sales_amount) * product.price,
-                        'restocks': Decimal(restock_amount) * product.price,
-                        'stock_level': Decimal(product.quantity_in_stock)
-                    })
-            return months_data
-        except Exception as e:
-            # Log error or handle it as needed.
-            return []
+        if products is None:
+            products = Product.objects.annotate(live_stock=live_stock()).order_by('id')
+        return monthly_sales_and_stock(products, date_after, date_before)
 
 class InventoryForecastSerializer(serializers.Serializer):
     file = serializers.FileField()
@@ -0,0 +1,310 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .alerts import mark_dirty
+from .models import Product, StockMovement, StockReservation
+from .stripes import add_to_stripe, live_stock, take_from_stripe
+
+
+class InsufficientStock(ValidationError):
+    """Raised when a stock decrement would take a product below zero."""
+
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        self.detail = f"Not enough stock for {product.name}."
+        super().__init__({"error": self.detail})
+
+
+def _lock(rows):
+    """Locks the rows in primary key order on backends with row locks."""
+    if connection.features.has_select_for_update:
+        # A fixed order means concurrent batches cannot deadlock
+        list(rows.select_for_update().order_by('pk').values_list('pk', flat=True))
+
+
+def _apply_to_stripes(product, delta):
+    """Applies ``delta`` to one of a striped product's stripes; False if short or no longer striped."""
+    if delta < 0:
+        return take_from_stripe(product, -delta)
+    return not delta or bool(add_to_stripe(product, delta))
+
+
+def _unreserved(products):
+    """Annotates live stock not held by reservations as ``unreserved``."""
+    return products.annotate(unreserved=live_stock() - F('reserved_quantity'))
+
+
+def adjust_stock(product, delta, reason='adjustment', keep_reserved=False):
+    """
+    Atomically applies ``delta`` to the product's stock and returns the new level.
+
+    The change is a single conditional ``UPDATE ... SET quantity_in_stock =
+    quantity_in_stock + delta`` so concurrent writers never overwrite each
+    other's work, and a decrement only succeeds when enough stock is left.
+    On backends with row locks the product row is locked first, which keeps
+    the stock alert reconciliation serialized per product. Every change is
+    appended to the stock ledger in the same transaction, and the in-memory
+    ``product`` is refreshed with the committed level. With ``keep_reserved``
+    a decrement may not dip into stock held by reservations.
+
+    Striped hot products are changed through one of their stripes instead
+    and never touch (or lock) the product row; their returned level is the
+    last folded ``quantity_in_stock``.
+    """
+    delta = int(delta)
+    with transaction.atomic():
+        rows = Product.objects.filter(pk=product.pk)
+        if product.stock_stripes and keep_reserved and delta < 0:
+            # Stripes cannot see reservations; check the unreserved total first
+            if not _unreserved(rows).filter(unreserved__gte=-delta).exists():
+                raise InsufficientStock(product, -delta)
+        striped = bool(product.stock_stripes) and _apply_to_stripes(product, delta)
+        if not striped and product.stock_stripes:
+            # Either short, or the product was unstriped since it was loaded
+            product.stock_stripes = rows.values_list('stock_stripes', flat=True).get()
+            if product.stock_stripes:
+                raise InsufficientStock(product, -delta)
+
+        if not striped:
+            _lock(rows)
+            if delta < 0:
+                floor = F('reserved_quantity') - delta if keep_reserved else -delta
+                updated = rows.filter(stock_stripes=0, quantity_in_stock__gte=floor).update(
+                    quantity_in_stock=F('quantity_in_stock') + delta
+                )
+            else:
+                updated = not delta or rows.filter(stock_stripes=0).update(
+                    quantity_in_stock=F('quantity_in_stock') + delta
+                )
+            if not updated:
+                product.stock_stripes, product.quantity_in_stock = rows.values_list(
+                    'stock_stripes', 'quantity_in_stock'
+                ).get()
+                # The product was striped since it was loaded
+                if not (product.stock_stripes and _apply_to_stripes(product, delta)):
+                    raise InsufficientStock(product, -delta)
+                striped = True
+
+        if delta:
+            StockMovement.objects.create(product_id=product.pk, delta=delta, reason=reason)
+        if not striped:
+            product.quantity_in_stock = rows.values_list('quantity_in_stock', flat=True).get()
+        mark_dirty([product.pk])
+    return product.quantity_in_stock
+
+
+def remove_stock(product, quantity, reason='sale', keep_reserved=False):
+    """Takes ``quantity`` units out of stock, raising InsufficientStock if short."""
+    return adjust_stock(product, -int(quantity), reason, keep_reserved)
+
+
+def add_stock(product, quantity, reason='restock'):
+    """Puts ``quantity`` units back into stock."""
+    return adjust_stock(product, int(quantity), reason)
+
+
+def apply_stock_deltas(deltas, reason='order', keep_reserved=False):
+    """
+    Applies a ``{product_id: delta}`` map in one conditional UPDATE and returns
+    the new ``{product_id: quantity_in_stock}`` levels.
+
+    Either every delta is applied or none is: if any product would drop below
+    zero (or below its reserved stock, with ``keep_reserved``) the update is
+    rolled back and InsufficientStock is raised for it. Striped hot products
+    are skipped by the UPDATE and changed through their stripes.
+    """
+    deltas = {pk: int(delta) for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    rows = Product.objects.filter(pk__in=deltas)
+    # Only decrements have a floor; with keep_reserved it sits above the reserved stock
+    reserved = F('reserved_quantity') if keep_reserved else Value(0)
+    floor = Case(
+        *[When(pk=pk, then=reserved + Value(-delta)) for pk, delta in deltas.items() if delta < 0],
+        default=Value(0), output_field=IntegerField()
+    )
+    short = None
+    with transaction.atomic():
+        _lock(rows)
+
+        updated = rows.filter(stock_stripes=0, quantity_in_stock__gte=floor).update(
+            quantity_in_stock=F('quantity_in_stock') + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                output_field=IntegerField()
+            )
+        )
+        if updated < len(deltas):
+            striped = _unreserved(rows.filter(stock_stripes__gt=0).only('pk', 'name', 'stock_stripes'))
+            for product in striped:
+                delta = deltas[product.pk]
+                dips_into_reserved = keep_reserved and delta < 0 and product.unreserved < -delta
+                if dips_into_reserved or not _apply_to_stripes(product, delta):
+                    short = product
+                    break
+                updated += 1
+        if updated == len(deltas):
+            StockMovement.objects.bulk_create([
+                StockMovement(product_id=pk, delta=delta, reason=reason) for pk, delta in deltas.items()
+            ])
+            levels = dict(rows.annotate(stock=live_stock()).values_list('pk', 'stock'))
+            mark_dirty(levels)
+            return levels
+        transaction.set_rollback(True)
+
+    if short is not None:
+        raise InsufficientStock(short, -deltas[short.pk])
+    short = rows.filter(stock_stripes=0, quantity_in_stock__lt=floor).first()
+    if short is None:
+        raise Product.DoesNotExist("One or more products in the stock update do not exist.")
+    raise InsufficientStock(short, -deltas[short.pk])
+
+
+def apply_reservation_deltas(deltas):
+    """
+    Moves ``Product.reserved_quantity`` by a ``{product_id: delta}`` map in one
+    conditional UPDATE.
+
+    This is the availability check for orders: a positive delta only succeeds
+    while ``quantity_in_stock - reserved_quantity`` covers it, which reads one
+    indexed row per product no matter how many reservations are open.
+    Releases (negative deltas) are never refused. Either every delta is
+    applied or none is, raising InsufficientStock.
+    """
+    deltas = {pk: int(delta) for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    rows = Product.objects.filter(pk__in=deltas)
+    needed = F('reserved_quantity') + Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items() if delta > 0],
+        default=Value(0), output_field=IntegerField()
+    )
+    # Releases always go through, even when stock has since dropped below what was reserved
+    covered = Q(pk__in=[pk for pk, delta in deltas.items() if delta < 0]) | Q(stock__gte=needed)
+    with transaction.atomic():
+        _lock(rows)
+
+        updated = rows.annotate(stock=live_stock()).filter(covered).update(
+            reserved_quantity=Greatest(F('reserved_quantity') + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                output_field=IntegerField()
+            ), Value(0))
+        )
+        if updated == len(deltas):
+            return
+        transaction.set_rollback(True)
+
+    short = rows.annotate(stock=live_stock()).exclude(covered).first()
+    if short is None:
+        raise Product.DoesNotExist("One or more products in the reservation do not exist.")
+    raise InsufficientStock(short, deltas[short.pk])
+
+
+def reserve_stock(order_item):
+    """
+    Holds stock for an item of a pending order for
+    ``STOCK_RESERVATION_TTL_MINUTES``, raising InsufficientStock if the
+    product has too little unreserved stock.
+    """
+    expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_TTL_MINUTES)
+    with transaction.atomic():
+        apply_reservation_deltas({order_item.product_id: order_item.quantity})
+        return StockReservation.objects.create(
+            product_id=order_item.product_id,
+            order_id=order_item.order_id,
+            order_item=order_item,
+            quantity=order_item.quantity,
+            expires_at=expires_at,
+        )
+
+
+def release_reservations(reservations):
+    """
+    Releases the active reservations in the ``reservations`` queryset and
+    returns how many were released. Released rows stay until their order
+    completes or is deleted.
+    """
+    with transaction.atomic():
+        active = reservations.filter(released=False)
+        if connection.features.has_select_for_update:
+            active = active.select_for_update()
+        held = list(active.values_list('pk', 'product_id', 'quantity'))
+        if not held:
+            return 0
+
+        totals = defaultdict(int)
+        for _, product_id, quantity in held:
+            totals[product_id] -= quantity
+        apply_reservation_deltas(totals)
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in held]).update(released=True)
+    return len(held)
+
+
+def commit_reservations(order):
+    """
+    Turns an order's reservations into stock sales when it completes and
+    returns the new stock levels.
+
+    Active reservations move straight from reserved to sold. Quantities whose
+    reservation already expired are taken from unreserved stock again, which
+    raises InsufficientStock if someone else has claimed it in the meantime.
+    """
+    with transaction.atomic():
+        reservations = StockReservation.objects.filter(order=order)
+        if connection.features.has_select_for_update:
+            reservations = reservations.select_for_update()
+        rows = list(reservations.values_list('product_id', 'quantity', 'released'))
+        if not rows:
+            return {}
+
+        held, sold = defaultdict(int), defaultdict(int)
+        for product_id, quantity, released in rows:
+            sold[product_id] -= quantity
+            if not released:
+                held[product_id] -= quantity
+        apply_reservation_deltas(held)
+        StockReservation.objects.filter(order=order).delete()
+        return apply_stock_deltas(sold, reason='order', keep_reserved=True)
+
+
+def release_expired_reservations(batch_size=500, now=None):
+    """
+    Releases every reservation that expired by ``now`` in batches of
+    ``batch_size``, each in its own short transaction. Returns the count.
+    """
+    now = now or timezone.now()
+    expired = StockReservation.objects.filter(released=False, expires_at__lte=now)
+    released = 0
+    while True:
+        batch = list(expired.order_by('expires_at').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return released
+        released += release_reservations(StockReservation.objects.filter(pk__in=batch))
+
+
+def recount_reservations():
+    """
+    Rebuilds every ``Product.reserved_quantity`` from the active reservations
+    in one UPDATE, repairing drift from bulk deletes. Returns how many
+    products were off.
+    """
+    active = StockReservation.objects.filter(
+        product=OuterRef('pk'), released=False
+    ).values('product').annotate(total=Sum('quantity')).values('total')
+    expected = Coalesce(Subquery(active), Value(0), output_field=IntegerField())
+
+    with transaction.atomic():
+        drifted = Product.objects.annotate(expected=expected).exclude(reserved_quantity=F('expected'))
+        count = drifted.count()
+        if count:
+            Product.objects.filter(pk__in=drifted.values('pk')).update(reserved_quantity=expected)
+    return count
@@ -0,0 +1,125 @@
+import random
+
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Product, StockStripe
+
+
+def live_stock():
+    """
+    Expression for a product's current stock: the stripe total for striped
+    products, ``quantity_in_stock`` for everything else. Only striped rows
+    pay for the subquery.
+    """
+    stripe_total = StockStripe.objects.filter(
+        product=OuterRef('pk')
+    ).values('product').annotate(total=Sum('quantity')).values('total')
+    return Case(
+        When(stock_stripes__gt=0, then=Coalesce(Subquery(stripe_total), Value(0))),
+        default=F('quantity_in_stock'),
+        output_field=IntegerField(),
+    )
+
+
+def stripe_total(product_id):
+    """Sums the stripes of one product."""
+    return StockStripe.objects.filter(product_id=product_id).aggregate(total=Sum('quantity'))['total'] or 0
+
+
+def spread_stock(product_id, stripes, total):
+    """Sets the stripes of a product to an even split of ``total`` with one UPDATE."""
+    share, extra = divmod(total, stripes)
+    StockStripe.objects.filter(product_id=product_id).update(quantity=Case(
+        When(index__lt=extra, then=Value(share + 1)),
+        default=Value(share),
+        output_field=IntegerField(),
+    ))
+
+
+def stripe_product(product, stripes):
+    """
+    Splits a product's stock across ``stripes`` counter rows, or folds it back
+    into ``quantity_in_stock`` when ``stripes`` is 0. The total is unchanged.
+    """
+    with transaction.atomic():
+        rows = Product.objects.filter(pk=product.pk)
+        if connection.features.has_select_for_update:
+            rows.select_for_update().values_list('pk', flat=True).get()
+        total = rows.annotate(stock=live_stock()).values_list('stock', flat=True).get()
+
+        StockStripe.objects.filter(product_id=product.pk).delete()
+        if stripes:
+            StockStripe.objects.bulk_create([
+                StockStripe(product_id=product.pk, index=index) for index in range(stripes)
+            ])
+            spread_stock(product.pk, stripes, total)
+        rows.update(stock_stripes=stripes, quantity_in_stock=total)
+    product.stock_stripes = stripes
+    product.quantity_in_stock = total
+
+
+def add_to_stripe(product, quantity):
+    """Adds ``quantity`` units to one randomly chosen stripe; returns 0 if the product has no stripes."""
+    return StockStripe.objects.filter(
+        product_id=product.pk, index=random.randrange(product.stock_stripes)
+    ).update(quantity=F('quantity') + quantity)
+
+
+def take_from_stripe(product, quantity):
+    """
+    Takes ``quantity`` units from one randomly chosen stripe, so concurrent
+    sales of a hot product usually touch different rows. When that stripe
+    runs short, units are borrowed from its siblings. Returns False if all
+    stripes together hold less than ``quantity``.
+    """
+    index = random.randrange(product.stock_stripes)
+    stripes = StockStripe.objects.filter(product_id=product.pk)
+    for attempt in range(3):
+        if stripes.filter(index=index, quantity__gte=quantity).update(quantity=F('quantity') - quantity):
+            return True
+        if not _borrow(product.pk, index, quantity):
+            return False
+    return False
+
+
+def _borrow(product_id, index, needed):
+    """
+    Moves units from sibling stripes, fullest first, into stripe ``index``
+    until it holds ``needed``. Each move is a conditional UPDATE, so a
+    sibling drained concurrently is simply skipped. Returns False if the
+    product as a whole is short.
+    """
+    stripes = StockStripe.objects.filter(product_id=product_id)
+    if connection.features.has_select_for_update:
+        # The slow path locks every stripe of the product in a fixed order
+        list(stripes.select_for_update().order_by('index').values_list('pk', flat=True))
+    levels = dict(stripes.values_list('index', 'quantity'))
+    if sum(levels.values()) < needed:
+        return False
+
+    missing = needed - levels.get(index, 0)
+    for sibling, quantity in sorted(levels.items(), key=lambda level: -level[1]):
+        if missing <= 0:
+            break
+        take = min(quantity, missing)
+        if sibling == index or not take:
+            continue
+        if stripes.filter(index=sibling, quantity__gte=take).update(quantity=F('quantity') - take):
+            stripes.filter(index=index).update(quantity=F('quantity') + take)
+            missing -= take
+    return True
+
+
+def fold_stock_stripes(product_ids=None):
+    """
+    Writes the stripe totals of striped products back into
+    ``quantity_in_stock`` so column-based reads catch up. Only products whose
+    column is behind are updated. Returns the number folded.
+    """
+    products = Product.objects.filter(stock_stripes__gt=0)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    behind = products.annotate(stock=live_stock()).exclude(quantity_in_stock=F('stock'))
+    return Product.objects.filter(pk__in=behind.values('pk')).update(quantity_in_stock=live_stock())
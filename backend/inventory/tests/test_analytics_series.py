@@ -0,0 +1,75 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.models import Product, Order, OrderItem
+from inventory.series import bucket_count, bucket_starts
+
+
+class AnalyticsSeriesTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.url = reverse('analytics-series')
+        self.tools = Product.objects.create(
+            name='Hammer', category='Tools', quantity_in_stock=500, price=Decimal('10.00'), threshold_level=0
+        )
+        self.garden = Product.objects.create(
+            name='Rake', category='Garden', quantity_in_stock=500, price=Decimal('2.50'), threshold_level=0
+        )
+        # Same month a year apart, then two orders in one week of March
+        for day, product, quantity in (
+            (date(2024, 1, 10), self.tools, 1),
+            (date(2025, 1, 10), self.tools, 2),
+            (date(2025, 3, 4), self.tools, 3),
+            (date(2025, 3, 6), self.garden, 4),
+        ):
+            order = Order.objects.create(
+                customer_name='Test Customer', telephone_number='+12025550109',
+                order_date=datetime(day.year, day.month, day.day, 12, tzinfo=dt_timezone.utc),
+            )
+            OrderItem.objects.create(order=order, product=product, quantity=quantity)
+
+    def series(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return {point['period']: point['value'] for point in response.data['series']}, response.data
+
+    def test_monthly_revenue_keeps_years_apart(self):
+        """Test months of different years are separate buckets and empty months are zero."""
+        points, data = self.series(start='2024-12-15', end='2025-03-31')
+        self.assertEqual(points, {'2024-12-01': 0, '2025-01-01': 20.0, '2025-02-01': 0, '2025-03-01': 40.0})
+        self.assertEqual(data['total'], 60.0)
+
+    def test_weekly_units_and_filters(self):
+        """Test weekly buckets start on Monday and product and category filters apply."""
+        points, _ = self.series(granularity='week', metric='units', start='2025-03-01', end='2025-03-12')
+        self.assertEqual(points, {'2025-02-24': 0, '2025-03-03': 7, '2025-03-10': 0})
+        points, _ = self.series(granularity='week', metric='units', start='2025-03-03', end='2025-03-09',
+                                category='Garden')
+        self.assertEqual(points, {'2025-03-03': 4})
+        points, _ = self.series(granularity='quarter', metric='orders', start='2024-01-01', end='2025-12-31',
+                                product=self.tools.pk)
+        self.assertEqual(list(points.values()), [1, 0, 0, 0, 2, 0, 0, 0])
+
+    def test_invalid_parameters(self):
+        """Test unknown granularities, metrics, bad dates and oversized ranges are rejected."""
+        for params in ({'granularity': 'hour'}, {'metric': 'profit'}, {'start': 'yesterday'},
+                       {'start': '2025-02-01', 'end': '2025-01-01'}, {'product': 'abc'},
+                       {'granularity': 'day', 'start': '1900-01-01', 'end': '2025-01-01'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+
+    def test_bucket_starts(self):
+        """Test bucket boundaries and counts agree for every granularity."""
+        start, end = date(2024, 11, 20), date(2025, 2, 3)
+        self.assertEqual(bucket_starts(start, end, 'quarter').tolist(), [date(2024, 10, 1), date(2025, 1, 1)])
+        for granularity in ('day', 'week', 'month', 'quarter'):
+            with self.subTest(granularity=granularity):
+                self.assertEqual(len(bucket_starts(start, end, granularity)), bucket_count(start, end, granularity))
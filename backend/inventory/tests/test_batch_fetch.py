@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, Order, OrderItem
+from inventory.stripes import stripe_product
+
+
+class BatchFetchTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', quantity_in_stock=50, price=Decimal('3.00'), threshold_level=0
+            )
+            for i in range(5)
+        ]
+        stripe_product(self.products[1], 2)
+        self.orders = []
+        for i in range(3):
+            order = Order.objects.create(
+                customer_name=f'Customer {i}', telephone_number='+12025550109', status='completed'
+            )
+            for product in self.products[:2]:
+                OrderItem.objects.create(order=order, product=product, quantity=1)
+            self.orders.append(order)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, queries
+
+    def test_products_by_ids(self):
+        """Test ?ids= returns exactly those products with one product query."""
+        wanted = [self.products[3].pk, self.products[0].pk, self.products[1].pk, 999]
+        response, queries = self.get(reverse('product-list'), {'ids': ','.join(map(str, wanted))})
+        self.assertEqual([p['id'] for p in response.data], sorted(wanted[:3]))
+        self.assertEqual(response.data[1]['quantity_in_stock'], 47)
+        product_queries = [q['sql'] for q in queries if 'FROM "inventory_product"' in q['sql']]
+        self.assertEqual(len(product_queries), 1)
+        self.assertIn(' IN (', product_queries[0])
+
+    def test_ids_beyond_default_page_size_come_in_one_page(self):
+        """Test a batch larger than the default page size is not split across pages."""
+        Product.objects.bulk_create([
+            Product(name=f'Bulk {i}', quantity_in_stock=1, price=Decimal('1.00'), threshold_level=0)
+            for i in range(120)
+        ])
+        ids = list(Product.objects.values_list('pk', flat=True))
+        response, _ = self.get(reverse('product-list'), {'ids': ','.join(map(str, ids))})
+        self.assertEqual(len(response.data), len(ids))
+        self.assertNotIn('Link', response)
+
+    def test_invalid_ids(self):
+        """Test malformed and oversized id lists are rejected."""
+        response = self.client.get(reverse('product-list'), {'ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('order-list'), {'ids': ','.join(map(str, range(1, 1002)))})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_orders_by_ids(self):
+        """Test ?ids= on orders keeps the nested items."""
+        wanted = [self.orders[0].pk, self.orders[2].pk]
+        response, _ = self.get(reverse('order-list'), {'ids': ','.join(map(str, wanted))})
+        self.assertEqual(sorted(o['id'] for o in response.data), wanted)
+        self.assertEqual(response.data[0]['items'][0]['product'], self.products[0].pk)
+
+    def test_expand_items_product(self):
+        """Test ?expand=items.product nests full products, each loaded once with live stock."""
+        response, queries = self.get(reverse('order-list'), {'expand': 'items.product'})
+        products = [item['product'] for order in response.data for item in order['items']]
+        self.assertEqual(len(products), 6)
+        striped = next(p for p in products if p['id'] == self.products[1].pk)
+        self.assertEqual(striped['quantity_in_stock'], 47)
+        self.assertEqual(striped['name'], 'Product 1')
+        product_queries = [q['sql'] for q in queries if 'FROM "inventory_product"' in q['sql']]
+        self.assertEqual(len(product_queries), 1)
+
+        response, _ = self.get(reverse('single-order', args=[self.orders[0].pk]), {'expand': 'items.product'})
+        self.assertEqual(response.data['items'][0]['product']['price'], '3.00')
+
+    def test_unknown_expansion(self):
+        """Test expanding an unsupported relation is rejected."""
+        response = self.client.get(reverse('order-list'), {'expand': 'customer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.models import ChangeLog, Product, InventoryTransaction, Order, OrderItem, StockAlert
+from inventory.stripes import stripe_product
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.url = reverse('change-feed')
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=50,
+            price=Decimal('10.00'),
+            threshold_level=5
+        )
+        self.cursor = self.client.get(self.url).data['cursor']
+
+    def changes(self, since=None, **params):
+        response = self.client.get(self.url, {'since': self.cursor if since is None else since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def keys(self, data):
+        return [(change['model'], change['id'], change['action']) for change in data['changes']]
+
+    def test_bootstrap_returns_current_cursor(self):
+        """Test a request without 'since' returns the latest cursor and no changes."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cursor'], ChangeLog.objects.latest('id').id)
+        self.assertEqual(response.data['changes'], [])
+        self.assertEqual(self.changes()['changes'], [])
+
+    def test_creates_updates_and_deletes_are_compacted(self):
+        """Test each object appears once with its latest state, deletes as tombstones."""
+        self.product.name = 'Renamed Product'
+        self.product.save()
+        Product.objects.filter(pk=self.product.pk).update(price=Decimal('12.50'))
+        doomed = Product.objects.create(name='Doomed', quantity_in_stock=1, price=Decimal('1.00'), threshold_level=0)
+        doomed_id = doomed.pk
+        doomed.delete()
+
+        data = self.changes()
+        self.assertEqual(self.keys(data), [('product', self.product.pk, 'upsert'), ('product', doomed_id, 'delete')])
+        self.assertEqual(data['changes'][0]['data']['name'], 'Renamed Product')
+        self.assertEqual(data['changes'][0]['data']['price'], '12.50')
+        self.assertIsNone(data['changes'][1]['data'])
+        self.assertFalse(data['more'])
+        self.assertEqual(self.changes(since=data['cursor'])['changes'], [])
+
+    def test_related_writes_report_their_parent(self):
+        """Test order items report their order and stock writes report the product."""
+        order = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+        self.cursor = self.changes()['cursor']
+        item = OrderItem.objects.create(order=order, product=self.product, quantity=2)
+        data = self.changes()
+        self.assertIn(('order', order.pk, 'upsert'), self.keys(data))
+        order_data = next(change['data'] for change in data['changes'] if change['model'] == 'order')
+        self.assertEqual(len(order_data['items']), 1)
+
+        self.cursor = data['cursor']
+        item.delete()
+        self.assertIn(('order', order.pk, 'upsert'), self.keys(self.changes()))
+
+        self.cursor = self.changes()['cursor']
+        order_id = order.pk
+        order.delete()
+        self.assertEqual(self.keys(self.changes()), [('order', order_id, 'delete')])
+
+    def test_inventory_alerts_and_stripes_are_recorded(self):
+        """Test transactions, stock alerts and striped stock writes appear in the feed."""
+        transaction = InventoryTransaction.objects.create(product=self.product, quantity=5, transaction_type='restock')
+        alert = StockAlert.objects.create(product=self.product, stock_level=3)
+        keys = self.keys(self.changes())
+        self.assertIn(('inventorytransaction', transaction.pk, 'upsert'), keys)
+        self.assertIn(('stockalert', alert.pk, 'upsert'), keys)
+        self.assertIn(('product', self.product.pk, 'upsert'), keys)
+
+        stripe_product(self.product, 4)
+        self.cursor = self.changes()['cursor']
+        InventoryTransaction.objects.create(product=self.product, quantity=3, transaction_type='sale')
+        data = self.changes()
+        product = next(change['data'] for change in data['changes'] if change['model'] == 'product')
+        self.assertEqual(product['quantity_in_stock'], 52)
+
+    def test_pages_follow_the_cursor(self):
+        """Test 'limit' pages through the log and 'more' tells when to keep going."""
+        products = [
+            Product.objects.create(name=f'Product {i}', quantity_in_stock=1, price=Decimal('1.00'), threshold_level=0)
+            for i in range(5)
+        ]
+        seen, cursor, more = [], self.cursor, True
+        while more:
+            data = self.changes(since=cursor, limit=2)
+            seen += [change['id'] for change in data['changes']]
+            cursor, more = data['cursor'], data['more']
+        self.assertEqual(seen, [product.pk for product in products])
+
+    def test_invalid_cursor(self):
+        """Test non-integer cursors are rejected."""
+        response = self.client.get(self.url, {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_compaction_keeps_latest_and_expires_tombstones(self):
+        """Test compact_change_log drops superseded entries and old tombstones, then rejects older cursors."""
+        for price in ('11.00', '12.00', '13.00'):
+            Product.objects.filter(pk=self.product.pk).update(price=Decimal(price))
+        doomed = Product.objects.create(name='Doomed', quantity_in_stock=1, price=Decimal('1.00'), threshold_level=0)
+        doomed.delete()
+        before = self.keys(self.changes(since=0))
+
+        call_command('compact_change_log', stdout=StringIO())
+        self.assertEqual(ChangeLog.objects.filter(model='product', object_id=self.product.pk).count(), 1)
+        self.assertEqual(self.keys(self.changes(since=0)), before)
+
+        ChangeLog.objects.filter(action='delete').update(changed_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command('compact_change_log', stdout=out)
+        self.assertIn('1 tombstones', out.getvalue())
+        self.assertEqual(self.client.get(self.url, {'since': 0}).status_code, status.HTTP_410_GONE)
+        latest = self.client.get(self.url).data['cursor']
+        self.assertEqual(self.changes(since=latest)['changes'], [])
@@ -0,0 +1,123 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, InventoryTransaction, Order, OrderItem, StockAlert, DataVersion
+from inventory.stripes import stripe_product
+from inventory.versions import EPOCH, bump_versions, get_versions
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=50,
+            price=Decimal('10.00'),
+            threshold_level=5
+        )
+        self.order = Order.objects.create(
+            customer_name='Test Customer', telephone_number='+12025550109', status='completed'
+        )
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def test_unchanged_list_returns_304_from_version_table(self):
+        """Test a matching If-None-Match is answered with 304 after one read of the version table."""
+        url = reverse('product-list')
+        etag = self.etag(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(queries), 1)
+        self.assertIn('inventory_dataversion', queries[0]['sql'])
+
+    def test_writes_change_etags(self):
+        """Test saves, set-based updates and deletes each produce a new ETag where they show."""
+        product_list, order_list = reverse('product-list'), reverse('order-list')
+        order_detail = reverse('single-order', args=[self.order.pk])
+        writes = [
+            (lambda: InventoryTransaction.objects.create(product=self.product, quantity=1, transaction_type='sale'),
+             [product_list, order_list, order_detail]),
+            (lambda: Order.objects.filter(pk=self.order.pk).update(customer_name='Renamed Customer'),
+             [order_list, order_detail]),
+            (lambda: OrderItem.objects.filter(order=self.order).delete(), [order_list, order_detail]),
+        ]
+        for write, urls in writes:
+            before = [self.etag(url) for url in urls]
+            write()
+            for url, old in zip(urls, before):
+                with self.subTest(url=url):
+                    self.assertNotEqual(self.etag(url), old)
+
+    def test_striped_sale_changes_product_etag(self):
+        """Test a sale that only touches stock stripes still invalidates product ETags."""
+        stripe_product(self.product, 2)
+        url = reverse('single-product', args=[self.product.pk])
+        etag = self.etag(url)
+        InventoryTransaction.objects.create(product=self.product, quantity=1, transaction_type='sale')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity_in_stock'], 47)
+
+    def test_bumps_spread_over_shards(self):
+        """Test concurrent-safe bumps land on several rows and the version is their sum."""
+        [before] = get_versions(['product'])
+        for _ in range(50):
+            bump_versions('product')
+        self.assertEqual(get_versions(['product']), [before + 50])
+        self.assertGreater(DataVersion.objects.filter(name='product').count(), 1)
+
+    def test_cascade_delete_changes_alert_etag(self):
+        """Test alerts removed by a product delete cascade invalidate the alert list."""
+        StockAlert.objects.create(product=self.product, stock_level=1)
+        url = reverse('stock-alert-list')
+        etag = self.etag(url)
+        self.product.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_bulk_orders_change_order_etag(self):
+        """Test orders written with bulk_create invalidate the order list."""
+        url = reverse('order-list')
+        etag = self.etag(url)
+        response = self.client.post(reverse('order-bulk'), [{
+            'customer_name': 'Bulk Customer',
+            'telephone_number': '+12025550109',
+            'status': 'completed',
+            'items': [{'product': self.product.pk, 'quantity': 1}],
+        }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_other_etags_and_missing_rows(self):
+        """Test a stale ETag gets the full body and a missing detail row is not tagged."""
+        response = self.client.get(reverse('product-list'), HTTP_IF_NONE_MATCH='W/"0"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get(reverse('single-product', args=[self.product.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+        response = self.client.get(reverse('single-product', args=[self.product.pk + 100]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse('single-product', args=[self.product.pk])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_database_changes_etags(self):
+        """Test ETags carry the database epoch, so the same counters on a recreated database do not match."""
+        url = reverse('product-list')
+        etag = self.etag(url)
+        DataVersion.objects.filter(name=EPOCH).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.chatbot import ChatbotAPIView
+from inventory.models import DataVersion, Product, Order, OrderItem, StockAlert
+from inventory.versions import EPOCH
+
+
+class DashboardKPITests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.url = reverse('analytics-summary')
+        self.hammer = Product.objects.create(
+            name='Hammer', category='Tools', quantity_in_stock=20, price=Decimal('10.00'), threshold_level=5
+        )
+        self.rake = Product.objects.create(
+            name='Rake', category='Garden', quantity_in_stock=3, price=Decimal('2.50'), threshold_level=5
+        )
+        self.spade = Product.objects.create(
+            name='Spade', category='Garden', quantity_in_stock=0, price=Decimal('4.00'), threshold_level=0
+        )
+        completed = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+        OrderItem.objects.create(order=completed, product=self.hammer, quantity=2)
+        Order.objects.filter(pk=completed.pk).update(status='completed')
+        pending = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+        OrderItem.objects.create(order=pending, product=self.rake, quantity=1)
+
+    def test_summary_values(self):
+        """Test the snapshot covers sales, orders, stock and alerts."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        kpis = response.data
+        self.assertEqual(kpis['total_sales'], 3)
+        self.assertEqual((kpis['total_orders'], kpis['completed_orders'], kpis['pending_orders']), (2, 1, 1))
+        self.assertEqual((kpis['total_revenue'], kpis['avg_order_value']), (20.0, 20.0))
+        self.assertEqual((kpis['total_products'], kpis['total_stock'], kpis['categories']), (3, 23, 2))
+        # The spade sits exactly at its threshold, which counts as low
+        self.assertEqual((kpis['low_stock'], kpis['out_of_stock']), (2, 1))
+        self.assertEqual(kpis['total_value'], 207.5)
+        self.assertEqual(kpis['open_alerts'], StockAlert.objects.filter(resolved=False).count())
+        self.assertEqual(kpis['top_categories'][0], {'category': 'Tools', 'value': 200.0})
+
+    def test_chatbot_agrees_on_low_stock(self):
+        """Test the chatbot's stats and critical stock list count products at their threshold alike."""
+        Product.objects.create(name='Hoe', category='Garden', quantity_in_stock=5, price=Decimal('3.00'), threshold_level=5)
+        chatbot = ChatbotAPIView()
+        critical = chatbot.get_product_insights()['critical_stock']
+        self.assertEqual(sorted(row['name'] for row in critical), ['Hoe', 'Rake', 'Spade'])
+        self.assertEqual(chatbot.get_inventory_stats()['low_stock'], len(critical))
+
+    def test_cached_until_write(self):
+        """Test repeated loads only read the version counters and a write recomputes the snapshot."""
+        first = self.client.get(self.url).data
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).data, first)
+
+        self.hammer.quantity_in_stock = 0
+        self.hammer.save()
+        kpis = self.client.get(self.url).data
+        self.assertEqual(kpis['out_of_stock'], 2)
+        self.assertNotEqual(kpis['computed_at'], first['computed_at'])
+
+    def test_new_database_misses_old_snapshots(self):
+        """Test a database with a new epoch does not reuse snapshots cached under the same versions."""
+        first = self.client.get(self.url).data
+        DataVersion.objects.filter(name=EPOCH).delete()
+        self.assertNotEqual(self.client.get(self.url).data['computed_at'], first['computed_at'])
@@ -0,0 +1,102 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory import exports
+from inventory.models import Product, InventoryTransaction, Order, OrderItem
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Export Product',
+            quantity_in_stock=100,
+            price=Decimal('2.50'),
+            threshold_level=5
+        )
+        self.orders = []
+        for day in (1, 15, 31):
+            order = Order.objects.create(
+                customer_name=f'Customer {day}', telephone_number='+12025550109', status='completed',
+                order_date=datetime(2025, 1, day, 12, tzinfo=dt_timezone.utc),
+            )
+            OrderItem.objects.create(order=order, product=self.product, quantity=2)
+            self.orders.append(order)
+        self.sale = InventoryTransaction.objects.create(product=self.product, quantity=3, transaction_type='sale')
+
+    def get(self, name, **params):
+        response = self.client.get(reverse('export', args=name.split('.')), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_orders_csv(self):
+        """Test the orders export is a CSV with one row per order in date order."""
+        response, body = self.get('orders.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="orders.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual([int(row['id']) for row in rows], [order.pk for order in self.orders])
+        self.assertEqual(rows[0]['order_date'], '2025-01-01T12:00:00Z')
+        self.assertEqual(rows[0]['total_amount'], '5.00')
+        self.assertEqual(rows[0]['telephone_number'], '+12025550109')
+
+    def test_date_range_is_inclusive(self):
+        """Test date_after and date_before keep whole days at both ends."""
+        _, body = self.get('order-items.ndjson', date_after='2025-01-15', date_before='2025-01-31')
+        items = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([item['order_id'] for item in items], [order.pk for order in self.orders[1:]])
+        self.assertEqual(items[0]['product_name'], 'Export Product')
+        self.assertEqual(items[0]['price'], '5.00')
+        self.assertEqual(items[0]['order_date'], '2025-01-15T12:00:00Z')
+
+    def test_inventory_ndjson_gzip(self):
+        """Test ?gzip=true returns the export as a .gz file."""
+        response, body = self.get('inventory.ndjson', gzip='true')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('filename="inventory.ndjson.gz"', response['Content-Disposition'])
+        lines = gzip.decompress(body).splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.sale.refresh_from_db()
+        self.assertEqual(row['id'], self.sale.pk)
+        self.assertEqual(row['transaction_type'], 'sale')
+        self.assertEqual(row['transaction_cost'], str(self.sale.transaction_cost))
+
+    def test_rows_stream_in_chunks(self):
+        """Test rows are read and written a chunk at a time, headers only once."""
+        Order.objects.bulk_create([
+            Order(customer_name=f'Bulk {i}', telephone_number='+12025550109') for i in range(5)
+        ])
+        with mock.patch.object(exports, 'EXPORT_CHUNK_SIZE', 2):
+            response, _ = self.get('orders.csv')
+            chunks = list(exports.export_stream('orders', 'csv'))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks).count(b'customer_name'), 1)
+        self.assertEqual(len(b''.join(chunks).splitlines()), 9)
+
+    def test_empty_export_has_header(self):
+        """Test an export with no rows still carries the CSV header."""
+        _, body = self.get('orders.csv', date_after='2030-01-01')
+        self.assertEqual(body.decode().strip(), 'id,order_date,status,customer_name,telephone_number,total_amount')
+
+    def test_invalid_requests(self):
+        """Test unknown exports and malformed dates are rejected."""
+        response = self.client.get(reverse('export', args=['customers', 'csv']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('export', args=['orders', 'xml']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('export', args=['orders', 'csv']), {'date_after': '01/02/2025'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
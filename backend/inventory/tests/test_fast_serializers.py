@@ -0,0 +1,74 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, InventoryTransaction, StockAlert
+from inventory.stripes import stripe_product
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Café « Crème »', category=None, description='Line\u2028break "quoted"',
+            quantity_in_stock=80, price=Decimal('12.5'), threshold_level=50
+        )
+        self.hot = Product.objects.create(
+            name='Hot Product', category='Drinks', quantity_in_stock=40, price=Decimal('3.00'), threshold_level=0
+        )
+        stripe_product(self.hot, 3)
+        for quantity, kind in ((5, 'restock'), (3, 'sale'), (40, 'sale')):
+            InventoryTransaction.objects.create(product=self.product, quantity=quantity, transaction_type=kind)
+        InventoryTransaction.objects.create(product=self.hot, quantity=7, transaction_type='sale')
+        StockAlert.objects.create(product=self.hot, stock_level=1)
+
+    def compare(self, url):
+        """Fetches ``url`` through both paths and checks the bodies and headers are identical."""
+        with override_settings(FAST_LIST_SERIALIZERS=False):
+            slow = self.client.get(url)
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            fast = self.client.get(url)
+        self.assertEqual(slow.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+        self.assertEqual(fast.get('Link'), slow.get('Link'))
+        return fast
+
+    def test_product_list_is_byte_identical(self):
+        """Test the fast product list matches ProductSerializer, including striped stock."""
+        response = self.compare(reverse('product-list'))
+        self.assertIn(b'\\u2028', response.content)
+        self.assertIn(b'"quantity_in_stock":33', response.content)
+
+    def test_inventory_list_is_byte_identical(self):
+        """Test the fast inventory list matches InventorySerializer with the nested product."""
+        self.compare(reverse('inventory-list'))
+
+    def test_stock_alert_list_is_byte_identical(self):
+        """Test the fast stock alert list matches StockAlertSerializer."""
+        self.compare(reverse('stock-alert-list'))
+
+    def test_pages_and_sparse_fields_match(self):
+        """Test pagination links and ?fields= behave the same on the fast path."""
+        first = self.compare(reverse('inventory-list') + '?page_size=2')
+        self.assertIn('rel="next"', first['Link'])
+        self.compare(reverse('product-list') + '?fields=name,price,quantity_in_stock')
+        self.compare(reverse('inventory-list') + '?fields=product,transaction_month&page_size=1')
+        self.compare(reverse('product-list') + '?ordering=-price&fields=name&page_size=1')
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_datetimes_follow_current_timezone(self):
+        """Test datetimes get the same offset as DRF's DateTimeField outside UTC."""
+        response = self.compare(reverse('stock-alert-list'))
+        self.assertIn(b'+05:30', response.content)
+
+    def test_browsable_api_uses_regular_path(self):
+        """Test non-JSON renderers still go through the serializer."""
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            response = self.client.get(reverse('product-list') + '?format=api')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('text/html', response['Content-Type'])
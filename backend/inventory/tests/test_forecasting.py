@@ -0,0 +1,94 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.forecasting import demand_matrix, fit_forecasts
+from inventory.models import Product, Order, OrderItem
+
+
+class FitForecastTests(TestCase):
+    def test_methods_follow_demand_pattern(self):
+        """Test steady, weekly and intermittent demand get SES, Holt-Winters and Croston."""
+        rng = np.random.default_rng(0)
+        days = np.arange(730)
+        matrix = np.stack([
+            rng.poisson(10, 730),
+            rng.poisson(10 + 8 * (days % 7 >= 5)),
+            rng.poisson(5, 730) * (rng.random(730) < 0.1),
+        ], axis=1)
+        forecasts = fit_forecasts(matrix, horizon=28, level=0.8)
+        self.assertEqual(forecasts['method'].tolist(), ['ses', 'holt_winters', 'croston'])
+        # Expected demand over 28 days: 280, 28 * (10 + 8 * 2 / 7) = 344 and about 14
+        np.testing.assert_allclose(forecasts['total'], [280, 344, 14], rtol=0.15)
+        self.assertTrue((forecasts['lower'] <= forecasts['total']).all())
+        self.assertTrue((forecasts['total'] <= forecasts['upper']).all())
+        self.assertTrue((forecasts['lower'] >= 0).all())
+
+    def test_new_product_is_not_intermittent(self):
+        """Test a product that only started selling recently is judged on the days since its launch."""
+        matrix = np.zeros((365, 1))
+        matrix[-20:] = 10
+        forecasts = fit_forecasts(matrix, horizon=30, level=0.8)
+        self.assertEqual(forecasts['method'].tolist(), ['ses'])
+        np.testing.assert_allclose(forecasts['total'], [300], rtol=0.02)
+        self.assertGreater(forecasts['lower'][0], 200)
+
+    def test_intervals_widen_with_level(self):
+        """Test a higher coverage level gives a wider interval around the same forecast."""
+        matrix = np.random.default_rng(1).poisson(4, (120, 5))
+        narrow, wide = fit_forecasts(matrix, level=0.5), fit_forecasts(matrix, level=0.95)
+        np.testing.assert_allclose(narrow['total'], wide['total'])
+        self.assertTrue((wide['upper'] - wide['total'] > narrow['upper'] - narrow['total']).all())
+
+
+class ForecastAPITests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.url = reverse('forecast-demand')
+        self.product = Product.objects.create(
+            name='Test Product', quantity_in_stock=10000, price=Decimal('1.00'), threshold_level=0
+        )
+        self.idle = Product.objects.create(
+            name='Idle Product', quantity_in_stock=10, price=Decimal('1.00'), threshold_level=0
+        )
+        today = timezone.now()
+        for days_ago in range(1, 61):
+            order = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109',
+                                         order_date=today - timedelta(days=days_ago))
+            OrderItem.objects.create(order=order, product=self.product, quantity=3)
+
+    def test_demand_matrix(self):
+        """Test the matrix has a row per day and a column per product that sold."""
+        end = timezone.localdate() - timedelta(days=1)
+        product_ids, matrix = demand_matrix(end - timedelta(days=89), end)
+        self.assertEqual(product_ids.tolist(), [self.product.pk])
+        self.assertEqual(matrix.shape, (90, 1))
+        self.assertEqual(matrix[-60:].sum(), 180)
+        self.assertEqual(matrix[:30].sum(), 0)
+
+    def test_forecast_endpoint(self):
+        """Test the forecast reads the rollup in one query and returns intervals."""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'horizon': 10, 'history': 60, 'level': 0.9})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [forecast] = response.data['forecast']
+        self.assertEqual(forecast['product_name'], 'Test Product')
+        self.assertEqual(forecast['confidence_score'], 0.9)
+        self.assertAlmostEqual(forecast['predicted_sales'], 30, delta=1)
+        self.assertLessEqual(forecast['lower'], forecast['predicted_sales'])
+        self.assertGreaterEqual(forecast['upper'], forecast['predicted_sales'])
+
+    def test_invalid_parameters(self):
+        """Test out-of-range horizons, histories and levels are rejected."""
+        for params in ({'horizon': 0}, {'history': 7}, {'level': 1.5}, {'horizon': 'soon'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
@@ -0,0 +1,74 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory import group_commit
+from inventory.models import Product, InventoryTransaction, InventoryEventReceipt
+
+
+@override_settings(INVENTORY_GROUP_COMMIT=True)
+class GroupCommitTests(TransactionTestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=5,
+            price=Decimal('10.00'),
+            threshold_level=0
+        )
+        self.url = reverse('inventory-events')
+
+    def tearDown(self):
+        if group_commit._writer is not None:
+            group_commit._writer.stop()
+            group_commit._writer = None
+
+    def poll(self, writer, sequence):
+        return self.client.get(reverse('inventory-event-status', args=[writer, sequence]))
+
+    def test_events_are_acked_then_applied_in_one_batch(self):
+        """Test queued events get sequence numbers and pollable outcomes."""
+        response = self.client.post(self.url, [
+            {'product_id': self.product.id, 'quantity': 10, 'transaction_type': 'restock'},
+            {'product_id': self.product.id, 'quantity': 12, 'transaction_type': 'sale'},
+            {'product_id': 9999, 'quantity': 1, 'transaction_type': 'sale'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        writer, sequences = response.data['writer'], response.data['sequences']
+        self.assertEqual(sequences, [1, 2, 3])
+
+        self.assertTrue(group_commit.get_writer().wait(sequences[-1], timeout=10))
+        self.assertEqual(self.poll(writer, 1).data['status'], 'applied')
+        self.assertEqual(self.poll(writer, 2).data['status'], 'applied')
+        failed = self.poll(writer, 3).data
+        self.assertEqual(failed['status'], 'failed')
+        self.assertIn('does not exist', failed['error'])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 3)
+        self.assertEqual(InventoryTransaction.objects.count(), 2)
+
+    def test_invalid_event_queues_nothing(self):
+        """Test a batch with an invalid event is rejected before queueing."""
+        response = self.client.post(self.url, [
+            {'product_id': self.product.id, 'quantity': 1, 'transaction_type': 'restock'},
+            {'product_id': self.product.id, 'quantity': 0, 'transaction_type': 'restock'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(group_commit.get_writer().last_issued, 0)
+
+    def test_unknown_event_is_not_found(self):
+        """Test polling a sequence that was never issued returns 404."""
+        response = self.poll(group_commit.get_writer().writer_id, 1)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GroupCommitDisabledTests(TestCase):
+    def test_events_endpoint_is_opt_in(self):
+        """Test the events endpoint is unavailable unless group commit is enabled."""
+        response = APIClient().post(reverse('inventory-events'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(InventoryEventReceipt.objects.exists())
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, Order, InventoryTransaction, IdempotencyKey
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=100,
+            price=Decimal('10.00'),
+            threshold_level=5
+        )
+        self.order_data = {
+            'customer_name': 'Retry Customer',
+            'telephone_number': '+12025550110',
+            'items': [{'product': self.product.id, 'quantity': 3}]
+        }
+
+    def test_retried_order_is_created_once(self):
+        """Test a retry with the same key replays the first response byte for byte."""
+        url = reverse('order-list')
+        first = self.client.post(url, self.order_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+        second = self.client.post(url, self.order_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.available_quantity, 97)
+
+    def test_retried_inventory_transaction_is_created_once(self):
+        """Test inventory POSTs are deduplicated too."""
+        url = reverse('inventory-list')
+        data = {'product_id': self.product.id, 'quantity': 5, 'transaction_type': 'sale'}
+        for _ in range(3):
+            self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY='sale-1')
+        self.assertEqual(InventoryTransaction.objects.count(), 1)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        """Test a key cannot be replayed for a different payload."""
+        url = reverse('order-list')
+        self.client.post(url, self.order_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+        self.order_data['customer_name'] = 'Someone Else'
+        response = self.client.post(url, self.order_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        """Test POSTs without the header behave as before."""
+        url = reverse('order-list')
+        self.client.post(url, self.order_data, format='json')
+        self.client.post(url, self.order_data, format='json')
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_purge_removes_expired_keys(self):
+        """Test the purge command deletes keys older than the TTL."""
+        IdempotencyKey.objects.create(key='old', scope='anon:/api/order/', fingerprint='x', status_code=201)
+        IdempotencyKey.objects.create(key='new', scope='anon:/api/order/', fingerprint='x', status_code=201)
+        IdempotencyKey.objects.filter(key='old').update(created_at=now() - timedelta(days=2))
+        call_command('purge_idempotency_keys', '--hours', '24', stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
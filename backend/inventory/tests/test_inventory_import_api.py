@@ -0,0 +1,89 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.ingest import import_transactions
+from inventory.models import Product, InventoryTransaction
+
+
+class InventoryImportAPITests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Import Product',
+            quantity_in_stock=10,
+            price=Decimal('0.10'),
+            threshold_level=2,
+            extra_charge_percent=Decimal('5.00')
+        )
+        self.url = reverse('inventory-import')
+
+    def test_import_csv_file(self):
+        """Test a CSV upload imports valid lines and reports invalid ones."""
+        content = (
+            "product_id,quantity,transaction_type,extra_charge_percent\n"
+            f"{self.product.id},5,restock,\n"
+            f"{self.product.id},12,sale,10\n"
+            "999,1,sale,\n"
+            f"{self.product.id},0,sale,\n"
+        ).encode()
+        upload = SimpleUploadedFile('feed.csv', content, content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([e['line'] for e in response.data['errors']], [4, 5])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 3)
+
+    def test_import_ndjson_body(self):
+        """Test a raw NDJSON body is streamed in."""
+        body = (
+            f'{{"product_id": {self.product.id}, "quantity": 3, "transaction_type": "sale"}}\n'
+            'not json\n'
+        )
+        response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+
+    def test_input_override(self):
+        """Test ?input= reads a body whose file name or content type does not give its format."""
+        upload = SimpleUploadedFile(
+            'feed.txt', f'product_id,quantity,transaction_type\n{self.product.id},4,restock\n'.encode()
+        )
+        response = self.client.post(self.url + '?input=csv', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        body = f'{{"product_id": {self.product.id}, "quantity": 2, "transaction_type": "sale"}}\n'
+        response = self.client.generic('POST', self.url + '?input=ndjson', body, content_type='text/plain')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+
+    def test_costs_match_model_calculation(self):
+        """Test vectorized costs round exactly like InventoryTransaction.save."""
+        records = [(1, {'product_id': self.product.id, 'quantity': q, 'transaction_type': 'restock'}) for q in (1, 3, 7)]
+        import_transactions(records)
+        imported = list(InventoryTransaction.objects.order_by('id').values_list('transaction_cost', flat=True))
+        expected = []
+        for quantity in (1, 3, 7):
+            txn = InventoryTransaction.objects.create(product=self.product, quantity=quantity, transaction_type='restock')
+            txn.refresh_from_db()
+            expected.append(txn.transaction_cost)
+        self.assertEqual(imported, expected)
+
+    def test_sale_after_restock_across_chunks(self):
+        """Test file order is respected within and across chunks."""
+        records = [
+            (1, {'product_id': self.product.id, 'quantity': 20, 'transaction_type': 'restock'}),
+            (2, {'product_id': self.product.id, 'quantity': 25, 'transaction_type': 'sale'}),
+            (3, {'product_id': self.product.id, 'quantity': 10, 'transaction_type': 'sale'}),
+        ]
+        report = import_transactions(records, chunk_size=2)
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.errors, [{'line': 3, 'error': f'Not enough stock for product {self.product.id}'}])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 5)
@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, InventoryTransaction, Order
+from inventory.stripes import stripe_product
+
+
+class ListFilterTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.widget = Product.objects.create(
+            name='Widget', category='Tools', quantity_in_stock=3, price=Decimal('5.00'), threshold_level=5
+        )
+        self.gadget = Product.objects.create(
+            name='Gadget', category='Tools', quantity_in_stock=50, price=Decimal('25.00'), threshold_level=5
+        )
+        self.wire = Product.objects.create(
+            name='wire spool', category='Parts', quantity_in_stock=0, price=Decimal('2.50'), threshold_level=1
+        )
+        InventoryTransaction.objects.create(product=self.gadget, quantity=4, transaction_type='restock')
+        InventoryTransaction.objects.create(product=self.gadget, quantity=1, transaction_type='sale')
+        InventoryTransaction.objects.create(product=self.widget, quantity=1, transaction_type='restock')
+        Order.objects.create(customer_name='Joan Smith', telephone_number='+12025550109', status='pending')
+        Order.objects.create(customer_name='Mark Jones', telephone_number='+12025550109', status='completed')
+
+    def names(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item.get('name') or item.get('customer_name') for item in response.data]
+
+    def test_product_filters(self):
+        """Test category, price range, low stock, out of stock and name prefix filters."""
+        url = reverse('product-list')
+        self.assertEqual(self.names(url + '?category=Tools'), ['Widget', 'Gadget'])
+        self.assertEqual(self.names(url + '?price_min=3&price_max=10'), ['Widget'])
+        self.assertEqual(self.names(url + '?low_stock=true'), ['Widget', 'wire spool'])
+        self.assertEqual(self.names(url + '?out_of_stock=true'), ['wire spool'])
+        self.assertEqual(self.names(url + '?out_of_stock=false'), ['Widget', 'Gadget'])
+        self.assertEqual(self.names(url + '?name=WI'), ['Widget', 'wire spool'])
+        self.assertEqual(self.names(url + '?name=wid&category=Tools'), ['Widget'])
+        self.assertEqual(self.names(url + '?ordering=-price'), ['Gadget', 'Widget', 'wire spool'])
+
+    def test_low_stock_sees_striped_sales(self):
+        """Test stock filters count sales that only reached a product's stripes."""
+        stripe_product(self.gadget, 2)
+        InventoryTransaction.objects.create(product=self.gadget, quantity=53, transaction_type='sale')
+        self.assertEqual(self.names(reverse('product-list') + '?out_of_stock=true'), ['Gadget', 'wire spool'])
+        # Reading the list does not fold the stripes into the product row
+        self.assertEqual(Product.objects.get(pk=self.gadget.pk).quantity_in_stock, 53)
+
+    def test_order_and_inventory_filters(self):
+        """Test order status/customer/date and inventory type/product filters."""
+        url = reverse('order-list')
+        self.assertEqual(self.names(url + '?status=pending'), ['Joan Smith'])
+        self.assertEqual(self.names(url + '?customer=mark'), ['Mark Jones'])
+        self.assertEqual(self.names(url + '?date_after=2000-01-01&date_before=2000-12-31'), [])
+        response = self.client.get(url + '?status=unknown')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse('inventory-list')
+        response = self.client.get(url + f'?type=restock&product={self.gadget.pk}')
+        self.assertEqual([item['quantity'] for item in response.data], [4])
+        response = self.client.get(url + '?ordering=transaction_date')
+        self.assertEqual([item['quantity'] for item in response.data], [4, 1, 1])
+
+    def query_plan(self, url, main):
+        """Runs ``url`` and returns the EXPLAIN QUERY PLAN steps of its list query on table ``main``."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        # The page query
+        sql = next(
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and f'FROM "{main}"' in q['sql'] and ' LIMIT ' in q['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            # Including subqueries, where the table appears under an alias
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_filtered_queries_use_indexes(self):
+        """Test every filtered page seeks on the index added for it instead of scanning the table."""
+        product, order, inventory = (
+            (reverse(name), table) for name, table in (
+                ('product-list', 'inventory_product'),
+                ('order-list', 'inventory_order'),
+                ('inventory-list', 'inventory_inventorytransaction'),
+            )
+        )
+        expected = [
+            (product, '?category=Tools', 'product_category_idx'),
+            (product, '?price_min=3&price_max=10', 'product_price_idx'),
+            (product, '?low_stock=true', 'product_low_stock_idx'),
+            (product, '?out_of_stock=true', 'product_stock_idx'),
+            (product, '?name=wid', 'product_name_lower_idx'),
+            (order, '?status=completed&date_after=2025-01-01', 'order_status_date_idx'),
+            (order, '?customer=jo', 'order_customer_lower_idx'),
+            (inventory, '?type=sale', 'inventory_type_date_idx'),
+            (inventory, f'?product={self.gadget.pk}&date_after=2025-01-01', 'inventory_product_date_idx'),
+        ]
+        for (url, table), query, index in expected:
+            with self.subTest(query=query):
+                plan = self.query_plan(url + query + '&page_size=100', table)
+                self.assertTrue(any(f'USING INDEX {index}' in step for step in plan), plan)
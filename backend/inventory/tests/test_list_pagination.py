@@ -0,0 +1,73 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, InventoryTransaction
+
+
+def next_link(response):
+    match = re.search(r'<([^>]+)>; rel="next"', response.get('Link', ''))
+    return match.group(1) if match else None
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        Product.objects.bulk_create([
+            Product(name=f'Product {i:02d}', quantity_in_stock=50, price=Decimal('1.00'))
+            for i in range(7)
+        ])
+        self.product = Product.objects.order_by('id').first()
+
+    def test_pages_follow_link_header(self):
+        """Test walking the Link header visits every product exactly once."""
+        url, names = reverse('product-list') + '?page_size=3', []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 3)
+            names.extend(item['name'] for item in response.data)
+            url = next_link(response)
+        self.assertEqual(names, [f'Product {i:02d}' for i in range(7)])
+
+    def test_unpaged_request_gets_whole_list(self):
+        """Test clients that do not ask for a page still receive every row, without a Link header."""
+        Product.objects.bulk_create([
+            Product(name=f'Extra {i:03d}', quantity_in_stock=50, price=Decimal('1.00'))
+            for i in range(settings.REST_FRAMEWORK['PAGE_SIZE'])
+        ])
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(len(response.data), 7 + settings.REST_FRAMEWORK['PAGE_SIZE'])
+        self.assertNotIn('Link', response)
+
+    def test_deep_page_uses_keyset_not_offset(self):
+        """Test a later page seeks on the ordering column instead of skipping rows."""
+        first = self.client.get(reverse('product-list') + '?page_size=2')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(next_link(first))
+        select = next(q['sql'] for q in queries if 'inventory_product' in q['sql'])
+        self.assertIn('"inventory_product"."id" >', select)
+        self.assertNotIn('OFFSET', select.upper())
+
+    def test_inventory_list_is_paginated_newest_first(self):
+        """Test the inventory list returns one page ordered by transaction date."""
+        for quantity in range(1, 5):
+            InventoryTransaction.objects.create(product=self.product, quantity=quantity, transaction_type='restock')
+        response = self.client.get(reverse('inventory-list') + '?page_size=3')
+        self.assertEqual([item['quantity'] for item in response.data], [4, 3, 2])
+        self.assertIsNotNone(next_link(response))
+
+    def test_sparse_fieldset(self):
+        """Test ?fields= returns only the requested fields."""
+        response = self.client.get(reverse('product-list') + '?fields=id,name')
+        self.assertEqual(set(response.data[0]), {'id', 'name'})
+        response = self.client.get(reverse('single-product', args=[self.product.pk]) + '?fields=name,unknown')
+        self.assertEqual(set(response.data), {'name'})
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.models import Product, InventoryTransaction
+from inventory.movements import monthly_movements
+from inventory.serializers import MonthlySalesStockSummarySerializer
+
+
+class MonthlyStockSummaryTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.url = reverse('monthly-stock-summary')
+        self.hammer = Product.objects.create(
+            name='Hammer', category='Tools', quantity_in_stock=100, price=Decimal('10.00'), threshold_level=0
+        )
+        self.rake = Product.objects.create(
+            name='Rake', category='Garden', quantity_in_stock=100, price=Decimal('2.50'), threshold_level=0
+        )
+        for product, kind, quantity, month in (
+            (self.hammer, 'sale', 3, 1), (self.hammer, 'sale', 2, 1), (self.hammer, 'restock', 10, 1),
+            (self.hammer, 'restock', 5, 2),
+            (self.rake, 'sale', 4, 2),
+        ):
+            transaction = InventoryTransaction.objects.create(product=product, transaction_type=kind, quantity=quantity)
+            InventoryTransaction.objects.filter(pk=transaction.pk).update(
+                transaction_date=datetime(2025, month, 15, tzinfo=dt_timezone.utc)
+            )
+
+    def test_summary_rows(self):
+        """Test sales and restocks are summed per product and month, including restock-only months."""
+        rows = MonthlySalesStockSummarySerializer.get_monthly_sales_and_stock()
+        self.assertEqual(
+            [(row['product_name'], row['month'], row['sales_units'], row['sales'], row['restock_units'],
+              row['restocks'], row['stock_level']) for row in rows],
+            [('Hammer', '2025-01', 5, 50.0, 10, 100.0, 110),
+             ('Hammer', '2025-02', 0, 0.0, 5, 50.0, 110),
+             ('Rake', '2025-02', 4, 10.0, 0, 0.0, 96)],
+        )
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_months_follow_current_time_zone(self):
+        """Test a sale just after midnight UTC on January 1st counts for December in New York."""
+        transaction = InventoryTransaction.objects.create(product=self.rake, transaction_type='sale', quantity=7)
+        InventoryTransaction.objects.filter(pk=transaction.pk).update(
+            transaction_date=datetime(2025, 1, 1, 2, tzinfo=dt_timezone.utc)
+        )
+        movements = monthly_movements([self.rake.pk])
+        self.assertEqual(sorted(zip(movements['month'], movements['sales_units'])), [('2024-12', 7), ('2025-02', 4)])
+
+    def test_endpoint_filters_and_pages(self):
+        """Test the endpoint pages by product in three queries per page and applies date and product filters."""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({row['product_name'] for row in response.data}, {'Hammer'})
+        self.assertEqual(response.data[0]['sales'], '50.00')
+        self.assertIn('rel="next"', response['Link'])
+
+        response = self.client.get(self.url, {'date_after': '2025-02-01', 'category': 'Tools'})
+        self.assertEqual([(row['month'], row['restock_units']) for row in response.data], [('2025-02', 5)])
+
+    def test_invalid_date(self):
+        """Test a malformed date is rejected."""
+        response = self.client.get(self.url, {'date_before': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
@@ -72,11 +72,11 @@ class OrderAPITests(TestCase):
         self.assertEqual(Order.objects.count(), 2)
         self.assertEqual(OrderItem.objects.count(), 3)
         
-        # Verify products' stock is updated
+        # Verify products' stock is reserved for the pending order
         self.product1.refresh_from_db()
         self.product2.refresh_from_db()
-        self.assertEqual(self.product1.quantity_in_stock, 97)  # 100 - 3
-        self.assertEqual(self.product2.quantity_in_stock, 48)  # 50 - 2
+        self.assertEqual(self.product1.available_quantity, 97)  # 100 - 3
+        self.assertEqual(self.product2.available_quantity, 48)  # 50 - 2
 
     def test_create_invalid_order(self):
         """Test creating an order with insufficient stock."""
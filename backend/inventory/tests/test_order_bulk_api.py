@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, Order, OrderItem, StockAlert
+
+
+class OrderBulkAPITests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product1 = Product.objects.create(
+            name='Test Product 1',
+            quantity_in_stock=500,
+            price=Decimal('10.00'),
+            threshold_level=10
+        )
+        self.product2 = Product.objects.create(
+            name='Test Product 2',
+            quantity_in_stock=20,
+            price=Decimal('2.50'),
+            threshold_level=10
+        )
+        self.url = reverse('order-bulk')
+
+    def make_orders(self, count, lines=2):
+        return [
+            {
+                'customer_name': f'Customer {i}',
+                'telephone_number': '+12025550109',
+                'status': 'completed',
+                'items': [
+                    {'product': self.product1.id, 'quantity': 1},
+                    {'product': self.product2.id, 'quantity': 1},
+                ][:lines]
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create_orders(self):
+        """Test a batch creates orders, items, totals and stock deltas."""
+        response = self.client.post(self.url, {'orders': self.make_orders(3)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(OrderItem.objects.count(), 6)
+        self.assertEqual(Order.objects.first().total_amount, Decimal('12.50'))
+        self.product1.refresh_from_db()
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product1.quantity_in_stock, 497)
+        self.assertEqual(self.product2.quantity_in_stock, 17)
+
+    def test_bulk_create_insufficient_stock_creates_nothing(self):
+        """Test a batch that oversells one product is rejected as a whole."""
+        response = self.client.post(self.url, self.make_orders(21), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+        self.assertEqual(Order.objects.count(), 0)
+        self.product1.refresh_from_db()
+        self.assertEqual(self.product1.quantity_in_stock, 500)
+
+    def test_bulk_create_raises_stock_alert(self):
+        """Test products that drop below threshold get an alert."""
+        self.client.post(self.url, self.make_orders(15), format='json')
+        self.assertTrue(StockAlert.objects.filter(product=self.product2, resolved=False).exists())
+
+    def test_bulk_create_query_count_independent_of_size(self):
+        """Test the number of queries does not grow with the number of lines."""
+        Product.objects.update(threshold_level=0)  # keep alert writes out of the comparison
+        self.client.post(self.url, self.make_orders(1), format='json')  # create today's sales rollup rows
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, self.make_orders(2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(self.url, self.make_orders(10), format='json')
+        self.assertEqual(len(small), len(large))
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import DailySales, Product, Order, OrderItem
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=1000,
+            price=Decimal('10.00'),
+            threshold_level=0
+        )
+        self.order = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+
+    def stored_total(self):
+        return Order.objects.get(pk=self.order.pk).total_amount
+
+    def test_adding_items_moves_total(self):
+        """Test each new item adds its line price to the stored total."""
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=3)
+        self.assertEqual(self.stored_total(), Decimal('50.00'))
+        self.assertEqual(self.order.total_amount, Decimal('50.00'))
+
+    def test_changing_and_deleting_items_moves_total(self):
+        """Test price changes and deletions apply their difference to the total."""
+        item = OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        item.price = Decimal('25.00')
+        item.save()
+        self.assertEqual(self.stored_total(), Decimal('35.00'))
+        item.delete()
+        self.assertEqual(self.stored_total(), Decimal('10.00'))
+
+    def test_quantity_edit_reprices_line(self):
+        """Test changing a line's quantity prices it again and moves the total and the sales rollup."""
+        item = OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+        response = self.client.patch(reverse('single-order-item', args=[item.pk]), {'quantity': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['price'], '50.00')
+        self.assertEqual(self.stored_total(), Decimal('50.00'))
+        sales = DailySales.objects.get(product=self.product)
+        self.assertEqual((sales.units, sales.revenue), (5, Decimal('50.00')))
+
+    def test_item_write_cost_independent_of_order_size(self):
+        """Test adding a line costs the same number of queries on a large order."""
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        with CaptureQueriesContext(connection) as small:
+            OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        for _ in range(50):
+            OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        with CaptureQueriesContext(connection) as large:
+            OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        self.assertEqual(len(small), len(large))
+
+    def test_order_api_returns_stored_total(self):
+        """Test the order endpoint serves the stored total for a new order."""
+        response = self.client.post(reverse('order-list'), {
+            'customer_name': 'API Customer',
+            'telephone_number': '+12025550109',
+            'items': [{'product': self.product.id, 'quantity': 4}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total_amount'], Decimal('40.00'))
+        response = self.client.get(reverse('single-order', args=[response.data['id']]))
+        self.assertEqual(response.data['total_amount'], Decimal('40.00'))
+
+    def test_reconcile_repairs_drifted_totals(self):
+        """Test the reconcile command reports and repairs drifted totals."""
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+        empty = Order.objects.create(customer_name='Empty', telephone_number='+12025550109')
+        Order.objects.filter(pk__in=[self.order.pk, empty.pk]).update(total_amount=Decimal('99.99'))
+
+        out = StringIO()
+        call_command('reconcile_order_totals', '--dry-run', stdout=out)
+        self.assertIn('2 orders', out.getvalue())
+        self.assertEqual(self.stored_total(), Decimal('99.99'))
+
+        call_command('reconcile_order_totals', stdout=StringIO())
+        self.assertEqual(self.stored_total(), Decimal('20.00'))
+        self.assertEqual(Order.objects.get(pk=empty.pk).total_amount, Decimal('0.00'))
+
+        out = StringIO()
+        call_command('reconcile_order_totals', '--dry-run', stdout=out)
+        self.assertIn('0 orders', out.getvalue())
@@ -0,0 +1,99 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.chatbot import ChatbotAPIView
+from inventory.models import Product, InventoryTransaction
+from inventory.search import SEARCH_TABLE, _fallback_ids, fts_available, search_product_ids
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.widget = Product.objects.create(
+            name='Blue Widget', category='Tools', description='A small widget',
+            quantity_in_stock=10, price=Decimal('5.00')
+        )
+        self.gadget = Product.objects.create(
+            name='Gadget', category='Widgets', description=None,
+            quantity_in_stock=10, price=Decimal('7.00')
+        )
+        self.lamp = Product.objects.create(
+            name='Desk Lamp', category='Lighting', description='Pairs well with any widget',
+            quantity_in_stock=10, price=Decimal('20.00')
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('product-search'), {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_uses_fts_index(self):
+        """Test the SQLite test database has the trigram index."""
+        self.assertTrue(fts_available())
+
+    def test_ranks_name_above_category_and_description(self):
+        """Test substring matches are ranked name, then category, then description."""
+        names = [item['name'] for item in self.search('widget').data]
+        self.assertEqual(names, ['Blue Widget', 'Gadget', 'Desk Lamp'])
+
+    def test_typo_and_short_queries(self):
+        """Test a misspelt query still finds the product and short queries match name prefixes."""
+        self.assertEqual(self.search('gadgte').data[0]['name'], 'Gadget')
+        self.assertEqual([item['name'] for item in self.search('de').data], ['Desk Lamp'])
+
+    def test_index_follows_writes(self):
+        """Test renames and deletes are reflected and stock writes leave the index consistent."""
+        self.gadget.name = 'Sprocket'
+        self.gadget.save()
+        InventoryTransaction.objects.create(product=self.gadget, quantity=3, transaction_type='sale')
+        self.lamp.delete()
+        self.assertEqual(search_product_ids('sprocket'), [self.gadget.pk])
+        self.assertEqual(search_product_ids('lamp'), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    def test_pages_use_link_header(self):
+        """Test results are paginated with next and prev links."""
+        first = self.search('widget', page_size=2)
+        self.assertEqual(len(first.data), 2)
+        next_url = re.search(r'<([^>]+)>; rel="next"', first['Link']).group(1)
+        second = self.client.get(next_url)
+        self.assertEqual([item['name'] for item in second.data], ['Desk Lamp'])
+        self.assertIn('rel="prev"', second['Link'])
+        self.assertNotIn('rel="next"', second['Link'])
+
+    def test_requires_query(self):
+        """Test a missing query is rejected."""
+        response = self.client.get(reverse('product-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fallback_matches_fts_contract(self):
+        """Test the fallback used without FTS5 ranks and tolerates typos the same way."""
+        self.assertEqual(_fallback_ids('widget', 10, 0), [self.widget.pk, self.gadget.pk, self.lamp.pk])
+        self.assertEqual(_fallback_ids('gadgte', 10, 0), [self.gadget.pk])
+
+    def test_chatbot_context_lists_matching_products(self):
+        """Test the chatbot finds the products a question mentions."""
+        matching = ChatbotAPIView().get_matching_products('desk lamp')
+        self.assertEqual(matching[0]['name'], 'Desk Lamp')
+        self.assertEqual(matching[0]['stock'], 10)
+
+    def test_chatbot_matches_products_in_full_questions(self):
+        """Test product words are picked out of a whole question, plurals included."""
+        chatbot = ChatbotAPIView()
+        for question, name in (
+            ('How many widgets do we have in stock?', 'Blue Widget'),
+            ('widget stock', 'Blue Widget'),
+            ('Which lamp is low?', 'Desk Lamp'),
+            ('Is the blue widget selling?', 'Blue Widget'),
+        ):
+            with self.subTest(question=question):
+                self.assertEqual(chatbot.get_matching_products(question)[0]['name'], name)
+        self.assertEqual(chatbot.get_matching_products('How many do we have?'), [])
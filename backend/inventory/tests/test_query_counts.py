@@ -0,0 +1,96 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, InventoryTransaction, Order, OrderItem, StockAlert
+from inventory.stripes import stripe_product
+from inventory.versions import cached_versions
+
+
+class QueryCountTests(TestCase):
+    """Every list and detail endpoint issues the same number of queries for 1 row as for many."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.counter = 0
+        # The first versioned read of a database stores its epoch; keep that one-off write out of the counts
+        cached_versions([])
+
+    def add_rows(self, count):
+        """Adds ``count`` products, each with a transaction, a stock alert and a two-line order."""
+        for _ in range(count):
+            self.counter += 1
+            products = [
+                Product.objects.create(
+                    name=f'Product {self.counter}-{i}', quantity_in_stock=50,
+                    price=Decimal('4.00'), threshold_level=0
+                )
+                for i in range(2)
+            ]
+            stripe_product(products[1], 2)
+            InventoryTransaction.objects.create(product=products[0], quantity=1, transaction_type='restock')
+            order = Order.objects.create(
+                customer_name=f'Customer {self.counter}', telephone_number='+12025550109', status='completed'
+            )
+            for product in products:
+                OrderItem.objects.create(order=order, product=product, quantity=1)
+            # Created last: stock writes above reconcile alerts away
+            StockAlert.objects.create(product=products[0], stock_level=1)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def assert_constant(self, url_for):
+        """Compares the query count with one row of data against many rows."""
+        self.add_rows(1)
+        small = self.count_queries(url_for())
+        self.add_rows(8)
+        large = self.count_queries(url_for())
+        self.assertEqual(small, large)
+
+    def test_product_list(self):
+        """Test listing products, including striped ones, is constant."""
+        self.assert_constant(lambda: reverse('product-list'))
+
+    def test_inventory_list(self):
+        """Test listing inventory transactions is constant."""
+        self.assert_constant(lambda: reverse('inventory-list'))
+
+    def test_order_list(self):
+        """Test listing orders with nested items is constant."""
+        self.assert_constant(lambda: reverse('order-list'))
+
+    def test_expanded_order_list(self):
+        """Test listing orders with expanded item products is constant."""
+        self.assert_constant(lambda: reverse('order-list') + '?expand=items.product')
+
+    def test_order_item_list(self):
+        """Test listing order items is constant."""
+        self.assert_constant(lambda: reverse('order-item-list', args=[Order.objects.first().pk]))
+
+    def test_stock_alert_list(self):
+        """Test listing stock alerts is constant."""
+        self.assert_constant(lambda: reverse('stock-alert-list'))
+
+    def test_detail_endpoints(self):
+        """Test each detail endpoint costs a fixed number of queries, including the ETag version read."""
+        self.add_rows(3)
+        order = Order.objects.last()
+        expected = {
+            reverse('single-product', args=[Product.objects.filter(stock_stripes__gt=0).first().pk]): 2,
+            reverse('single-inventory', args=[InventoryTransaction.objects.first().pk]): 2,
+            reverse('single-order', args=[order.pk]): 3,
+            reverse('single-order-item', args=[order.items.first().pk]): 2,
+            reverse('single-stock-alert', args=[StockAlert.objects.first().pk]): 2,
+        }
+        for url, queries in expected.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), queries)
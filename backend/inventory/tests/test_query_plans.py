@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from inventory.models import Product
+from inventory.query_plans import check_query_plans, plan_problems, query_plan
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        """Test no registered hot query reads a whole table or misses its index."""
+        for name, (plan, problems) in check_query_plans().items():
+            with self.subTest(query=name):
+                self.assertEqual(problems, [], plan)
+
+    def test_full_scans_are_reported(self):
+        """Test a filter on an unindexed column is flagged as a full table scan."""
+        plan = query_plan(Product.objects.filter(description='x'))
+        self.assertEqual(plan_problems(plan), ['full table scan: SCAN inventory_product'])
+        self.assertIn('does not use product_price_idx', plan_problems(plan, 'product_price_idx'))
+        self.assertEqual(plan_problems(query_plan(Product.objects.filter(price=1)), 'product_price_idx'), [])
+
+    def test_index_scans_are_reported(self):
+        """Test walking a whole index is flagged like a table scan unless the query is allowed to."""
+        plan = query_plan(Product.objects.values('category').annotate(count=Count('id')))
+        self.assertEqual(
+            plan_problems(plan, 'product_category_idx'),
+            ['full table scan: SCAN inventory_product USING COVERING INDEX product_category_idx'],
+        )
+        self.assertEqual(plan_problems(plan, 'product_category_idx', full_scan=True), [])
+        plan = query_plan(Product.objects.order_by('category'))
+        self.assertEqual(plan_problems(plan), ['full table scan: SCAN inventory_product USING INDEX product_category_idx'])
+
+    def test_command(self):
+        """Test check_query_plans prints each plan and rejects unknown names."""
+        out = StringIO()
+        call_command('check_query_plans', 'recent_product_sales', stdout=out)
+        self.assertIn('recent_product_sales: ok', out.getvalue())
+        self.assertIn('daily_sales_day_product_idx', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('check_query_plans', 'no_such_query', stdout=StringIO())
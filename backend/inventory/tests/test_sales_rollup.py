@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.models import Product, Order, OrderItem, DailySales
+from inventory.rollups import rebuild_daily_sales, sales_day
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product1 = Product.objects.create(
+            name='Test Product 1',
+            category='Tools',
+            quantity_in_stock=500,
+            price=Decimal('10.00'),
+            threshold_level=0
+        )
+        self.product2 = Product.objects.create(
+            name='Test Product 2',
+            category='Garden',
+            quantity_in_stock=500,
+            price=Decimal('2.50'),
+            threshold_level=0
+        )
+        self.order = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+
+    def rollup(self):
+        # Rows taken down to zero are kept until a rebuild
+        rows = DailySales.objects.exclude(units=0, revenue=0, orders=0)
+        return set(rows.values_list('product_id', 'day', 'units', 'revenue', 'orders'))
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollup()
+        rebuild_daily_sales()
+        self.assertEqual(incremental, self.rollup())
+
+    def test_item_writes_move_rollup(self):
+        """Test creating, changing and deleting items keeps the rollup equal to a rebuild."""
+        item = OrderItem.objects.create(order=self.order, product=self.product1, quantity=2)
+        OrderItem.objects.create(order=self.order, product=self.product2, quantity=4)
+        today = sales_day(self.order.order_date)
+        self.assertIn((self.product1.pk, today, 2, Decimal('20.00'), 1), self.rollup())
+        self.assertIn((None, today, 6, Decimal('30.00'), 1), self.rollup())
+        self.assertMatchesRebuild()
+
+        item.quantity, item.price = 3, Decimal('30.00')
+        item.save()
+        self.assertMatchesRebuild()
+        item.product = self.product2
+        item.save()
+        self.assertMatchesRebuild()
+        item.delete()
+        self.assertMatchesRebuild()
+        self.assertIn((None, today, 4, Decimal('10.00'), 1), self.rollup())
+
+    def test_order_date_change_and_delete(self):
+        """Test moving an order to another day moves its lines, and deleting it removes them."""
+        OrderItem.objects.create(order=self.order, product=self.product1, quantity=2)
+        self.order.order_date = self.order.order_date - timedelta(days=3)
+        self.order.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(DailySales.objects.get(product=self.product1).day, sales_day(self.order.order_date))
+
+        self.order.delete()
+        self.assertFalse(DailySales.objects.exclude(units=0, revenue=0, orders=0).exists())
+
+    def test_bulk_orders_update_rollup(self):
+        """Test orders created through the bulk endpoint are counted like single writes."""
+        response = self.client.post(reverse('order-bulk'), {'orders': [
+            {
+                'customer_name': f'Customer {i}',
+                'telephone_number': '+12025550109',
+                'status': 'completed',
+                'items': [{'product': self.product1.id, 'quantity': 1}, {'product': self.product2.id, 'quantity': 2}],
+            }
+            for i in range(3)
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        totals = DailySales.objects.get(product=None, day=sales_day(now()))
+        self.assertEqual((totals.units, totals.revenue, totals.orders), (9, Decimal('45.00'), 4))
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        """Test rebuild_sales_rollup restores a damaged rollup and rejects bad dates."""
+        OrderItem.objects.create(order=self.order, product=self.product1, quantity=2)
+        expected = self.rollup()
+        DailySales.objects.update(units=0)
+        out = StringIO()
+        call_command('rebuild_sales_rollup', since=str(sales_day(now())), stdout=out)
+        self.assertIn('Rebuilt the daily sales rollup', out.getvalue())
+        self.assertEqual(self.rollup(), expected)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_sales_rollup', since='yesterday', stdout=StringIO())
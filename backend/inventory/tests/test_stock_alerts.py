@@ -0,0 +1,70 @@
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+
+from inventory.alerts import deferred_alerts, reconcile_stock_alerts
+from inventory.models import ChangeLog, Product, StockAlert
+from inventory.stock import add_stock, remove_stock
+
+
+class StockAlertEngineTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}',
+                quantity_in_stock=10,
+                price=Decimal('1.00'),
+                threshold_level=5
+            )
+            for i in range(5)
+        ]
+
+    def open_alerts(self, product):
+        return StockAlert.objects.filter(product=product, resolved=False)
+
+    def test_one_unresolved_alert_per_product(self):
+        """Test repeated low-stock writes keep a single alert with the latest level."""
+        product = self.products[0]
+        remove_stock(product, 7)
+        remove_stock(product, 1)
+        self.assertEqual(self.open_alerts(product).count(), 1)
+        self.assertEqual(self.open_alerts(product).get().stock_level, 2)
+
+    def test_racing_reconciliations_open_one_alert(self):
+        """Test the database keeps a second open alert for a product from being inserted."""
+        product = self.products[0]
+        remove_stock(product, 7)
+        alert = self.open_alerts(product).get()
+        self.assertTrue(ChangeLog.objects.filter(model='stockalert', object_id=alert.pk).exists())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StockAlert.objects.create(product=product, stock_level=3)
+        # What a reconciliation that lost the race inserts is skipped
+        StockAlert.objects.bulk_create([StockAlert(product=product, stock_level=3)], ignore_conflicts=True)
+        self.assertEqual(list(self.open_alerts(product)), [alert])
+
+    def test_recovered_products_are_resolved(self):
+        """Test restocking above the threshold resolves the open alert."""
+        product = self.products[0]
+        remove_stock(product, 7)
+        add_stock(product, 10)
+        self.assertEqual(self.open_alerts(product).count(), 0)
+        self.assertEqual(StockAlert.objects.filter(product=product, resolved=True).count(), 1)
+
+    def test_deferred_block_reconciles_once_at_exit(self):
+        """Test alerts are only written when the deferred block ends."""
+        with deferred_alerts():
+            for product in self.products:
+                remove_stock(product, 8)
+            self.assertEqual(StockAlert.objects.count(), 0)
+        self.assertEqual(StockAlert.objects.filter(resolved=False).count(), 5)
+
+    def test_reconcile_cost_is_independent_of_product_count(self):
+        """Test reconciling many products takes the same number of queries as one."""
+        Product.objects.update(quantity_in_stock=1)
+        with CaptureQueriesContext(connection) as one:
+            reconcile_stock_alerts([self.products[0].pk])
+        with CaptureQueriesContext(connection) as many:
+            reconcile_stock_alerts([product.pk for product in self.products[1:]])
+        self.assertEqual(len(one), len(many))
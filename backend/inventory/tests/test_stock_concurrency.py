@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class StockConcurrencyTests(SimpleTestCase):
+    def manage(self, db_name, *args):
+        return subprocess.run(
+            [sys.executable, 'manage.py', *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300,
+            env={**os.environ, 'DB_NAME': db_name},
+        )
+
+    def test_concurrent_sales_never_hit_a_locked_database(self):
+        """Test sales from several processes on one file database all commit or are refused, none fail."""
+        # The test database lives in memory, so the workers share a migrated file of their own
+        with tempfile.TemporaryDirectory() as directory:
+            db_name = os.path.join(directory, 'concurrency.sqlite3')
+            migrate = self.manage(db_name, 'migrate', '--verbosity', '0')
+            self.assertEqual(migrate.returncode, 0, migrate.stderr)
+            result = self.manage(db_name, 'benchmark_stock_concurrency', '--workers', '3', '--sales', '50')
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn('db_errors=0 ', result.stdout)
+        self.assertIn('lost_updates=0', result.stdout)
@@ -0,0 +1,92 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from datetime import timedelta
+from decimal import Decimal
+
+from inventory.ledger import create_checkpoints, stock_as_of
+from inventory.models import Product, InventoryTransaction, Order, OrderItem, StockMovement, StockCheckpoint
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Ledger Product',
+            quantity_in_stock=50,
+            price=Decimal('2.00'),
+            threshold_level=5
+        )
+        self.order = Order.objects.create(
+            customer_name='Test Customer', telephone_number='+12025550109', status='completed'
+        )
+
+    def backdate(self, days):
+        """Moves every movement recorded so far into the past."""
+        StockMovement.objects.filter(created_at__gte=now() - timedelta(minutes=1)).update(
+            created_at=now() - timedelta(days=days)
+        )
+
+    def level_at(self, when):
+        return stock_as_of(when).get(pk=self.product.pk).stock_as_of
+
+    def test_every_stock_change_is_recorded(self):
+        """Test the ledger always sums to the current stock level."""
+        InventoryTransaction.objects.create(product=self.product, quantity=10, transaction_type='restock')
+        InventoryTransaction.objects.create(product=self.product, quantity=5, transaction_type='sale')
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=3)
+        self.product.refresh_from_db()
+        self.product.quantity_in_stock = 40
+        self.product.save()
+
+        reasons = list(StockMovement.objects.filter(product=self.product).order_by('id').values_list('reason', 'delta'))
+        self.assertEqual(reasons, [('opening', 50), ('restock', 10), ('sale', -5), ('order', -3), ('adjustment', -12)])
+        self.assertEqual(self.level_at(now()), 40)
+
+    def test_stock_as_of_past_date(self):
+        """Test historical stock ignores movements after the requested date."""
+        self.backdate(10)
+        InventoryTransaction.objects.create(product=self.product, quantity=20, transaction_type='sale')
+        self.assertEqual(self.level_at(now() - timedelta(days=5)), 50)
+        self.assertEqual(self.level_at(now()), 30)
+
+    def test_checkpoint_bounds_the_scan(self):
+        """Test a checkpoint plus later movements gives the same answer as the full ledger."""
+        self.backdate(10)
+        self.assertEqual(create_checkpoints(now() - timedelta(days=5)), 1)
+        # A checkpoint with no activity since the previous one is not rewritten
+        self.assertEqual(create_checkpoints(now() - timedelta(days=4)), 0)
+        InventoryTransaction.objects.create(product=self.product, quantity=5, transaction_type='restock')
+        StockCheckpoint.objects.update(quantity=1000)  # prove the checkpoint is what gets read
+        self.assertEqual(self.level_at(now()), 1005)
+
+    def test_movements_are_append_only(self):
+        """Test recorded movements cannot be edited."""
+        movement = StockMovement.objects.get(product=self.product)
+        movement.delta = 1
+        with self.assertRaises(ValidationError):
+            movement.save()
+
+    def test_stock_as_of_endpoint(self):
+        """Test the as-of endpoint returns quantities and valuation."""
+        response = self.client.get(reverse('stock-as-of'), {'date': now().date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['products'][0]['quantity'], 50)
+        self.assertEqual(response.data['total_value'], 100.0)
+
+    def test_stock_as_of_endpoint_rejects_dates_before_ledger(self):
+        """Test the as-of endpoint refuses dates before the first ledger movement instead of reporting 0."""
+        self.backdate(3)
+        response = self.client.get(reverse('stock-as-of'), {'date': (now() - timedelta(days=5)).date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('stock-as-of'), {'date': (now() - timedelta(days=2)).date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stock_as_of_endpoint_requires_date(self):
+        """Test the as-of endpoint rejects a missing date."""
+        response = self.client.get(reverse('stock-as-of'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
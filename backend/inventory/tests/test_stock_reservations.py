@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.ingest import import_transactions
+from inventory.models import Product, Order, OrderItem, InventoryTransaction, StockReservation
+from inventory.stock import InsufficientStock, recount_reservations, release_expired_reservations
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Test Product',
+            quantity_in_stock=10,
+            price=Decimal('5.00'),
+            threshold_level=0
+        )
+
+    def pending_order(self, quantity):
+        order = Order.objects.create(customer_name='Test Customer', telephone_number='+12025550109')
+        OrderItem.objects.create(order=order, product=self.product, quantity=quantity)
+        return order
+
+    def expire_all(self):
+        StockReservation.objects.update(expires_at=now() - timedelta(minutes=1))
+
+    def test_pending_order_reserves_instead_of_deducting(self):
+        """Test a pending order holds stock without taking it out of stock."""
+        self.pending_order(4)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+        self.assertEqual(self.product.reserved_quantity, 4)
+        self.assertEqual(self.product.available_quantity, 6)
+
+    def test_reserved_stock_cannot_be_promised_twice(self):
+        """Test a new order is rejected when only reserved stock is left."""
+        self.pending_order(8)
+        response = self.client.post(reverse('order-list'), {
+            'customer_name': 'Late Customer',
+            'telephone_number': '+12025550110',
+            'items': [{'product': self.product.id, 'quantity': 3}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_completing_order_commits_reservations(self):
+        """Test completing a pending order turns its reservation into a sale."""
+        order = self.pending_order(4)
+        response = self.client.patch(reverse('single-order', args=[order.pk]), {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 6)
+        self.assertEqual(self.product.reserved_quantity, 0)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_sweeper_releases_expired_reservations(self):
+        """Test expired reservations are released in batches and free their stock."""
+        for _ in range(3):
+            self.pending_order(2)
+        self.expire_all()
+        self.pending_order(1)
+
+        self.assertEqual(release_expired_reservations(batch_size=2), 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 1)
+        self.assertEqual(StockReservation.objects.filter(released=False).count(), 1)
+
+    def test_completing_after_expiry_needs_free_stock(self):
+        """Test an expired order can only complete if its stock was not claimed."""
+        stale = self.pending_order(6)
+        self.expire_all()
+        call_command('release_expired_reservations', stdout=StringIO())
+        self.pending_order(8)
+
+        response = self.client.patch(reverse('single-order', args=[stale.pk]), {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'pending')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+        self.assertEqual(self.product.reserved_quantity, 8)
+
+    def test_deleting_order_releases_reservations(self):
+        """Test deleting a pending order gives its stock back."""
+        order = self.pending_order(5)
+        self.client.delete(reverse('single-order', args=[order.pk]))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 0)
+
+    def test_editing_pending_item_moves_reservation(self):
+        """Test changing a pending order's line resizes its hold, and completing sells the new quantity."""
+        order = self.pending_order(2)
+        item = order.items.get()
+        response = self.client.patch(reverse('single-order-item', args=[item.pk]), {'quantity': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.quantity_in_stock, self.product.reserved_quantity), (10, 5))
+        self.assertEqual(StockReservation.objects.get().quantity, 5)
+
+        order.status = 'completed'
+        order.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.quantity_in_stock, self.product.reserved_quantity), (5, 0))
+
+    def test_releases_succeed_below_reserved_stock(self):
+        """Test reservations can be released after stock was edited down below what they hold."""
+        deleted, expiring = self.pending_order(4), self.pending_order(4)
+        self.product.quantity_in_stock = 5
+        self.product.save()
+        deleted.delete()
+        self.expire_all()
+        self.assertEqual(release_expired_reservations(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 0)
+
+    def test_sales_and_imports_keep_reserved_stock(self):
+        """Test transactions and imports cannot sell stock held by reservations, but can restock."""
+        self.pending_order(8)
+        with self.assertRaises(InsufficientStock):
+            InventoryTransaction.objects.create(product=self.product, quantity=3, transaction_type='sale')
+        report = import_transactions([
+            (1, {'product_id': self.product.id, 'quantity': 3, 'transaction_type': 'sale'}),
+            (2, {'product_id': self.product.id, 'quantity': 1, 'transaction_type': 'restock'}),
+        ])
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [{'line': 1, 'error': f'Not enough stock for product {self.product.id}'}])
+        InventoryTransaction.objects.create(product=self.product, quantity=3, transaction_type='sale')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 8)
+
+    def test_bulk_pending_orders_reserve(self):
+        """Test pending orders in a bulk batch reserve their stock."""
+        response = self.client.post(reverse('order-bulk'), [{
+            'customer_name': 'Bulk Customer',
+            'telephone_number': '+12025550109',
+            'status': 'pending',
+            'items': [{'product': self.product.id, 'quantity': 3}],
+        }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+        self.assertEqual(self.product.reserved_quantity, 3)
+        self.assertEqual(StockReservation.objects.get().quantity, 3)
+
+    def test_recount_repairs_counter(self):
+        """Test the counter is rebuilt from active reservations."""
+        self.pending_order(3)
+        Product.objects.update(reserved_quantity=9)
+        self.assertEqual(recount_reservations(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 3)
+
+    def test_availability_check_independent_of_open_reservations(self):
+        """Test reserving costs the same number of queries with many open reservations."""
+        self.product.quantity_in_stock = 1000
+        self.product.save()
+        order = self.pending_order(1)
+        with CaptureQueriesContext(connection) as few:
+            OrderItem.objects.create(order=order, product=self.product, quantity=1)
+        for _ in range(30):
+            OrderItem.objects.create(order=order, product=self.product, quantity=1)
+        with CaptureQueriesContext(connection) as many:
+            OrderItem.objects.create(order=order, product=self.product, quantity=1)
+        self.assertEqual(len(few), len(many))
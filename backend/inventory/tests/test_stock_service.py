@@ -0,0 +1,106 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.models import Product, Order, OrderItem, InventoryTransaction, StockAlert
+from inventory.serializers import OrderSerializer
+from inventory.stock import InsufficientStock, add_stock, remove_stock
+
+
+class StockServiceTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Hot Product',
+            quantity_in_stock=10,
+            price=Decimal('5.00'),
+            threshold_level=3
+        )
+        self.order = Order.objects.create(
+            customer_name='Test Customer',
+            telephone_number='+12025550109',
+            status='completed'
+        )
+
+    def test_stale_instances_do_not_lose_updates(self):
+        """Test two copies of the same row both see their decrement applied."""
+        first = Product.objects.get(pk=self.product.pk)
+        second = Product.objects.get(pk=self.product.pk)
+        remove_stock(first, 4)
+        remove_stock(second, 4)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 2)
+        self.assertEqual(second.quantity_in_stock, 2)
+
+    def test_insufficient_stock_leaves_stock_unchanged(self):
+        """Test a decrement larger than the stock is refused."""
+        with self.assertRaises(InsufficientStock):
+            remove_stock(self.product, 11)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+
+    def test_stock_alert_follows_stock_level(self):
+        """Test the service raises and resolves stock alerts."""
+        remove_stock(self.product, 8)
+        self.assertEqual(StockAlert.objects.filter(product=self.product, resolved=False).count(), 1)
+        add_stock(self.product, 5)
+        self.assertEqual(StockAlert.objects.filter(product=self.product, resolved=False).count(), 0)
+
+    def test_updating_transaction_does_not_move_stock_again(self):
+        """Test only the initial save of an inventory transaction changes stock."""
+        txn = InventoryTransaction.objects.create(product=self.product, quantity=3, transaction_type='sale')
+        txn.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 7)
+
+    def test_order_item_endpoint_deducts_stock_once(self):
+        """Test creating an order item through the API deducts stock exactly once."""
+        url = reverse('order-item-list', kwargs={'order_id': self.order.pk})
+        data = {'order': self.order.pk, 'product': self.product.pk, 'quantity': 4}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 6)
+
+    def test_editing_and_deleting_item_moves_stock(self):
+        """Test changing a completed order's line takes the difference from stock and deleting it returns the rest."""
+        item = OrderItem.objects.create(order=self.order, product=self.product, quantity=2)
+        url = reverse('single-order-item', args=[item.pk])
+        response = self.client.patch(url, {'quantity': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 5)
+
+        response = self.client.patch(url, {'quantity': 11}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 5)
+
+        self.client.delete(url)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+
+    def test_failed_order_line_rolls_back_whole_order(self):
+        """Test an order whose later line runs out of stock leaves no trace."""
+        other = Product.objects.create(name='Other Product', quantity_in_stock=1, price=Decimal('2.00'))
+        serializer = OrderSerializer(data={
+            'customer_name': 'New Customer',
+            'telephone_number': '+12025550110',
+            'items': [
+                {'product': self.product.pk, 'quantity': 2},
+                {'product': other.pk, 'quantity': 1},
+            ]
+        })
+        self.assertTrue(serializer.is_valid())
+        # Another writer drains the second product after validation passed
+        Product.objects.filter(pk=other.pk).update(quantity_in_stock=0)
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity_in_stock, 10)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.count(), 0)
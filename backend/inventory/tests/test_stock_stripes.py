@@ -0,0 +1,130 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from inventory.chatbot import ChatbotAPIView
+from inventory.models import Product, InventoryTransaction, StockAlert, StockMovement, StockStripe
+from inventory.stock import InsufficientStock
+from inventory.stripes import fold_stock_stripes, stripe_product, stripe_total
+
+
+class StockStripeTests(TestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Hot Product',
+            quantity_in_stock=40,
+            price=Decimal('3.00'),
+            threshold_level=5
+        )
+        stripe_product(self.product, 4)
+
+    def sell(self, quantity):
+        return InventoryTransaction.objects.create(product=self.product, quantity=quantity, transaction_type='sale')
+
+    def test_striping_spreads_stock(self):
+        """Test striping splits stock evenly without changing the total."""
+        quantities = list(StockStripe.objects.filter(product=self.product).order_by('index').values_list('quantity', flat=True))
+        self.assertEqual(quantities, [10, 10, 10, 10])
+        self.assertEqual(self.product.current_stock(), 40)
+
+    def test_sales_hit_stripes_and_fold_catches_up(self):
+        """Test sales leave the product row alone until the fold job runs."""
+        self.sell(3)
+        self.sell(4)
+        self.assertEqual(stripe_total(self.product.pk), 33)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity_in_stock, 40)
+        self.assertEqual(fold_stock_stripes(), 1)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity_in_stock, 33)
+        self.assertEqual(fold_stock_stripes(), 0)
+        self.assertEqual(sum(StockMovement.objects.filter(product=self.product).values_list('delta', flat=True)), 33)
+
+    def test_short_stripe_borrows_from_siblings(self):
+        """Test a sale larger than any one stripe borrows from its siblings."""
+        self.sell(25)
+        self.assertEqual(stripe_total(self.product.pk), 15)
+        with self.assertRaises(InsufficientStock):
+            self.sell(16)
+        self.assertEqual(stripe_total(self.product.pk), 15)
+
+    def test_serializer_shows_folded_value(self):
+        """Test the product endpoint reports the stripe total."""
+        self.sell(10)
+        response = self.client.get(reverse('single-product', args=[self.product.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity_in_stock'], 30)
+
+    def test_alerts_use_stripe_total(self):
+        """Test stock alerts compare the stripe total to the threshold."""
+        self.sell(37)
+        alert = StockAlert.objects.get(product=self.product, resolved=False)
+        self.assertEqual(alert.stock_level, 3)
+        InventoryTransaction.objects.create(product=self.product, quantity=10, transaction_type='restock')
+        self.assertFalse(StockAlert.objects.filter(product=self.product, resolved=False).exists())
+
+    def test_sale_endpoint_checks_live_stock(self):
+        """Test the inventory endpoint accepts a sale covered by the stripes but not the folded column."""
+        Product.objects.filter(pk=self.product.pk).update(quantity_in_stock=2)
+        response = self.client.post(reverse('inventory-list'), {
+            'product_id': self.product.pk, 'quantity': 10, 'transaction_type': 'sale',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(stripe_total(self.product.pk), 30)
+
+    def test_bulk_orders_use_stripes(self):
+        """Test set-based order ingestion decrements striped products through their stripes."""
+        response = self.client.post(reverse('order-bulk'), [{
+            'customer_name': 'Bulk Customer',
+            'telephone_number': '+12025550109',
+            'status': 'completed',
+            'items': [{'product': self.product.pk, 'quantity': 12}],
+        }], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(stripe_total(self.product.pk), 28)
+
+    def test_direct_edit_respreads_stripes(self):
+        """Test editing the stock of a striped product sets the new total."""
+        self.product.quantity_in_stock = 9
+        self.product.save()
+        self.assertEqual(stripe_total(self.product.pk), 9)
+        self.assertEqual(
+            list(StockMovement.objects.filter(product=self.product).values_list('delta', flat=True))[-1], -31
+        )
+
+    def test_other_edits_keep_stripes(self):
+        """Test patching a non-stock field of a striped product leaves its stock and ledger alone."""
+        self.sell(10)
+        movements = StockMovement.objects.count()
+        response = self.client.patch(
+            reverse('single-product', args=[self.product.pk]), {'price': '4.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity_in_stock'], 30)
+        self.assertEqual(stripe_total(self.product.pk), 30)
+        self.assertEqual(StockMovement.objects.count(), movements)
+
+    def test_chatbot_stats_see_folded_value(self):
+        """Test chatbot statistics count a sold-out striped product as out of stock."""
+        self.sell(40)
+        stats = ChatbotAPIView().get_inventory_stats()
+        self.assertEqual(stats['out_of_stock'], 1)
+
+    def test_chatbot_insights_read_live_stock(self):
+        """Test chatbot product insights see stripe sales without folding them into the product row."""
+        self.sell(40)
+        insights = ChatbotAPIView().get_product_insights()
+        self.assertEqual([row['name'] for row in insights['zero_stock']], ['Hot Product'])
+        self.assertEqual(insights['critical_stock'][0]['stock'], 0)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity_in_stock, 40)
+
+    def test_unstriping_folds_back(self):
+        """Test unstriping moves the stripe total back into the product row."""
+        self.sell(5)
+        stripe_product(self.product, 0)
+        self.assertFalse(StockStripe.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity_in_stock, 35)
+        self.sell(5)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity_in_stock, 30)
@@ -1,10 +1,17 @@
 from django.urls import path
 from .views import (
-    ProductList, SingleProductList,
-    InventoryList, SingleInventoryList,
-    OrderList, SingleOrderList,
+    ProductList, SingleProductList, product_search,
+    InventoryList, SingleInventoryList, InventoryImport,
+    InventoryEventList, inventory_event_status,
+    OrderList, SingleOrderList, OrderBulkCreate,
     OrderItemList, SingleOrderItemList,
     StockAlertList, SingleStockAlert,
+    change_feed,
+    export_data,
+    stock_as_of_view,
+    sales_series_view,
+    MonthlyStockSummaryList,
+    analytics_summary,
     forecast_sales,
     ai_analytics,
     ai_forecast_demand,
@@ -17,18 +24,23 @@ from .views import (
 urlpatterns = [
     #product urls
     path('product/', ProductList.as_view(), name='product-list'),
+    path('product/search/', product_search, name='product-search'),
     path('product/<int:pk>/', SingleProductList.as_view(), name='single-product'),
     path('inventory/', InventoryList.as_view(), name='inventory-list'),
     
     
     #inventory urls
     path('inventory/<int:pk>/', SingleInventoryList.as_view(), name='single-inventory'),
+    path('inventory/import/', InventoryImport.as_view(), name='inventory-import'),
+    path('inventory/events/', InventoryEventList.as_view(), name='inventory-events'),
+    path('inventory/events/<str:writer>/<int:sequence>/', inventory_event_status, name='inventory-event-status'),
     path('inventory-forecast/', inventory_forecast, name='inventory_forecast'),
     
     
     #order urls
     path('order/', OrderList.as_view(), name='order-list'),
     path('order/<int:pk>/', SingleOrderList.as_view(), name='single-order'),
+    path('order/bulk/', OrderBulkCreate.as_view(), name='order-bulk'),
     path('order/<int:order_id>/items/', OrderItemList.as_view(), name='order-item-list'),
     path('order/item/<int:pk>/', SingleOrderItemList.as_view(), name='single-order-item'),
     path('stock-alert/', StockAlertList.as_view(), name='stock-alert-list'),
@@ -36,11 +48,17 @@ urlpatterns = [
     
     #stock alert urls
     path('stock-alert/<int:pk>/', SingleStockAlert.as_view(), name='single-stock-alert'),
+    path('changes/', change_feed, name='change-feed'),
+    path('export/<str:dataset>.<str:data_format>', export_data, name='export'),
+    path('stock/as-of/', stock_as_of_view, name='stock-as-of'),
     path('forecast/', forecast_sales, name='forecast-demand'),
     
     
     #ai urls
     path('analytics/', ai_analytics, name='analytics'),
+    path('analytics/series/', sales_series_view, name='analytics-series'),
+    path('analytics/monthly-stock/', MonthlyStockSummaryList.as_view(), name='monthly-stock-summary'),
+    path('analytics/summary/', analytics_summary, name='analytics-summary'),
     path('gemini-insights/', ai_forecast_demand, name='gemini-insights'),
     path('chatbot/', ChatbotAPIView.as_view(), name='chatbot'),
     
@@ -0,0 +1,172 @@
+import random
+
+from django.db import models
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+# Models whose rows change what the API returns, and the version each write bumps.
+# Stripes hold the live stock of hot products, so they count as product writes.
+VERSIONED_MODELS = {
+    'Product': 'product',
+    'StockStripe': 'product',
+    'InventoryTransaction': 'inventorytransaction',
+    'Order': 'order',
+    'OrderItem': 'orderitem',
+    'StockAlert': 'stockalert',
+}
+
+
+# Rows each version counter is spread over. Hot-product sales bump 'product'
+# on every write; one row would queue all of them behind a single row lock.
+VERSION_SHARDS = 16
+
+# Random token written once per database. Counters start again from 0 when
+# the database is recreated, so cache keys also carry the epoch to keep a new
+# database from hitting snapshots cached for the old one.
+EPOCH = 'database-epoch'
+
+
+def bump_versions(*names):
+    """
+    Increments the version counter of each name in the current transaction,
+    so readers never see new rows with an old version. Each bump goes to a
+    random shard of the counter.
+    """
+    from .models import DataVersion
+    for name in set(names):
+        shard = DataVersion.objects.filter(name=name, shard=random.randrange(VERSION_SHARDS))
+        if shard.update(version=F('version') + 1):
+            continue
+        # First bump of this counter: create every shard at once, so later bumps are one UPDATE
+        DataVersion.objects.bulk_create(
+            [DataVersion(name=name, shard=index) for index in range(VERSION_SHARDS)], ignore_conflicts=True
+        )
+        shard.update(version=F('version') + 1)
+
+
+def get_versions(names):
+    """
+    Reads the counters for ``names`` with one query on the unique name and
+    shard index, summing the shards; unknown names are 0.
+    """
+    from .models import DataVersion
+    versions = dict(
+        DataVersion.objects.filter(name__in=names).values('name').annotate(total=Sum('version'))
+        .values_list('name', 'total')
+    )
+    return [versions.get(name, 0) for name in names]
+
+
+def cached_versions(names):
+    """
+    get_versions(names) prefixed with the database epoch, still one query
+    once the epoch exists. The first call on a database creates it.
+    """
+    from .models import DataVersion
+    epoch, *versions = get_versions([EPOCH, *names])
+    if not epoch:
+        DataVersion.objects.bulk_create(
+            [DataVersion(name=EPOCH, version=random.randrange(1, 2 ** 63))], ignore_conflicts=True
+        )
+        [epoch] = get_versions([EPOCH])
+    return [epoch, *versions]
+
+
+def etag_for(names):
+    # Scoped to the epoch, so a recreated database does not validate old client ETags
+    return 'W/"{}"'.format('.'.join(str(version) for version in cached_versions(names)))
+
+
+class VersionedQuerySet(models.QuerySet):
+    """
+    Bumps the model's version and records change feed entries on set-based
+    writes that bypass save() and its signals.
+    """
+
+    def _bump(self, objects=None, ids=None):
+        from .changes import CHANGE_FEED, record_changes
+        bump_versions(VERSIONED_MODELS[self.model.__name__])
+        name, id_field = CHANGE_FEED[self.model.__name__]
+        if objects is not None:
+            ids = [getattr(obj, id_field) for obj in objects]
+        record_changes(name, ids)
+
+    def update(self, **kwargs):
+        from .changes import CHANGE_FEED
+        # Read the ids first: the filter may no longer match once updated
+        ids = list(self.values_list(CHANGE_FEED[self.model.__name__][1], flat=True))
+        rows = super().update(**kwargs)
+        if rows:
+            self._bump(ids=ids)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            self._bump(objects=objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            self._bump(objects=objs)
+        return rows
+
+
+def _bump_on_write(sender, **kwargs):
+    bump_versions(VERSIONED_MODELS[sender.__name__])
+
+
+def _record_change(sender, instance, **kwargs):
+    from .changes import CHANGE_FEED, record_changes
+    name, id_field = CHANGE_FEED[sender.__name__]
+    # Deleting an order item or stripe changes its order or product
+    deleted = 'created' not in kwargs and id_field == 'pk'
+    record_changes(name, [getattr(instance, id_field)], 'delete' if deleted else 'upsert')
+
+
+def connect_version_signals():
+    """Bumps versions and records changes on save() and on every deleted row, including cascades."""
+    from . import models as inventory_models
+    for model_name in VERSIONED_MODELS:
+        model = getattr(inventory_models, model_name)
+        post_save.connect(_bump_on_write, sender=model, dispatch_uid=f'version-save-{model_name}')
+        post_delete.connect(_bump_on_write, sender=model, dispatch_uid=f'version-delete-{model_name}')
+        post_save.connect(_record_change, sender=model, dispatch_uid=f'change-save-{model_name}')
+        post_delete.connect(_record_change, sender=model, dispatch_uid=f'change-delete-{model_name}')
+
+
+class ConditionalGetMixin:
+    """
+    Adds a weak ETag built from the version counters in ``version_names`` to
+    list and detail GETs. A matching If-None-Match is answered with 304 after
+    reading only those counters, plus the object lookup on detail views, so
+    a missing row is still a 404. The versions are read before the data, so
+    a concurrent write can only make the ETag older than the body, never newer.
+    """
+    version_names = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(super().retrieve, request, *args, lookup=self.get_object, **kwargs)
+
+    def conditional_get(self, handler, request, *args, lookup=None, **kwargs):
+        etag = etag_for(self.version_names)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            wanted = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+            if '*' in wanted or etag.removeprefix('W/') in wanted:
+                if lookup is not None:
+                    lookup()  # raises Http404 for a missing row
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
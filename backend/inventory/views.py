@@ -2,15 +2,19 @@ from decimal import Decimal
 from datetime import datetime, timedelta
 from django.utils.timezone import now
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, F, FloatField
-from django.db.models.functions import ExtractMonth, Cast
+from django.db.models import Sum, F, FloatField, Prefetch
+from django.db.models.functions import Cast
+from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
 from .utils import generate_text
-from rest_framework import generics, status
+from rest_framework import filters, generics, status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.views import APIView
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
@@ -25,11 +29,33 @@ import requests
 from typing import Dict, List, Tuple, Any
 from tabulate import tabulate  # For markdown table formatting
 
-from .models import Product, InventoryTransaction, Order, OrderItem, StockAlert, ChatSession
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import (
+    Product, InventoryTransaction, Order, OrderItem, StockAlert, ChatSession, InventoryEventReceipt, DailySales,
+)
 from .serializers import (
     ProductSerializer, InventorySerializer, OrderSerializer,
-    OrderItemSerializer, StockAlertSerializer, InventoryForecastSerializer
+    OrderItemSerializer, StockAlertSerializer, InventoryForecastSerializer,
+    BulkOrderSerializer, MonthlySalesStockSummarySerializer
+)
+from .fast_serializers import (
+    FastListMixin, inventory_fast_serializer, product_fast_serializer, stock_alert_fast_serializer
 )
+from .filters import InventoryFilter, OrderFilter, ProductFilter
+from .group_commit import get_writer
+from .idempotency import IdempotentPostMixin
+from .ingest import create_orders, import_transactions, iter_csv, iter_ndjson
+from .ledger import ledger_start, stock_as_of
+from .stock import InsufficientStock
+from .search import search_product_ids
+from .stripes import live_stock
+from .versions import ConditionalGetMixin
+from .changes import changes_since, horizon, latest_cursor
+from .exports import EXPORT_FORMATS, EXPORTS, export_stream
+from .forecasting import forecast_demand
+from .kpis import cached_dashboard_kpis
+from .rollups import sales_day
+from .series import GRANULARITIES, METRICS, SERIES_MAX_BUCKETS, bucket_count, bucket_starts, sales_series
 from .gemini_api import generate_text
 
 logger = logging.getLogger(__name__)
@@ -43,23 +69,17 @@ def clean_ai_response(ai_response):
     return cleaned
 
 def get_sales_data():
-    """Fetch sales data for the last 12 months."""
-    sales_data = defaultdict(int)
-    one_year_ago = datetime.now() - timedelta(days=365)
+    """Fetch sales data for the last 12 months, oldest first."""
+    today = timezone.localdate()
+    first_month = (np.datetime64(today, 'M') - 11).astype('datetime64[D]').item()
     try:
-        orders = (
-            Order.objects.filter(order_date__gte=one_year_ago)
-            .annotate(month=ExtractMonth('order_date'))
-            .values('month')
-            .annotate(total_sales=Sum('total_amount'))
-        )
-        for order in orders:
-            sales_data[order['month']] = order['total_sales']
+        periods, values = sales_series(first_month, today, 'month', 'revenue')
     except Exception as e:
         logger.error("Error fetching sales data: %s", e)
+        periods, values = bucket_starts(first_month, today, 'month'), np.zeros(12)
     return [
-        {"month": datetime(2000, month, 1).strftime("%b"), "sales": float(sales_data.get(month, 0))}
-        for month in range(1, 13)
+        {"month": period.strftime("%b"), "sales": float(value)}
+        for period, value in zip(periods.tolist(), values.tolist())
     ]
 
 LOW_STOCK_THRESHOLD = 10
@@ -82,52 +102,255 @@ def get_stock_alerts():
 # --------------------------------------------------
 # Product Views
 # --------------------------------------------------
-class ProductList(generics.ListCreateAPIView):
+class ProductList(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = Product.objects.all()
+    version_names = ('product',)
     serializer_class = ProductSerializer
+    fast_serializer = product_fast_serializer
+    ordering = 'id'
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = ProductFilter
+    ordering_fields = ['id', 'name', 'price']
+
+    def get_queryset(self):
+        # Striped products read their stripe total from the annotation
+        return super().get_queryset().annotate(live_stock=live_stock())
 
-class SingleProductList(generics.RetrieveUpdateDestroyAPIView):
+class SingleProductList(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
+    version_names = ('product',)
     serializer_class = ProductSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().annotate(live_stock=live_stock())
+
+@api_view(['GET'])
+def product_search(request):
+    """
+    Ranked product search over name, category and description, e.g.
+    GET /api/product/search/?q=widgt&page=2&page_size=20. Results are the
+    same objects as /api/product/; next/prev pages are in the Link header.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': "Provide a search term as 'q'."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': "'page' and 'page_size' must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # One extra id tells whether there is a next page
+    ids = search_product_ids(query, limit=page_size + 1, offset=(page - 1) * page_size)
+    products = Product.objects.annotate(live_stock=live_stock()).in_bulk(ids[:page_size])
+    data = ProductSerializer([products[pk] for pk in ids[:page_size] if pk in products], many=True).data
+
+    url = request.build_absolute_uri()
+    links = []
+    if len(ids) > page_size:
+        links.append(f'<{replace_query_param(url, "page", page + 1)}>; rel="next"')
+    if page > 1:
+        previous = remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)
+        links.append(f'<{previous}>; rel="prev"')
+    return Response(data, headers={'Link': ', '.join(links)} if links else None)
+
 # --------------------------------------------------
 # Inventory Views
 # --------------------------------------------------
-class InventoryList(generics.ListCreateAPIView):
+class InventoryList(IdempotentPostMixin, ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = InventoryTransaction.objects.all()
+    version_names = ('inventorytransaction', 'product')
     serializer_class = InventorySerializer
+    fast_serializer = inventory_fast_serializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = InventoryFilter
+    ordering_fields = ['transaction_date']
     permission_classes = []  # Allow unauthenticated access
+    ordering = '-transaction_date'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('product')
     
     def get(self, request, *args, **kwargs):
         try:
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            return self.list(request, *args, **kwargs)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class SingleInventoryList(generics.RetrieveUpdateDestroyAPIView):
+class SingleInventoryList(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = InventoryTransaction.objects.all()
+    version_names = ('inventorytransaction', 'product')
     serializer_class = InventorySerializer
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('product')
+
+class InventoryImport(APIView):
+    """
+    Streams a restock/sale feed into inventory transactions.
+    Accepts a multipart 'file' (.csv, .ndjson or .jsonl) or a raw
+    text/csv or application/x-ndjson body; each line needs product_id,
+    quantity and transaction_type, with optional extra_charge_percent.
+    ``?input=csv|ndjson`` overrides the format guessed from the file name or
+    content type (``?format=`` is taken by DRF's renderer selection).
+    Returns counts plus a per-line error report.
+    """
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request, *args, **kwargs):
+        content_type = (request.content_type or '').split(';')[0].strip()
+        if content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if not upload:
+                return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+            lines = upload
+            data_format = request.query_params.get('input') or upload.name.rsplit('.', 1)[-1].lower()
+        else:
+            lines = request.stream or []
+            data_format = request.query_params.get('input') or {
+                'text/csv': 'csv', 'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'
+            }.get(content_type)
+
+        if data_format == 'csv':
+            records = iter_csv(lines)
+        elif data_format in ('ndjson', 'jsonl'):
+            records = iter_ndjson(lines)
+        else:
+            return Response({'error': 'Unsupported format. Use CSV or NDJSON.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_transactions(records)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+class InventoryEventList(APIView):
+    """
+    Accepts inventory events (one object or a list, same fields as the
+    import feed) in group-commit mode. Events are validated and queued, and
+    the response carries the sequence numbers to poll for their outcome.
+    Only available when INVENTORY_GROUP_COMMIT is enabled.
+    """
+    MAX_EVENTS = 1000
+
+    def post(self, request, *args, **kwargs):
+        if not settings.INVENTORY_GROUP_COMMIT:
+            return Response({'error': 'Group-commit inventory events are disabled.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        records = request.data if isinstance(request.data, list) else [request.data]
+        if not records or len(records) > self.MAX_EVENTS:
+            return Response({'error': f'Send between 1 and {self.MAX_EVENTS} events.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        writer = get_writer()
+        try:
+            sequences = writer.submit(records)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'writer': writer.writer_id, 'sequences': sequences}, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def inventory_event_status(request, writer, sequence):
+    """Reports whether a queued inventory event was applied, failed, or is still queued."""
+    receipt = InventoryEventReceipt.objects.filter(writer=writer, sequence=sequence).first()
+    if receipt is not None:
+        return Response({
+            'writer': writer,
+            'sequence': sequence,
+            'status': receipt.status,
+            'transaction_id': receipt.transaction_id,
+            'error': receipt.error or None,
+        })
+    current = get_writer() if settings.INVENTORY_GROUP_COMMIT else None
+    if current is not None and current.writer_id == writer and sequence <= current.last_issued:
+        return Response({'writer': writer, 'sequence': sequence, 'status': 'queued'})
+    return Response({'error': 'Unknown inventory event.'}, status=status.HTTP_404_NOT_FOUND)
+
 # --------------------------------------------------
 # Order Views
 # --------------------------------------------------
-class OrderList(generics.ListCreateAPIView):
+def with_items(orders, expand=()):
+    """
+    Loads every order's items and their products in one extra query. With
+    ``items.product`` expanded the products are fetched in a query of their
+    own instead, once each and with their live stock.
+    """
+    if 'items.product' in expand:
+        return orders.prefetch_related(
+            'items', Prefetch('items__product', queryset=Product.objects.annotate(live_stock=live_stock()))
+        )
+    return orders.prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+    )
+
+class OrderExpandMixin:
+    """Accepts ?expand=items.product on order GETs and prefetches exactly what it asks for."""
+    expandable = ('items.product',)
+
+    def get_expand(self):
+        expand = {name.strip() for name in self.request.query_params.get('expand', '').split(',') if name.strip()}
+        unknown = expand - set(self.expandable)
+        if unknown:
+            raise ValidationError(
+                {'error': f"Cannot expand {', '.join(sorted(unknown))}. Use: {', '.join(self.expandable)}."}
+            )
+        return expand
+
+    def get_queryset(self):
+        return with_items(super().get_queryset(), self.get_expand() if self.request.method == 'GET' else ())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            context['expand'] = self.get_expand()
+        return context
+
+class OrderList(IdempotentPostMixin, ConditionalGetMixin, OrderExpandMixin, generics.ListCreateAPIView):
     queryset = Order.objects.all()
+    version_names = ('order', 'orderitem', 'product')
     serializer_class = OrderSerializer
+    ordering = '-order_date'
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = OrderFilter
+    ordering_fields = ['order_date']
 
-class SingleOrderList(generics.RetrieveUpdateDestroyAPIView):
+class SingleOrderList(ConditionalGetMixin, OrderExpandMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Order.objects.all()
+    version_names = ('order', 'orderitem', 'product')
     serializer_class = OrderSerializer
     http_method_names = ['get', 'put', 'patch', 'delete']
 
+class OrderBulkCreate(IdempotentPostMixin, generics.CreateAPIView):
+    """Creates hundreds of orders per request, e.g. end-of-day POS batch replays."""
+    serializer_class = BulkOrderSerializer
+    MAX_ORDERS = 1000
+
+    def create(self, request, *args, **kwargs):
+        orders = request.data.get('orders') if isinstance(request.data, dict) else request.data
+        if not isinstance(orders, list) or not orders:
+            return Response({'error': 'Expected a non-empty list of orders.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(orders) > self.MAX_ORDERS:
+            return Response({'error': f'At most {self.MAX_ORDERS} orders per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=orders, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            created = create_orders(serializer.validated_data)
+        except InsufficientStock as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'created': len(created),
+            'orders': [{'id': order.id, 'total_amount': order.total_amount} for order in created],
+        }, status=status.HTTP_201_CREATED)
+
 # --------------------------------------------------
 # Order Item Views
 # --------------------------------------------------
-class OrderItemList(generics.ListCreateAPIView):
+class OrderItemList(IdempotentPostMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = OrderItem.objects.all()
+    version_names = ('orderitem', 'order', 'product')
     serializer_class = OrderItemSerializer
+    ordering = 'id'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('product', 'order')
 
     def create(self, request, *args, **kwargs):
         try:
@@ -136,42 +359,286 @@ class OrderItemList(generics.ListCreateAPIView):
             quantity = int(request.data.get('quantity', 0))
             if quantity <= 0:
                 return Response({'error': 'Quantity must be greater than zero.'}, status=status.HTTP_400_BAD_REQUEST)
-            if product.quantity_in_stock < quantity:
+            if product.available_quantity < quantity:
                 return Response({'error': f'Not enough stock for {product.name}.'}, status=status.HTTP_400_BAD_REQUEST)
-            product.quantity_in_stock -= quantity
-            product.save()
+            # OrderItem.save deducts or reserves stock, refreshes alerts and the order total atomically
             order_item = OrderItem.objects.create(
                 order=order, product=product, quantity=quantity,
                 price=product.price * Decimal(quantity)
             )
-            order.update_total_amount()
-            if product.quantity_in_stock < product.threshold_level:
-                StockAlert.objects.get_or_create(
-                    product=product, resolved=False,
-                    defaults={'stock_level': product.quantity_in_stock}
-                )
             return Response(OrderItemSerializer(order_item).data, status=status.HTTP_201_CREATED)
+        except InsufficientStock as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
         except ValueError:
             return Response({'error': 'Invalid quantity value.'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error("Error creating order item: %s", e)
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class SingleOrderItemList(generics.RetrieveUpdateDestroyAPIView):
+class SingleOrderItemList(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = OrderItem.objects.all()
+    version_names = ('orderitem', 'order', 'product')
     serializer_class = OrderItemSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('product', 'order')
+
 # --------------------------------------------------
 # Stock Alert Views
 # --------------------------------------------------
-class StockAlertList(generics.ListAPIView):
+class StockAlertList(ConditionalGetMixin, FastListMixin, generics.ListAPIView):
     queryset = StockAlert.objects.filter(resolved=False)
+    version_names = ('stockalert', 'product')
     serializer_class = StockAlertSerializer
+    fast_serializer = stock_alert_fast_serializer
+    ordering = '-id'
 
-class SingleStockAlert(generics.RetrieveUpdateDestroyAPIView):
+    def get_queryset(self):
+        return super().get_queryset().select_related('product')
+
+class SingleStockAlert(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = StockAlert.objects.all()
+    version_names = ('stockalert', 'product')
     serializer_class = StockAlertSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('product')
+
+# --------------------------------------------------
+# Change Feed Views
+# --------------------------------------------------
+CHANGE_FEED_SOURCES = {
+    'product': (lambda: Product.objects.annotate(live_stock=live_stock()), ProductSerializer),
+    'inventorytransaction': (lambda: InventoryTransaction.objects.select_related('product'), InventorySerializer),
+    'order': (lambda: with_items(Order.objects.all()), OrderSerializer),
+    'stockalert': (lambda: StockAlert.objects.select_related('product'), StockAlertSerializer),
+}
+
+@api_view(['GET'])
+def change_feed(request):
+    """
+    Changes to products, inventory transactions, orders and stock alerts
+    since a cursor, e.g. GET /api/changes/?since=1042. Each object appears
+    once with its latest state, or as a delete. Without 'since' only the
+    current cursor is returned; clients load the lists once and then poll
+    here with the cursor from the previous response while 'more' is true.
+    """
+    since = request.query_params.get('since')
+    if since is None:
+        return Response({'cursor': latest_cursor(), 'changes': [], 'more': False})
+    try:
+        since = int(since)
+        limit = min(max(int(request.query_params.get('limit', 500)), 1), 1000)
+    except ValueError:
+        return Response({'error': "'since' and 'limit' must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+    if since < horizon():
+        return Response(
+            {'error': 'Changes since this cursor are no longer kept; reload the lists and start from a new cursor.'},
+            status=status.HTTP_410_GONE,
+        )
+
+    changes, cursor, more = changes_since(since, limit)
+    upserted = defaultdict(list)
+    for model, object_id, action in changes:
+        if action == 'upsert':
+            upserted[model].append(object_id)
+    objects = {}
+    for model, ids in upserted.items():
+        queryset, serializer_class = CHANGE_FEED_SOURCES[model]
+        for obj in queryset().filter(pk__in=ids):
+            objects[(model, obj.pk)] = serializer_class(obj).data
+
+    results = []
+    for model, object_id, action in changes:
+        data = objects.get((model, object_id))
+        # Rows deleted after their last logged upsert are reported as deletes
+        results.append({'model': model, 'id': object_id, 'action': 'upsert' if data else 'delete', 'data': data})
+    return Response({'cursor': cursor, 'changes': results, 'more': more})
+
+# --------------------------------------------------
+# Export Views
+# --------------------------------------------------
+@api_view(['GET'])
+def export_data(request, dataset, data_format):
+    """
+    Streams every order, order item or inventory transaction as CSV or
+    NDJSON, e.g. GET /api/export/orders.csv?date_after=2025-01-01&date_before=2025-01-31.
+    Rows are read and written in chunks, so exports of any size run in
+    constant memory. With ?gzip=true the body is a .gz file.
+    """
+    if dataset not in EXPORTS or data_format not in EXPORT_FORMATS:
+        return Response({'error': f"Unknown export. Use one of {', '.join(sorted(EXPORTS))} "
+                                  f"as .{' or .'.join(EXPORT_FORMATS)}."}, status=status.HTTP_404_NOT_FOUND)
+    dates = {}
+    for param in ('date_after', 'date_before'):
+        value = request.query_params.get(param)
+        if value:
+            dates[param] = parse_date(value)
+            if dates[param] is None:
+                return Response({'error': f"'{param}' must be a date (YYYY-MM-DD)."},
+                                status=status.HTTP_400_BAD_REQUEST)
+    gzip = request.query_params.get('gzip', 'false').lower() == 'true'
+
+    filename = f'{dataset}.{data_format}' + ('.gz' if gzip else '')
+    response = StreamingHttpResponse(
+        export_stream(dataset, data_format, gzip=gzip, **dates),
+        content_type='application/gzip' if gzip else EXPORT_FORMATS[data_format][1],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+# --------------------------------------------------
+# Stock Ledger Views
+# --------------------------------------------------
+def parse_as_of(value):
+    """Parses a date (meaning the end of that day) or an ISO datetime into an aware datetime."""
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is not None:
+        as_of = datetime.combine(day, datetime.max.time())
+    else:
+        as_of = parse_datetime(value)
+        if as_of is None:
+            return None
+    if timezone.is_naive(as_of):
+        as_of = timezone.make_aware(as_of)
+    return as_of
+
+@api_view(['GET'])
+def stock_as_of_view(request):
+    """
+    Stock levels and valuation for every product at a point in time,
+    e.g. GET /api/stock/as-of/?date=2025-01-31 for a month-end valuation.
+    Values use current product prices. Optional filters: product, category.
+    Dates before the stock ledger began are rejected, as stock then is unknown.
+    """
+    try:
+        as_of = parse_as_of(request.query_params.get('date'))
+    except ValueError:
+        as_of = None
+    if as_of is None:
+        return Response({"error": "Provide 'date' as YYYY-MM-DD or an ISO datetime."}, status=status.HTTP_400_BAD_REQUEST)
+    started = ledger_start()
+    if started is not None and as_of < started:
+        return Response({"error": f"Stock history starts at {started.isoformat()}; pick a later date."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    products = Product.objects.filter(date_added__lte=as_of).order_by('id')
+    if request.query_params.get('product'):
+        products = products.filter(pk=request.query_params['product'])
+    if request.query_params.get('category'):
+        products = products.filter(category=request.query_params['category'])
+
+    rows = []
+    total_value = Decimal(0)
+    for item in stock_as_of(as_of, products).values('id', 'name', 'category', 'price', 'stock_as_of'):
+        value = item['price'] * item['stock_as_of']
+        total_value += value
+        rows.append({
+            "product_id": item['id'],
+            "product_name": item['name'],
+            "category": item['category'],
+            "quantity": item['stock_as_of'],
+            "price": float(item['price']),
+            "stock_value": float(value),
+        })
+    return Response({"as_of": as_of.isoformat(), "products": rows, "total_value": float(total_value)})
+
+# --------------------------------------------------
+# Analytics Series Views
+# --------------------------------------------------
+@api_view(['GET'])
+def sales_series_view(request):
+    """
+    Sales per day, week, month or quarter over any date range, read from the
+    daily sales rollup, e.g. GET /api/analytics/series/?granularity=week&start=2025-01-01&end=2025-03-31&metric=units.
+    Optional filters: product, category. Buckets without sales are zero.
+    """
+    params = request.query_params
+    granularity = params.get('granularity', 'month')
+    metric = params.get('metric', 'revenue')
+    if granularity not in GRANULARITIES:
+        return Response({"error": f"'granularity' must be one of {', '.join(GRANULARITIES)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if metric not in METRICS:
+        return Response({"error": f"'metric' must be one of {', '.join(METRICS)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    dates = {}
+    for param in ('start', 'end'):
+        value = params.get(param)
+        if value:
+            dates[param] = parse_date(value)
+            if dates[param] is None:
+                return Response({"error": f"'{param}' must be a date (YYYY-MM-DD)."},
+                                status=status.HTTP_400_BAD_REQUEST)
+    end = dates.get('end') or timezone.localdate()
+    start = dates.get('start') or end - timedelta(days=364)
+    if start > end:
+        return Response({"error": "'start' must not be after 'end'."}, status=status.HTTP_400_BAD_REQUEST)
+    if bucket_count(start, end, granularity) > SERIES_MAX_BUCKETS:
+        return Response({"error": f"The range spans more than {SERIES_MAX_BUCKETS} buckets; use a wider granularity."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    product = params.get('product')
+    if product is not None and not product.isdigit():
+        return Response({"error": "'product' must be a product id."}, status=status.HTTP_400_BAD_REQUEST)
+    periods, values = sales_series(
+        start, end, granularity, metric,
+        product=int(product) if product else None, category=params.get('category') or None,
+    )
+    return Response({
+        "granularity": granularity,
+        "metric": metric,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "series": [
+            {"period": period, "value": value}
+            for period, value in zip(periods.astype(str).tolist(), values.tolist())
+        ],
+        "total": round(values.sum().item(), 2),
+    })
+
+class MonthlyStockSummaryList(generics.ListAPIView):
+    """
+    Units and value sold and restocked per product and month, with current
+    stock, e.g. GET /api/analytics/monthly-stock/?category=Tools&date_after=2025-01-01.
+    Pages are of products (Product filters apply); each page costs one
+    product query and one grouped transaction query, plus one for the
+    page's date bounds when a date filter is left open.
+    """
+    queryset = Product.objects.all()
+    serializer_class = MonthlySalesStockSummarySerializer
+    ordering = 'id'
+    always_paginate = True
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ProductFilter
+
+    def get_queryset(self):
+        return super().get_queryset().annotate(live_stock=live_stock())
+
+    def list(self, request, *args, **kwargs):
+        dates = {}
+        for param in ('date_after', 'date_before'):
+            value = request.query_params.get(param)
+            if value:
+                dates[param] = parse_date(value)
+                if dates[param] is None:
+                    raise ValidationError({'error': f"'{param}' must be a date (YYYY-MM-DD)."})
+        products = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        rows = MonthlySalesStockSummarySerializer.get_monthly_sales_and_stock(products, **dates)
+        return self.get_paginated_response(self.get_serializer(rows, many=True).data)
+
+@api_view(['GET'])
+def analytics_summary(request):
+    """
+    Dashboard KPIs for sales, orders, stock and alerts in one snapshot,
+    e.g. GET /api/analytics/summary/. Cached until a product, order, order
+    item or stock alert write changes the data behind it.
+    """
+    return Response(cached_dashboard_kpis())
+
 # --------------------------------------------------
 # AI-Powered Demand Forecasting APIs
 # --------------------------------------------------
@@ -179,51 +646,55 @@ class SingleStockAlert(generics.RetrieveUpdateDestroyAPIView):
 @parser_classes([JSONParser])
 def forecast_sales(request):
     """
-    Forecast sales data for the last 30 days on a per-product basis using a simple average.
-    Returns a list of forecasts with:
-      - product_name
-      - predicted_sales (average sales)
-      - confidence_score (dummy value, adjust as needed)
+    Forecast demand for every product that sold in the history window, e.g.
+    GET /api/forecast/?horizon=30&history=365&level=0.8. Each product gets
+    Croston (intermittent demand), simple exponential smoothing or
+    Holt-Winters, fitted together over a product x day matrix from the
+    daily sales rollup. Returns a list of forecasts with:
+      - product_id, product_name, method
+      - predicted_sales (units over the next `horizon` days) and daily_sales
+      - lower and upper bounds of the prediction interval
+      - confidence_score (the interval's coverage, `level`)
     """
+    params = request.query_params
     try:
-        start_date = now() - timedelta(days=30)
-        orders = Order.objects.filter(order_date__gte=start_date)
-        logger.info("Number of orders in the last 30 days: %s", orders.count())
-
-        product_sales = {}
-        for order in orders:
-            # Check if 'items' exists
-            order_items = getattr(order, 'items', None)
-            if order_items is None:
-                logger.warning("Order %s has no related 'items'. Check your related_name in the model.", order.id)
-                continue
+        horizon = int(params.get('horizon', 30))
+        history = int(params.get('history', 365))
+        level = float(params.get('level', 0.8))
+    except ValueError:
+        return Response({"error": "'horizon' and 'history' must be whole days and 'level' a number."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not (1 <= horizon <= 365 and 28 <= history <= 1095 and 0 < level < 1):
+        return Response({"error": "Use a horizon of 1-365 days, a history of 28-1095 days and a level between 0 and 1."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        product_ids, forecasts = forecast_demand(horizon, history, level)
+        # in_bulk batches the ids to the database's parameter limit
+        products = Product.objects.only('name').in_bulk(product_ids.tolist())
+        columns = [forecasts[key].tolist() for key in ('method', 'total', 'daily', 'lower', 'upper')]
+        forecast_results = [
+            {
+                "product_id": product_id,
+                "product_name": products[product_id].name,
+                "method": method,
+                "predicted_sales": round(total, 2),
+                "daily_sales": round(daily, 2),
+                "lower": round(lower, 2),
+                "upper": round(upper, 2),
+                "confidence_score": level,
+            }
+            for product_id, method, total, daily, lower, upper in zip(product_ids.tolist(), *columns)
+            if product_id in products
+        ]
 
-            for item in order.items.all():
-                product_id = item.product.id
-                product_name = item.product.name
-                if product_id not in product_sales:
-                    product_sales[product_id] = {"product_name": product_name, "sales": []}
-                product_sales[product_id]["sales"].append(item.quantity)
-
-        logger.info("Aggregated product sales: %s", product_sales)
-
-        forecast_results = []
-        for product_id, data in product_sales.items():
-            if data["sales"]:
-                avg_sales = np.mean(data["sales"])
-                forecast_results.append({
-                    "product_name": data["product_name"],
-                    "predicted_sales": round(avg_sales, 2),
-                    "confidence_score": 0.8  # Dummy confidence score
-                })
-        
         if forecast_results:
-            logger.info("Forecast results: %s", forecast_results)
+            logger.info("Forecast %s products over %s days", len(forecast_results), horizon)
             return Response({"forecast": forecast_results}, status=status.HTTP_200_OK)
         else:
             logger.info("No sales data found for forecasting.")
             return Response({"message": "No sales data found."}, status=status.HTTP_200_OK)
-    
+
     except Exception as e:
         logger.error("Error forecasting sales: %s", e)
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -270,19 +741,20 @@ def ai_forecast_demand(request):
 def ai_analytics(request):
     """AI-powered analytics using Gemini API with embedded analytics data."""
     try:
-        past_30_days = now() - timedelta(days=30)
+        past_30_days = sales_day(now() - timedelta(days=30))
         monthly_sales = get_sales_data()
-        total_sales = OrderItem.objects.filter(order__order_date__gte=past_30_days)\
-                        .aggregate(total=Sum('quantity'))['total'] or 0
-        total_revenue = Order.objects.filter(order_date__gte=past_30_days)\
-                          .aggregate(total=Sum('total_amount'))['total'] or 0
-        order_count = Order.objects.filter(order_date__gte=past_30_days).count()
+        recent_sales = DailySales.objects.filter(day__gte=past_30_days)
+        totals = recent_sales.filter(product__isnull=True).aggregate(
+            units=Sum('units'), revenue=Sum('revenue'), orders=Sum('orders')
+        )
+        total_sales = totals['units'] or 0
+        total_revenue = totals['revenue'] or 0
+        order_count = totals['orders'] or 0
         avg_order_value = float(total_revenue) / order_count if order_count > 0 else 0
         sales_by_category = (
-            Product.objects
-            .filter(order_items__order__order_date__gte=past_30_days)
-            .annotate(total_sold=Sum('order_items__quantity'))
-            .values('category', 'total_sold')
+            recent_sales.filter(product__isnull=False)
+            .values(category=F('product__category'))
+            .annotate(total_sold=Sum('units'))
         )
         inventory_health = Product.objects.annotate(stock=F('quantity_in_stock')).values('name', 'stock')
         stock_alerts = get_stock_alerts()